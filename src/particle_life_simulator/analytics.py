@@ -0,0 +1,423 @@
+"""
+Online-Kennzahlen der Simulation (Struktur statt Rohpositionen).
+
+Ein MetricsRecorder hängt als Beobachter an der Simulation und berechnet
+alle k Schritte aus dem aktuellen Zustand:
+    - radiale Verteilungsfunktion g(r) pro Typ-Paar,
+    - mittlere kinetische Energie,
+    - Cluster (Zusammenhangskomponenten im Kontaktradius) mit Anzahl und Größe,
+    - Typ-Durchmischung (Anteil der Kontakte zu anderen Typen, normiert).
+
+Alle Paare werden in einem Durchlauf über dasselbe Zellgitter wie die
+Kraft-Kernel gefunden (forces.build_cell_list). Der Speicherbedarf ist
+unabhängig von der Laufzeit: g(r) wird als laufende Summe geführt, die
+skalaren Kennzahlen werden Zeile für Zeile in ein ColumnarLog geschrieben.
+
+Ein ColumnarLog ist ein Verzeichnis:
+    meta.json        Spalten, Datentypen und Anzahl vollständiger Zeilen
+    <spalte>.bin     Rohdaten einer Spalte (little endian), eine Datei je Spalte
+    rdf.npy          gemitteltes g(r) (Typen, Typen, Bins), beim Schließen
+"""
+import json
+import os
+
+import numpy as np
+from numba import jit
+
+from particle_life_simulator.forces import MAX_CELLS_PER_AXIS, build_cell_list, cell_index
+from particle_life_simulator.trajectory import _write_json_atomic
+
+LOG_FORMAT_VERSION = 1
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def find_root(parent, i):
+    """Wurzel von i im Union-Find-Wald (mit Pfadhalbierung)."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _visit_pair(i, j, positions, types, r_max, contact_r, hist, contacts, parent):
+    dx = positions[j, 0] - positions[i, 0]
+    dy = positions[j, 1] - positions[i, 1]
+
+    if dx > 0.5:
+        dx -= 1.0
+    elif dx < -0.5:
+        dx += 1.0
+
+    if dy > 0.5:
+        dy -= 1.0
+    elif dy < -0.5:
+        dy += 1.0
+
+    dist_sq = dx * dx + dy * dy
+    if dist_sq >= r_max * r_max:
+        return
+
+    type_i = types[i]
+    type_j = types[j]
+    a = min(type_i, type_j)
+    b = max(type_i, type_j)
+    n_bins = hist.shape[2]
+    bin_index = min(int(np.sqrt(dist_sq) / r_max * n_bins), n_bins - 1)
+    hist[a, b, bin_index] += 1
+
+    if dist_sq < contact_r * contact_r:
+        contacts[type_i, type_j] += 1
+        contacts[type_j, type_i] += 1
+        root_i = find_root(parent, i)
+        root_j = find_root(parent, j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def pair_statistics(positions, types, r_max, contact_r, hist, contacts, parent, n_cells):
+    """
+    Besucht jedes Paar (i < j) mit Abstand < r_max genau einmal.
+
+    Schreibt (additiv):
+        hist (T, T, Bins): Paarzählung nach Abstand, nur a <= b belegt.
+        contacts (T, T): Kontakte (Abstand < contact_r) je Typ-Paar, symmetrisch.
+        parent (N,): Union-Find-Wald der Kontakte (vorher parent[i] = i).
+
+    n_cells < 3 bedeutet O(N²)-Doppelschleife, sonst Zellgitter mit
+    Zellbreite >= r_max (wie forces.particle_force_cells).
+    """
+    n_particles = len(positions)
+
+    if n_cells < 3:
+        for i in range(n_particles):
+            for j in range(i + 1, n_particles):
+                _visit_pair(i, j, positions, types, r_max, contact_r, hist, contacts, parent)
+        return
+
+    cell_start, cell_particles = build_cell_list(positions, n_cells)
+    for i in range(n_particles):
+        cx, cy = cell_index(positions[i, 0], positions[i, 1], n_cells)
+        for ox in range(-1, 2):
+            ncx = (cx + ox) % n_cells
+            for oy in range(-1, 2):
+                cell = ncx * n_cells + (cy + oy) % n_cells
+                for k in range(cell_start[cell], cell_start[cell + 1]):
+                    j = cell_particles[k]
+                    if j > i:
+                        _visit_pair(i, j, positions, types, r_max, contact_r, hist,
+                                    contacts, parent)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def cluster_labels(parent):
+    """Wurzel jedes Partikels (N,), d.h. ein Label pro Cluster."""
+    labels = np.empty(len(parent), dtype=np.int64)
+    for i in range(len(parent)):
+        labels[i] = find_root(parent, i)
+    return labels
+
+
+def rdf_normalization(type_counts, r_max, n_bins):
+    """
+    Erwartete Paarzahl je Bin (T, T, Bins) bei Gleichverteilung auf dem
+    Einheitstorus (Fläche 1); g(r) = gezählte / erwartete Paare.
+    """
+    edges = np.linspace(0.0, r_max, n_bins + 1)
+    shell_area = np.pi * (edges[1:] ** 2 - edges[:-1] ** 2)
+
+    counts = np.asarray(type_counts, dtype=np.float64)
+    pairs = np.outer(counts, counts)
+    # Gleiche Typen: ungeordnete Paare n(n-1)/2
+    pairs[np.diag_indices_from(pairs)] = counts * (counts - 1) / 2
+    return pairs[:, :, None] * shell_area
+
+
+def mixing_indices(contacts, type_counts):
+    """
+    Durchmischung aus der Kontaktmatrix.
+
+    Anteil der Kontakte zu anderen Typen, geteilt durch den Anteil bei
+    zufälliger Durchmischung: 1 = durchmischt, 0 = vollständig getrennt
+    (> 1 = andere Typen werden bevorzugt).
+
+    Returns:
+        Tuple (gesamt, pro Typ (T,)); NaN ohne Kontakte.
+    """
+    contacts = np.asarray(contacts, dtype=np.float64)
+    counts = np.asarray(type_counts, dtype=np.float64)
+    n_particles = counts.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Erwarteter Fremdanteil der Nachbarn eines Partikels vom Typ t
+        expected = 1.0 - (counts - 1) / (n_particles - 1)
+        per_type = (1.0 - np.diag(contacts) / contacts.sum(axis=1)) / expected
+
+        total = contacts.sum()
+        expected_total = np.sum(counts * expected) / n_particles
+        overall = (1.0 - np.trace(contacts) / total) / expected_total
+    return float(overall), per_type
+
+
+class ColumnarLog:
+    """
+    Spaltenweises Protokoll skalarer Kennzahlen, eine Zeile pro Messung.
+
+    Zeilen werden gepuffert und spaltenweise angehängt; meta.json wird erst
+    nach dem Schreiben aktualisiert, Leser (read_log) sehen also nur
+    vollständige Zeilen. Der Speicherbedarf ist durch buffer_rows begrenzt.
+    """
+
+    def __init__(self, path, columns, buffer_rows=256):
+        """
+        Args:
+            path (str): Zielverzeichnis (wird angelegt, darf nicht existieren).
+            columns (dict): Spaltenname -> Datentyp, in Schreibreihenfolge.
+            buffer_rows (int): Zeilen, die vor dem Schreiben gesammelt werden.
+        """
+        if buffer_rows < 1:
+            raise ValueError(f"buffer_rows muss >= 1 sein, nicht {buffer_rows}")
+
+        os.makedirs(path)
+        self.path = path
+        self.columns = {name: np.dtype(dtype).newbyteorder("<") for name, dtype in columns.items()}
+        self.buffer_rows = buffer_rows
+        self.n_rows = 0
+        self._buffer = []
+        self._closed = False
+
+        self._meta = {
+            "version": LOG_FORMAT_VERSION,
+            "columns": {name: dtype.str for name, dtype in self.columns.items()},
+            "n_rows": 0,
+        }
+        for name in self.columns:
+            open(self._column_path(name), "wb").close()
+        _write_json_atomic(os.path.join(path, "meta.json"), self._meta)
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def append(self, row):
+        """Hängt eine Zeile an (dict mit genau den Spalten des Logs)."""
+        if self._closed:
+            raise ValueError("ColumnarLog ist bereits geschlossen")
+        if row.keys() != self.columns.keys():
+            raise ValueError(f"Zeile hat Spalten {sorted(row)}, erwartet {sorted(self.columns)}")
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Schreibt alle gepufferten Zeilen."""
+        if not self._buffer:
+            return
+        for name, dtype in self.columns.items():
+            values = np.array([row[name] for row in self._buffer], dtype=dtype)
+            with open(self._column_path(name), "ab") as f:
+                f.write(values.tobytes())
+
+        self.n_rows += len(self._buffer)
+        self._buffer = []
+        self._meta["n_rows"] = self.n_rows
+        _write_json_atomic(os.path.join(self.path, "meta.json"), self._meta)
+
+    def save_array(self, name, array):
+        """Legt ein zusätzliches Array als <name>.npy neben das Log."""
+        np.save(os.path.join(self.path, f"{name}.npy"), array)
+
+    def close(self):
+        if not self._closed:
+            self.flush()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_log(path, mmap=True):
+    """
+    Liest ein ColumnarLog.
+
+    Returns:
+        dict: Spaltenname -> Array (n_rows,), bei mmap=True als Memory-Map.
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != LOG_FORMAT_VERSION:
+        raise ValueError(f"Nicht unterstützte Log-Version: {meta.get('version')}")
+
+    n_rows = meta["n_rows"]
+    columns = {}
+    for name, dtype in meta["columns"].items():
+        column_path = os.path.join(path, f"{name}.bin")
+        if mmap and n_rows > 0:
+            columns[name] = np.memmap(column_path, dtype=np.dtype(dtype), mode="r",
+                                      shape=(n_rows,))
+        else:
+            columns[name] = np.fromfile(column_path, dtype=np.dtype(dtype), count=n_rows)
+    return columns
+
+
+class MetricsRecorder:
+    """
+    Beobachter, der alle `every` Schritte Strukturkennzahlen berechnet.
+
+    Verwendung:
+        recorder = MetricsRecorder(every=50, log_path="run.metrics")
+        recorder.attach(sim)         # bzw. sim.enable_metrics(50, "run.metrics")
+        sim.run(10_000)
+        recorder.close()
+        recorder.summary()           # Mittelwerte über alle Messungen
+        r, g = recorder.rdf()        # gemitteltes g(r) pro Typ-Paar
+    """
+
+    def __init__(self, every=10, r_max=None, n_bins=32, contact_r=None, min_cluster_size=3,
+                 log_path=None):
+        """
+        Args:
+            every (int): Messintervall in Schritten.
+            r_max (float, optional): Reichweite von g(r), höchstens 0.5
+                (Default: max_r der Simulation).
+            n_bins (int): Anzahl der Abstands-Bins von g(r).
+            contact_r (float, optional): Kontaktradius für Cluster und
+                Durchmischung, höchstens r_max (Default: r_max / 4).
+            min_cluster_size (int): Kleinere Komponenten zählen nicht als Cluster.
+            log_path (str, optional): Verzeichnis für das ColumnarLog.
+        """
+        if every < 1:
+            raise ValueError(f"every muss >= 1 sein, nicht {every}")
+        if n_bins < 1:
+            raise ValueError(f"n_bins muss >= 1 sein, nicht {n_bins}")
+        if r_max is not None and not 0.0 < r_max <= 0.5:
+            raise ValueError(f"r_max muss in (0, 0.5] liegen, nicht {r_max}")
+
+        self.every = every
+        self.r_max = r_max
+        self.n_bins = n_bins
+        self.contact_r = contact_r
+        self.min_cluster_size = min_cluster_size
+        self.log_path = log_path
+        self.log = None
+
+        self.n_samples = 0
+        self.latest = None
+        self._sums = {}
+        self._rdf_sum = None
+        self._rdf_r_max = None
+
+    def attach(self, simulation):
+        """Registriert den Recorder als Beobachter der Simulation."""
+        simulation.add_observer(self, self.every)
+        return self
+
+    def _radii(self, simulation):
+        r_max = self.r_max if self.r_max is not None else min(simulation.max_r, 0.5)
+        contact_r = self.contact_r if self.contact_r is not None else r_max / 4
+        if not 0.0 < contact_r <= r_max:
+            raise ValueError(f"contact_r muss in (0, r_max] liegen, nicht {contact_r}")
+        return r_max, contact_r
+
+    def measure(self, simulation):
+        """
+        Kennzahlen des aktuellen Zustands, ohne sie zu akkumulieren.
+
+        Returns:
+            Tuple (Kennzahlen-dict, g(r) als (T, T, Bins)).
+        """
+        particles = simulation.particles
+        positions = particles.positions
+        types = particles.types
+        velocities = particles.velocities
+        n_types = len(simulation.interaction.matrix)
+        n_particles = len(positions)
+        r_max, contact_r = self._radii(simulation)
+
+        hist = np.zeros((n_types, n_types, self.n_bins), dtype=np.int64)
+        contacts = np.zeros((n_types, n_types), dtype=np.int64)
+        parent = np.arange(n_particles, dtype=np.int64)
+        n_cells = min(int(1.0 / r_max), MAX_CELLS_PER_AXIS)
+        pair_statistics(positions, types, r_max, contact_r, hist, contacts, parent, n_cells)
+
+        type_counts = np.bincount(np.asarray(types, dtype=np.int64), minlength=n_types)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rdf = hist / rdf_normalization(type_counts, r_max, self.n_bins)
+        # Nur a <= b wurde gezählt; symmetrisch ergänzen
+        rdf = np.nan_to_num(rdf)
+        rdf += np.transpose(rdf, (1, 0, 2)) * (1 - np.eye(n_types))[:, :, None]
+
+        sizes = np.bincount(cluster_labels(parent), minlength=n_particles)
+        sizes = sizes[sizes >= self.min_cluster_size]
+        mixing, mixing_per_type = mixing_indices(contacts, type_counts)
+        speeds_sq = np.sum(np.asarray(velocities, dtype=np.float64) ** 2, axis=1)
+
+        metrics = {
+            "step": simulation.step_count,
+            "n_particles": n_particles,
+            "kinetic_energy": float(0.5 * np.mean(speeds_sq)),
+            "n_clusters": len(sizes),
+            "largest_cluster": int(sizes.max()) if len(sizes) else 0,
+            "mean_cluster_size": float(sizes.mean()) if len(sizes) else 0.0,
+            "clustered_fraction": float(sizes.sum() / n_particles),
+            "mixing_index": mixing,
+        }
+        for t in range(n_types):
+            metrics[f"mixing_{t}"] = float(mixing_per_type[t])
+        for a in range(n_types):
+            for b in range(a, n_types):
+                metrics[f"rdf_peak_{a}_{b}"] = float(rdf[a, b].max())
+        return metrics, rdf
+
+    def __call__(self, simulation):
+        metrics, rdf = self.measure(simulation)
+
+        if self._rdf_sum is None:
+            self._rdf_sum = np.zeros_like(rdf)
+            self._rdf_r_max = self._radii(simulation)[0]
+        if rdf.shape != self._rdf_sum.shape:
+            raise ValueError(f"Anzahl Typen hat sich geändert: {rdf.shape[:2]}")
+        self._rdf_sum += rdf
+
+        for key, value in metrics.items():
+            if key != "step" and not np.isnan(value):
+                total, count = self._sums.get(key, (0.0, 0))
+                self._sums[key] = (total + value, count + 1)
+
+        if self.log_path is not None:
+            if self.log is None:
+                columns = {key: np.int64 if isinstance(value, int) else np.float32
+                           for key, value in metrics.items()}
+                self.log = ColumnarLog(self.log_path, columns)
+            self.log.append(metrics)
+
+        self.n_samples += 1
+        self.latest = metrics
+
+    def rdf(self):
+        """
+        Über alle Messungen gemitteltes g(r).
+
+        Returns:
+            Tuple (Bin-Mitten (Bins,), g (T, T, Bins)).
+        """
+        if self._rdf_sum is None:
+            raise ValueError("Noch keine Messung")
+        edges = np.linspace(0.0, self._rdf_r_max, self.n_bins + 1)
+        return (edges[:-1] + edges[1:]) / 2, self._rdf_sum / self.n_samples
+
+    def summary(self):
+        """Mittelwert jeder Kennzahl über alle Messungen (NaN-Werte ausgelassen)."""
+        return {f"mean_{key}": total / count for key, (total, count) in self._sums.items()}
+
+    def close(self):
+        """Schreibt das Log vollständig (inkl. gemitteltem g(r) als rdf.npy)."""
+        if self.log is not None:
+            self.log.flush()
+            if self.n_samples:
+                self.log.save_array("rdf", self.rdf()[1])
+            self.log.close()
@@ -0,0 +1,397 @@
+"""
+Austauschbare Rechen-Backends für die Kraftberechnung und Autotuner.
+
+Ein Backend liefert für eine Simulation den Kraft-Kernel mit der
+einheitlichen Signatur kernel(positions, types, table, max_r, forces, n_cells)
+(siehe forces.select_force_kernel). Registriert sind:
+
+    numpy            Vektorisiert in Zeilenblöcken (ohne Numba, Speicher beschränkt)
+    numba            O(N²)-Doppelschleife, seriell
+    numba-parallel   O(N²)-Doppelschleife, prange über die Partikel
+    cells            Zellliste, seriell
+    cells-parallel   Zellliste, prange über die Partikel
+    verlet           Verlet-Nachbarliste, seriell
+    verlet-parallel  Verlet-Nachbarliste, prange über die Partikel
+
+autotune() misst die Kandidaten für Partikelzahl, Typenzahl und max_r und
+speichert den Sieger pro Maschine in einer JSON-Datei, sodass spätere
+Prozesse (und Simulation(backend="auto")) ohne erneute Messung starten.
+
+Aufruf:
+    python -m particle_life_simulator.backends -n 5000 --types 4 --max-r 0.1
+"""
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numba
+import numpy as np
+
+from particle_life_simulator.forces import select_force_kernel
+from particle_life_simulator.neighbors import (
+    NeighborList,
+    compute_forces_list,
+    compute_forces_list_parallel,
+)
+
+# Paar-Einträge pro Zeilenblock des NumPy-Backends (je Zwischenarray 8 MB)
+TILE_ELEMENTS = 1 << 20
+
+# Cache-Datei des Autotuners; per Umgebungsvariable umlenkbar
+AUTOTUNE_CACHE_ENV = "PARTICLE_LIFE_AUTOTUNE_CACHE"
+AUTOTUNE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "particle_life_simulator",
+                                   "autotune.json")
+
+CACHE_VERSION = 1
+
+
+def compute_forces_numpy(positions, types, table, max_r, forces, n_cells=0,
+                         tile_elements=TILE_ELEMENTS):
+    """
+    O(N²)-Kraft-Kernel in reinem NumPy, blockweise statt mit (N, N) Arrays.
+
+    Wie Interaction.get_rule_grid werden die Regeln per Fancy-Indexing über
+    die Typen-Arrays geholt, aber nur für einen Block von Zeilen i gegen alle
+    j und direkt aus der Kraft-Tabelle (damit gelten Profile und Radien).
+    Pro Block entstehen höchstens tile_elements Paar-Einträge. Da jede Zeile
+    vollständig in einem Block liegt und über j aufsteigend summiert wird,
+    ist das Ergebnis (float64) bitgleich zum seriellen Numba-Kernel.
+    n_cells wird ignoriert (einheitliche Signatur aller Kraft-Kernel).
+    """
+    n_particles = len(positions)
+    n_types = table.shape[0]
+    n_table = table.shape[2]
+    pair_table = table.reshape(n_types * n_types, n_table)
+    pos_x = np.ascontiguousarray(positions[:, 0])
+    pos_y = np.ascontiguousarray(positions[:, 1])
+    pair_row = np.asarray(types, dtype=np.int64) * n_types
+    pair_col = np.asarray(types, dtype=np.int64)
+    inv_max_r = 1.0 / max_r
+    rows_per_tile = max(1, tile_elements // max(n_particles, 1))
+
+    for start in range(0, n_particles, rows_per_tile):
+        stop = min(start + rows_per_tile, n_particles)
+
+        # Kürzester Weg auf dem Torus, wie in forces.pair_force
+        dx = pos_x[None, :] - pos_x[start:stop, None]
+        dy = pos_y[None, :] - pos_y[start:stop, None]
+        for delta in (dx, dy):
+            delta[delta > 0.5] -= 1.0
+            delta[delta < -0.5] += 1.0
+
+        dist_sq = dx * dx + dy * dy
+        # dist_sq = 0 schließt auch i == j aus
+        rows, cols = np.nonzero((dist_sq > 0.0) & (dist_sq * inv_max_r * inv_max_r < 1.0))
+
+        dist = np.sqrt(dist_sq[rows, cols])
+        x = dist * inv_max_r * (n_table - 1)
+        k = np.minimum(x.astype(np.int64), n_table - 2)  # wie forces.pair_force
+        pair = pair_row[start + rows] + pair_col[cols]
+        low = pair_table[pair, k]
+        force_val = low + (x - k) * (pair_table[pair, k + 1] - low)
+
+        # bincount summiert in Reihenfolge von (rows, cols), d.h. j aufsteigend
+        n_rows = stop - start
+        forces[start:stop, 0] = np.bincount(rows, dx[rows, cols] / dist * force_val,
+                                            minlength=n_rows)
+        forces[start:stop, 1] = np.bincount(rows, dy[rows, cols] / dist * force_val,
+                                            minlength=n_rows)
+
+
+class Backend:
+    """Basisklasse: Ein Backend wählt den Kraft-Kernel für eine Simulation."""
+
+    name = ""
+    # True = der Kernel nutzt die Threads der Simulation (numba.set_num_threads)
+    parallel = False
+    # True = Numba-Kernel, der in die fusionierten run()-Kernel eingesetzt
+    # werden kann (siehe integrators.fused_kernel); sonst Schritt für Schritt
+    fused = True
+
+    def available(self, max_r):
+        """Ob das Backend für diesen Radius sinnvoll rechnen kann."""
+        return not self.parallel or numba.config.NUMBA_NUM_THREADS > 1
+
+    def force_kernel(self, simulation):
+        """
+        Returns:
+            Tuple (kernel, n_cells) wie Simulation.force_kernel().
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class NumpyBackend(Backend):
+    """Vektorisiert in NumPy, Speicher pro Block durch tile_elements beschränkt."""
+
+    name = "numpy"
+    fused = False
+
+    def __init__(self, tile_elements=TILE_ELEMENTS):
+        self.tile_elements = tile_elements
+
+    def force_kernel(self, simulation):
+        if self.tile_elements == TILE_ELEMENTS:
+            return compute_forces_numpy, 0
+        return functools.partial(compute_forces_numpy, tile_elements=self.tile_elements), 0
+
+
+class NumbaBackend(Backend):
+    """O(N²)-Kernel aus forces, seriell oder parallel."""
+
+    def __init__(self, parallel=False):
+        self.parallel = parallel
+        self.name = "numba-parallel" if parallel else "numba"
+
+    def force_kernel(self, simulation):
+        return select_force_kernel(0, self.parallel), 0
+
+
+class CellListBackend(Backend):
+    """
+    Zellliste aus forces. Unter drei Zellen pro Achse (max_r > 1/3) rechnet
+    es wie NumbaBackend, da sich sonst die Nachbarzellen überlappen würden.
+    """
+
+    def __init__(self, parallel=False):
+        self.parallel = parallel
+        self.name = "cells-parallel" if parallel else "cells"
+
+    def available(self, max_r):
+        return super().available(max_r) and int(1.0 / max_r) >= 3
+
+    def force_kernel(self, simulation):
+        n_cells = simulation.cells_per_axis()
+        if n_cells < 3:
+            n_cells = 0
+        return select_force_kernel(n_cells, self.parallel), n_cells
+
+
+class VerletBackend(Backend):
+    """Verlet-Nachbarliste (simulation.neighbor_list, Skin simulation.neighbor_skin)."""
+
+    def __init__(self, parallel=False):
+        self.parallel = parallel
+        self.name = "verlet-parallel" if parallel else "verlet"
+
+    def force_kernel(self, simulation):
+        if simulation.neighbor_list is None:
+            simulation.neighbor_list = NeighborList(simulation.neighbor_skin)
+        kernel = compute_forces_list_parallel if self.parallel else compute_forces_list
+        return kernel, simulation.neighbor_list.prepare(simulation.particles.positions,
+                                                        simulation.max_r)
+
+
+BACKENDS = {}
+
+
+def register_backend(backend):
+    """Registriert ein Backend unter backend.name (überschreibt gleichnamige)."""
+    if not backend.name or backend.name == "auto":
+        raise ValueError(f"Ungültiger Backend-Name: {backend.name!r}")
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+for _backend in (NumpyBackend(), NumbaBackend(), NumbaBackend(parallel=True), CellListBackend(),
+                 CellListBackend(parallel=True), VerletBackend(), VerletBackend(parallel=True)):
+    register_backend(_backend)
+
+
+def get_backend(backend):
+    """Backend aus Name oder Instanz (ValueError bei unbekannten Namen)."""
+    if isinstance(backend, Backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unbekanntes Backend: {backend!r} (verfügbar: auto, {', '.join(BACKENDS)})"
+        ) from None
+
+
+def machine_fingerprint():
+    """Kennung der Maschine (CPU, Threads, Bibliotheksversionen) für den Cache."""
+    info = {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numba_threads": numba.config.NUMBA_NUM_THREADS,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+    }
+    digest = hashlib.sha256(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def problem_key(n_particles, n_types, max_r, n_threads, candidates):
+    """
+    Cache-Schlüssel einer Messung. N wird auf die nächste Zweierpotenz
+    gerundet, damit kleine Änderungen (z.B. entfernte Partikel) die Messung
+    wiederverwenden.
+    """
+    bucket = 2 ** round(math.log2(max(n_particles, 1)))
+    return (f"n{bucket}/t{n_types}/r{max_r:.4g}/threads{n_threads}/"
+            f"{'+'.join(sorted(candidates))}")
+
+
+def _cache_path(cache_path):
+    if cache_path is None:
+        cache_path = os.environ.get(AUTOTUNE_CACHE_ENV, AUTOTUNE_CACHE_PATH)
+    return cache_path
+
+
+def _load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CACHE_VERSION, "machines": {}}
+    if cache.get("version") != CACHE_VERSION:
+        return {"version": CACHE_VERSION, "machines": {}}
+    return cache
+
+
+def _store_cache(path, cache):
+    """Schreibt den Cache atomar (parallele Prozesse sehen nie eine halbe Datei)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def measure_backends(n_particles, n_types, max_r, candidates=None, n_threads=None, repeats=3,
+                     budget=1.0, seed=0):
+    """
+    Misst die Dauer eines Simulationsschritts je Backend auf einem
+    zufälligen Zustand der gegebenen Größe.
+
+    Kompiliert wird vorab per Simulation.warmup(); gewertet wird der Median
+    aus repeats Schritten (der erste enthält ggf. den Aufbau der
+    Nachbarliste). Dauert ein Schritt länger als budget Sekunden, wird das
+    Backend nicht weiter gemessen.
+
+    Returns:
+        dict: Backend-Name -> Sekunden pro Schritt.
+    """
+    from particle_life_simulator.interaction import Interaction
+    from particle_life_simulator.particles import ParticleSystem
+    from particle_life_simulator.simulation import Simulation
+
+    names = list(BACKENDS) if candidates is None else list(candidates)
+    rng = np.random.default_rng(seed)
+    positions = rng.random((n_particles, 2))
+    velocities = rng.normal(0.0, 0.01, (n_particles, 2))
+    types = rng.integers(0, n_types, n_particles)
+    matrix = rng.uniform(-1.0, 1.0, (n_types, n_types))
+
+    timings = {}
+    for name in names:
+        backend = get_backend(name)
+        if not backend.available(max_r):
+            continue
+        particles = ParticleSystem.from_arrays(positions.copy(), velocities.copy(), types.copy())
+        sim = Simulation(0.001, max_r, 0.1, 0.0, particles, Interaction.from_matrix(matrix),
+                         n_threads=n_threads, backend=backend.name, seed=seed)
+        sim.warmup()
+
+        durations = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            sim.step()
+            durations.append(time.perf_counter() - start_time)
+            if durations[-1] > budget:
+                break
+        timings[name] = float(np.median(durations))
+    return timings
+
+
+def autotune(n_particles, n_types, max_r, candidates=None, n_threads=None, cache_path=None,
+             refresh=False, **measure_kwargs):
+    """
+    Wählt das schnellste Backend für diese Problemgröße auf dieser Maschine.
+
+    Das Ergebnis wird unter (Maschine, problem_key) in cache_path abgelegt
+    und bei späteren Aufrufen ohne Messung zurückgegeben.
+
+    Args:
+        candidates (list, optional): Namen registrierter Backends (Default: alle).
+        n_threads: Threads für die parallelen Backends (None = alle).
+        cache_path (str, optional): JSON-Datei, Default: Umgebungsvariable
+            PARTICLE_LIFE_AUTOTUNE_CACHE bzw. ~/.cache/particle_life_simulator.
+        refresh (bool): Vorhandenes Ergebnis ignorieren und neu messen.
+        **measure_kwargs: repeats, budget, seed (siehe measure_backends).
+
+    Returns:
+        str: Name des schnellsten Backends.
+    """
+    names = list(BACKENDS) if candidates is None else [get_backend(c).name for c in candidates]
+    if n_threads is None:
+        n_threads = numba.config.NUMBA_NUM_THREADS
+    path = _cache_path(cache_path)
+    machine = machine_fingerprint()
+    key = problem_key(n_particles, n_types, max_r, n_threads, names)
+
+    cache = _load_cache(path)
+    entry = cache["machines"].get(machine, {}).get(key)
+    if entry is not None and not refresh and entry["backend"] in BACKENDS:
+        return entry["backend"]
+
+    timings = measure_backends(n_particles, n_types, max_r, names, n_threads, **measure_kwargs)
+    if not timings:
+        raise ValueError(f"Keines der Backends {names} ist für max_r={max_r} verfügbar")
+    best = min(timings, key=timings.get)
+
+    # Erneut laden: ein anderer Prozess kann inzwischen geschrieben haben
+    cache = _load_cache(path)
+    cache["machines"].setdefault(machine, {})[key] = {
+        "backend": best,
+        "timings": timings,
+        "n_particles": n_particles,
+        "time": time.time(),
+    }
+    try:
+        _store_cache(path, cache)
+    except OSError:
+        pass  # Ohne beschreibbares Cache-Verzeichnis wird beim nächsten Mal neu gemessen
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m particle_life_simulator.backends",
+        description="Backends für eine Problemgröße messen und den Sieger cachen.")
+    parser.add_argument("-n", "--particles", type=int, default=2000)
+    parser.add_argument("--types", type=int, default=4)
+    parser.add_argument("--max-r", type=float, default=0.15)
+    parser.add_argument("--backends", nargs="+", metavar="NAME",
+                        help=f"Kandidaten (Default: alle: {', '.join(BACKENDS)})")
+    parser.add_argument("--cache", metavar="JSON", help="Cache-Datei des Autotuners")
+    args = parser.parse_args(argv)
+
+    names = args.backends or list(BACKENDS)
+    best = autotune(args.particles, args.types, args.max_r, names, cache_path=args.cache,
+                    refresh=True)
+    key = problem_key(args.particles, args.types, args.max_r, numba.config.NUMBA_NUM_THREADS,
+                      names)
+    entry = _load_cache(_cache_path(args.cache))["machines"][machine_fingerprint()][key]
+    for name, seconds in sorted(entry["timings"].items(), key=lambda item: item[1]):
+        print(f"{name:<16} {seconds * 1000:10.3f} ms/Schritt")
+    print(f"-> {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
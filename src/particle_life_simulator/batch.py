@@ -0,0 +1,335 @@
+"""
+Headless Batch-Runner für Parameterstudien.
+
+Eine Sweep-Spezifikation (JSON) beschreibt eine Liste von Konfigurationen
+und/oder ein Parametergitter. Jede Konfiguration wird in einem eigenen
+Worker-Prozess mit Simulation.run() ausgeführt; die Kennzahlen jedes Laufs
+werden sofort nach Abschluss als JSON-Zeile in die Ergebnisdatei geschrieben.
+
+Beispiel-Spezifikation:
+    {
+        "base": {"n_particles": 1000, "steps": 500},
+        "grid": {"friction": [0.05, 0.1], "max_r": [0.1, 0.15]},
+        "runs": [{"matrix": "default"}, {"matrix": "random", "seed": 1}]
+    }
+
+Aufruf:
+    particle-life-batch sweep.json -o results.jsonl --workers 4 --timeout 600
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+
+import numpy as np
+
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.rng import derive_seeds
+from particle_life_simulator.simulation import Simulation
+
+# Standardwerte wie in main.py; jede Sweep-Konfiguration überschreibt sie.
+DEFAULT_CONFIG = {
+    "n_particles": 2000,
+    "n_types": 4,
+    "dt": 0.001,
+    "max_r": 0.15,
+    "friction": 0.1,
+    "noise": 0.0,
+    "steps": 1000,
+    "seed": None,
+    "matrix": "default",      # "default" (nur 4 Typen), "random" oder Liste von Listen
+    "force_profile": "linear",  # "linear", "classic" oder "smooth" (siehe interaction)
+    "core": 0.0,              # abstoßender Kern als Anteil des Radius
+    "integrator": "semi_implicit_euler",
+    "neighbor_mode": "auto",  # "auto", "brute", "cells" oder "verlet"
+    "neighbor_skin": 0.1,     # Skin der Verlet-Liste als Anteil von max_r
+    "backend": None,          # Rechen-Backend (siehe backends), "auto" = Autotuner
+    "n_threads": 1,           # 1 Thread pro Worker, die Parallelität kommt vom Pool
+    "dtype": "float64",       # "float32" halbiert die Datenmenge des Zustands
+    "types_dtype": "int64",   # z.B. "uint8" (bis 256 Typen)
+    "layout": "aos",          # "soa" = x und y getrennt zusammenhängend
+    "metrics_every": 0,       # > 0: Strukturkennzahlen alle k Schritte (Mittelwerte)
+}
+
+# Wartezeit der Hauptschleife auf Ergebnisse, bevor Timeouts geprüft werden
+POLL_INTERVAL = 0.2
+
+
+def expand_sweep(spec):
+    """
+    Erzeugt aus einer Sweep-Spezifikation die Liste vollständiger Konfigurationen.
+
+    Args:
+        spec (dict): Optional "base" (gemeinsame Werte), "runs" (Liste von
+            Konfigurationen) und "grid" (Parameter -> Liste von Werten).
+            runs und grid werden kartesisch kombiniert.
+
+    Returns:
+        list[dict]: Konfigurationen inkl. aller Standardwerte.
+    """
+    unknown = set(spec) - {"base", "runs", "grid"}
+    if unknown:
+        raise ValueError(f"Unbekannte Schlüssel in der Sweep-Spezifikation: {sorted(unknown)}")
+
+    base = {**DEFAULT_CONFIG, **spec.get("base", {})}
+    runs = spec.get("runs") or [{}]
+    grid = spec.get("grid", {})
+
+    keys = list(grid)
+    configs = []
+    for run in runs:
+        for values in itertools.product(*(grid[key] for key in keys)):
+            config = {**base, **run, **dict(zip(keys, values))}
+            unknown = set(config) - set(DEFAULT_CONFIG)
+            if unknown:
+                raise ValueError(f"Unbekannte Parameter: {sorted(unknown)}")
+            configs.append(config)
+
+    return configs
+
+
+def build_simulation(config):
+    """Baut Partikelsystem, Regeln und Simulation für eine Konfiguration."""
+    if config["n_particles"] < 1:
+        raise ValueError(f"n_particles muss >= 1 sein, nicht {config['n_particles']}")
+
+    # Getrennte Seeds für Startzustand, Regeln und Noise
+    particles_seed, rules_seed, noise_seed = derive_seeds(config["seed"], 3)
+
+    n_types = config["n_types"]
+    particles = ParticleSystem(config["n_particles"], n_types, dtype=np.dtype(config["dtype"]),
+                               types_dtype=np.dtype(config["types_dtype"]),
+                               layout=config["layout"], seed=particles_seed)
+    interactions = Interaction(n_types, seed=rules_seed, profile=config["force_profile"],
+                               core=config["core"])
+
+    matrix = config["matrix"]
+    if matrix == "random":
+        interactions.randomize()
+    elif matrix != "default":
+        interactions.matrix = np.array(matrix, dtype=float)
+    if interactions.matrix.shape != (n_types, n_types):
+        raise ValueError(f"Interaktionsmatrix hat Form {interactions.matrix.shape}, "
+                         f"erwartet ({n_types}, {n_types})")
+
+    return Simulation(config["dt"], config["max_r"], config["friction"], config["noise"],
+                      particles, interactions, neighbor_mode=config["neighbor_mode"],
+                      n_threads=config["n_threads"], integrator=config["integrator"],
+                      seed=noise_seed, neighbor_skin=config["neighbor_skin"],
+                      backend=config["backend"])
+
+
+def summarize(simulation, bins=16):
+    """
+    Kompakte Kennzahlen des aktuellen Zustands.
+
+    spatial_entropy ist die normierte Shannon-Entropie eines bins x bins
+    Histogramms der Positionen: 1.0 = gleichverteilt, kleiner = Cluster.
+    """
+    velocities = simulation.particles.velocities
+    speeds = np.sqrt(np.sum(velocities * velocities, axis=1))
+
+    hist, _, _ = np.histogram2d(simulation.particles.positions[:, 0],
+                                simulation.particles.positions[:, 1],
+                                bins=bins, range=[[0.0, 1.0], [0.0, 1.0]])
+    p = hist.ravel() / hist.sum()
+    p = p[p > 0]
+    entropy = float(-np.sum(p * np.log(p)) / np.log(bins * bins))
+
+    return {
+        "kinetic_energy": float(0.5 * np.mean(speeds * speeds)),
+        "mean_speed": float(np.mean(speeds)),
+        "max_speed": float(np.max(speeds)),
+        "spatial_entropy": entropy,
+    }
+
+
+def run_config(config):
+    """
+    Führt eine Konfiguration aus und liefert ihre Kennzahlen. Die
+    Kompilier- bzw. Cache-Ladezeit (warmup_time) wird getrennt von der
+    Rechenzeit (wall_time) gemessen.
+    """
+    sim = build_simulation(config)
+    warmup_time = sim.warmup()
+    recorder = sim.enable_metrics(config["metrics_every"]) if config["metrics_every"] else None
+
+    start_time = time.perf_counter()
+    sim.run(config["steps"])
+    wall_time = time.perf_counter() - start_time
+
+    return {
+        **summarize(sim),
+        **(recorder.summary() if recorder is not None else {}),
+        **(sim.neighbor_list.metrics() if sim.neighbor_list is not None else {}),
+        "warmup_time": warmup_time,
+        "wall_time": wall_time,
+        "steps_per_second": config["steps"] / wall_time if wall_time > 0 else float("inf"),
+    }
+
+
+def _worker_main(worker_id, task_queue, result_queue):
+    """Schleife eines Worker-Prozesses: Aufgaben holen, ausführen, melden."""
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+
+        run_id, config = task
+        try:
+            # Die Konsolenausgaben von ParticleSystem/Interaction unterdrücken
+            with contextlib.redirect_stdout(io.StringIO()):
+                metrics = run_config(config)
+            result_queue.put((worker_id, run_id, "ok", metrics, None))
+        except Exception:
+            result_queue.put((worker_id, run_id, "error", None, traceback.format_exc()))
+
+
+class _Worker:
+    """Ein Worker-Prozess mit eigener Aufgaben-Queue."""
+
+    def __init__(self, context, worker_id, result_queue):
+        self.worker_id = worker_id
+        self.task_queue = context.Queue()
+        self.process = context.Process(target=_worker_main,
+                                       args=(worker_id, self.task_queue, result_queue),
+                                       daemon=True)
+        self.process.start()
+        self.run_id = None
+        self.started = None
+
+    def assign(self, run_id, config):
+        self.run_id = run_id
+        self.started = time.monotonic()
+        self.task_queue.put((run_id, config))
+
+    def finish(self):
+        self.run_id = None
+        self.started = None
+
+    def stop(self):
+        if self.process.is_alive():
+            self.task_queue.put(None)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+
+def run_sweep(configs, output_path, n_workers=None, timeout=None):
+    """
+    Führt alle Konfigurationen auf einem Prozess-Pool aus.
+
+    Jeder abgeschlossene Lauf wird sofort als JSON-Zeile an output_path
+    angehängt. Läufe, die abstürzen oder timeout Sekunden überschreiten,
+    werden als "crashed" bzw. "timeout" protokolliert; der betroffene
+    Worker wird ersetzt und der Sweep läuft weiter.
+
+    Args:
+        configs (list[dict]): Vollständige Konfigurationen (siehe expand_sweep).
+        output_path (str): Ergebnisdatei (JSON Lines).
+        n_workers (int, optional): Anzahl Prozesse. Default: alle Kerne.
+        timeout (float, optional): Maximale Laufzeit pro Lauf in Sekunden.
+
+    Returns:
+        dict: Anzahl Läufe pro Status.
+    """
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(configs)))
+    # spawn statt fork: Numba-Threadpools überleben fork nicht zuverlässig
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+
+    pending = list(enumerate(configs))[::-1]
+    workers = [_Worker(context, worker_id, result_queue) for worker_id in range(n_workers)]
+    counts = {"ok": 0, "error": 0, "timeout": 0, "crashed": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        def record(worker, status, metrics=None, error=None):
+            run_id = worker.run_id
+            entry = {"run_id": run_id, "status": status, "config": configs[run_id],
+                     "metrics": metrics, "error": error,
+                     "elapsed": time.monotonic() - worker.started}
+            out.write(json.dumps(entry) + "\n")
+            out.flush()
+            counts[status] += 1
+            worker.finish()
+
+        try:
+            while pending or any(w.run_id is not None for w in workers):
+                for worker in workers:
+                    if worker.run_id is None and pending:
+                        worker.assign(*pending.pop())
+
+                # Auf die erste Meldung warten, dann alle vorhandenen abholen
+                messages = []
+                try:
+                    messages.append(result_queue.get(timeout=POLL_INTERVAL))
+                    while True:
+                        messages.append(result_queue.get_nowait())
+                except queue.Empty:
+                    pass
+                for worker_id, run_id, status, metrics, error in messages:
+                    worker = workers[worker_id]
+                    # Meldungen bereits abgebrochener Läufe ignorieren
+                    if worker.run_id == run_id:
+                        record(worker, status, metrics, error)
+
+                # Auch wenn laufend Ergebnisse kommen: hängende und
+                # abgestürzte Worker ersetzen
+                for index, worker in enumerate(workers):
+                    if worker.run_id is None:
+                        continue
+                    if timeout is not None and time.monotonic() - worker.started > timeout:
+                        worker.kill()
+                        record(worker, "timeout", error=f"Timeout nach {timeout} s")
+                    elif not worker.process.is_alive():
+                        record(worker, "crashed",
+                               error=f"Worker beendet mit Exitcode {worker.process.exitcode}")
+                    else:
+                        continue
+                    workers[index] = _Worker(context, worker.worker_id, result_queue)
+        finally:
+            for worker in workers:
+                worker.stop()
+            for worker in workers:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.kill()
+
+    return counts
+
+
+def main(argv=None):
+    """Kommandozeilen-Einstiegspunkt `particle-life-batch`."""
+    parser = argparse.ArgumentParser(
+        prog="particle-life-batch",
+        description="Führt eine Parameterstudie headless auf einem Prozess-Pool aus.")
+    parser.add_argument("spec", help="Sweep-Spezifikation (JSON)")
+    parser.add_argument("-o", "--output", default="results.jsonl",
+                        help="Ergebnisdatei im JSON-Lines-Format (wird angehängt)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Anzahl Worker-Prozesse (Default: alle Kerne)")
+    parser.add_argument("-t", "--timeout", type=float, default=None,
+                        help="Maximale Laufzeit pro Lauf in Sekunden")
+    args = parser.parse_args(argv)
+
+    with open(args.spec, encoding="utf-8") as f:
+        configs = expand_sweep(json.load(f))
+
+    print(f"=== Particle Life Batch: {len(configs)} Läufe -> {args.output} ===")
+    counts = run_sweep(configs, args.output, n_workers=args.workers, timeout=args.timeout)
+    print(", ".join(f"{status}: {n}" for status, n in counts.items()))
+
+    return 0 if counts["ok"] == len(configs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+Benchmark-Suite mit Regressionsvergleich.
+
+Gemessen wird ein Gitter aus Partikelzahl, Typenzahl, max_r und
+Kernel-Variante (Nachbarsuche x Threads). Jeder Fall läuft standardmäßig in
+einem frischen Prozess, damit JIT-Kompilierzeit und Speicher-Höchststand
+pro Fall sauber getrennt sind:
+
+    compile_s        Simulation.warmup() (JIT bzw. Laden aus dem Cache)
+    first_step_s     erster Schritt nach dem Warmup
+    step_*_ms        Perzentile der Dauer einzelner step()-Aufrufe
+    run_steps_per_s  Durchsatz von Simulation.run() (fusionierter Kernel)
+    peak_rss_mb      Speicher-Höchststand des Prozesses
+
+Aufruf:
+    particle-life-bench run -o bench.json [--quick] [--cold]
+    particle-life-bench compare baseline.json bench.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import sys
+import tempfile
+import time
+
+import numba
+import numpy as np
+
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+FORMAT_VERSION = 1
+
+# Kernel-Varianten: Name -> (neighbor_mode, n_threads); None = alle Threads
+KERNEL_VARIANTS = {
+    "brute": ("brute", 1),
+    "brute-parallel": ("brute", None),
+    "cells": ("cells", 1),
+    "cells-parallel": ("cells", None),
+    "verlet": ("verlet", 1),
+    "verlet-parallel": ("verlet", None),
+}
+
+DEFAULT_GRID = {
+    "n_particles": [1000, 5000],
+    "n_types": [4, 8],
+    "max_r": [0.05, 0.15],
+    "kernel": list(KERNEL_VARIANTS),
+}
+
+QUICK_GRID = {
+    "n_particles": [500],
+    "n_types": [4],
+    "max_r": [0.15],
+    "kernel": ["brute", "cells"],
+}
+
+# Kennzahlen für den Regressionsvergleich: Name -> True, wenn größer = schlechter
+COMPARED_METRICS = {
+    "step_p50_ms": True,
+    "step_p90_ms": True,
+    "run_steps_per_s": False,
+    "peak_rss_mb": True,
+}
+
+# Identifiziert einen Fall über Läufe hinweg
+CASE_KEYS = ("n_particles", "n_types", "max_r", "kernel")
+
+# Simulation.run() wird in so vielen Blöcken gemessen, berichtet wird der Median
+RUN_BLOCKS = 5
+
+POLL_INTERVAL = 0.2
+
+
+def expand_grid(grid):
+    """Kartesisches Produkt eines Gitters Parameter -> Werteliste."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _peak_rss_mb():
+    """Speicher-Höchststand des aktuellen Prozesses in MB (None, falls unbekannt)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: Kilobyte, macOS: Byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, steps=50, warmup_steps=3, seed=0):
+    """
+    Misst einen Fall im aktuellen Prozess.
+
+    Args:
+        case (dict): n_particles, n_types, max_r, kernel (siehe KERNEL_VARIANTS).
+        steps (int): Anzahl einzeln gemessener Schritte (und Schritte für run()).
+        warmup_steps (int): Schritte nach dem ersten, die nicht gemessen werden.
+        seed (int): Seed für den Anfangszustand.
+
+    Returns:
+        dict: Fall plus Kennzahlen.
+    """
+    if case["kernel"] not in KERNEL_VARIANTS:
+        raise ValueError(f"Unbekannte Kernel-Variante: {case['kernel']!r}")
+    neighbor_mode, n_threads = KERNEL_VARIANTS[case["kernel"]]
+
+    np.random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        particles = ParticleSystem(case["n_particles"], case["n_types"])
+        interactions = Interaction(case["n_types"])
+    interactions.matrix = np.random.uniform(-1.0, 1.0, (case["n_types"], case["n_types"]))
+    sim = Simulation(0.001, case["max_r"], 0.1, 0.0, particles, interactions,
+                     neighbor_mode=neighbor_mode, n_threads=n_threads)
+
+    # JIT-Kompilierung (bzw. Laden aus dem Cache) getrennt vom ersten Schritt
+    compile_time = sim.warmup()
+    start_time = time.perf_counter()
+    sim.step()
+    first_step = time.perf_counter() - start_time
+
+    for _ in range(warmup_steps):
+        sim.step()
+
+    durations = np.empty(steps)
+    for i in range(steps):
+        start_time = time.perf_counter()
+        sim.step()
+        durations[i] = time.perf_counter() - start_time
+
+    # Fusionierter Pfad: Median über Blöcke
+    block = max(1, steps // RUN_BLOCKS)
+    rates = []
+    for _ in range(RUN_BLOCKS):
+        start_time = time.perf_counter()
+        sim.run(block)
+        run_time = time.perf_counter() - start_time
+        rates.append(block / run_time if run_time > 0 else float("inf"))
+
+    p50, p90, p99 = np.percentile(durations, [50, 90, 99]) * 1000
+    # Verlet-Liste: Aufbauten pro Schritt und Listenspeicher
+    neighbor_metrics = {} if sim.neighbor_list is None else sim.neighbor_list.metrics()
+    return {
+        **case,
+        "n_threads": sim.n_threads,
+        "steps": steps,
+        "first_step_s": first_step,
+        "compile_s": compile_time,
+        "step_min_ms": float(durations.min() * 1000),
+        "step_mean_ms": float(durations.mean() * 1000),
+        "step_p50_ms": float(p50),
+        "step_p90_ms": float(p90),
+        "step_p99_ms": float(p99),
+        "run_steps_per_s": float(np.median(rates)),
+        "peak_rss_mb": _peak_rss_mb(),
+        **neighbor_metrics,
+    }
+
+
+def _case_main(case, options, result_queue):
+    """Einstiegspunkt des Mess-Prozesses."""
+    try:
+        result_queue.put(("ok", run_case(case, **options)))
+    except Exception as exc:
+        result_queue.put(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def _run_isolated(case, options, cold_cache=False, timeout=None):
+    """Führt run_case in einem frischen Prozess aus (spawn, wie batch.py)."""
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # spawn übernimmt os.environ zum Startzeitpunkt; leerer Cache = echte Kompilierung
+        saved = os.environ.get("NUMBA_CACHE_DIR")
+        if cold_cache:
+            os.environ["NUMBA_CACHE_DIR"] = cache_dir
+        try:
+            process = context.Process(target=_case_main, args=(case, options, result_queue),
+                                      daemon=True)
+            process.start()
+        finally:
+            if cold_cache:
+                if saved is None:
+                    del os.environ["NUMBA_CACHE_DIR"]
+                else:
+                    os.environ["NUMBA_CACHE_DIR"] = saved
+
+        started = time.monotonic()
+        try:
+            while True:
+                try:
+                    status, payload = result_queue.get(timeout=POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    if not process.is_alive():
+                        status, payload = "crashed", f"Exitcode {process.exitcode}"
+                        break
+                    if timeout is not None and time.monotonic() - started > timeout:
+                        status, payload = "timeout", f"Timeout nach {timeout} s"
+                        break
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+
+    if status != "ok":
+        raise RuntimeError(f"Benchmark {case} fehlgeschlagen ({status}): {payload}")
+    return payload
+
+
+def machine_info():
+    """Beschreibung der Umgebung, wird mit den Ergebnissen gespeichert."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "cpu_count": os.cpu_count(),
+        "numba_threads": numba.config.NUMBA_NUM_THREADS,
+        "jit_disabled": bool(numba.config.DISABLE_JIT),
+    }
+
+
+def run_benchmarks(grid=None, steps=50, warmup_steps=3, isolate=True, cold_cache=False,
+                   timeout=None, progress=None):
+    """
+    Führt alle Fälle eines Gitters aus.
+
+    Args:
+        grid (dict, optional): Parameter -> Werteliste. Default: DEFAULT_GRID.
+        steps (int): Gemessene Schritte pro Fall.
+        warmup_steps (int): Ungemessene Schritte nach dem ersten.
+        isolate (bool): Jeden Fall in einem eigenen Prozess messen. Ohne
+            Isolation ist compile_s nur für den ersten Fall je Variante
+            aussagekräftig und peak_rss_mb der Höchststand des Gesamtprozesses.
+        cold_cache (bool): Mit leerem Numba-Cache starten (nur mit isolate).
+        timeout (float, optional): Maximale Laufzeit pro Fall in Sekunden.
+        progress (callable, optional): progress(result) nach jedem Fall.
+
+    Returns:
+        dict: {"version", "created", "machine", "options", "results"}
+    """
+    if cold_cache and not isolate:
+        raise ValueError("cold_cache erfordert isolate=True")
+
+    options = {"steps": steps, "warmup_steps": warmup_steps}
+    results = []
+    for case in expand_grid(grid or DEFAULT_GRID):
+        if isolate:
+            result = _run_isolated(case, options, cold_cache=cold_cache, timeout=timeout)
+        else:
+            result = run_case(case, **options)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+
+    return {
+        "version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "options": {**options, "isolate": isolate, "cold_cache": cold_cache},
+        "results": results,
+    }
+
+
+def _case_id(result):
+    return tuple(result[key] for key in CASE_KEYS)
+
+
+def compare(baseline, current, threshold=0.1, metrics=None):
+    """
+    Vergleicht zwei Ergebnis-dicts fallweise.
+
+    Args:
+        baseline (dict): Gespeicherte Referenz (Ausgabe von run_benchmarks).
+        current (dict): Neue Messung.
+        threshold (float): Relative Verschlechterung, ab der eine Kennzahl
+            als Regression gilt (0.1 = 10 %).
+        metrics (dict, optional): Kennzahl -> größer ist schlechter.
+            Default: COMPARED_METRICS.
+
+    Returns:
+        list[dict]: Ein Eintrag pro verglichener Kennzahl mit "case",
+        "metric", "baseline", "current", "change" und "regression".
+    """
+    metrics = metrics or COMPARED_METRICS
+    reference = {_case_id(result): result for result in baseline["results"]}
+
+    rows = []
+    for result in current["results"]:
+        base = reference.get(_case_id(result))
+        if base is None:
+            continue
+        for metric, higher_is_worse in metrics.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old
+            worse = change if higher_is_worse else -change
+            rows.append({
+                "case": dict(zip(CASE_KEYS, _case_id(result))),
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": worse > threshold,
+            })
+    return rows
+
+
+def _format_case(case):
+    return (f"N={case['n_particles']:>6} T={case['n_types']:>2} "
+            f"r={case['max_r']:<5g} {case['kernel']:<15}")
+
+
+def _print_result(result):
+    print(f"{_format_case(result)} | p50 {result['step_p50_ms']:8.3f} ms | "
+          f"p99 {result['step_p99_ms']:8.3f} ms | run {result['run_steps_per_s']:9.1f}/s | "
+          f"compile {result['compile_s']:6.2f} s | rss {result['peak_rss_mb'] or 0:7.1f} MB")
+
+
+def main(argv=None):
+    """Kommandozeilen-Einstiegspunkt `particle-life-bench`."""
+    parser = argparse.ArgumentParser(
+        prog="particle-life-bench",
+        description="Benchmark-Suite und Regressionsvergleich für die Kraft-Kernel.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmarks ausführen")
+    run_parser.add_argument("-o", "--output", default="bench.json", help="Ergebnisdatei (JSON)")
+    run_parser.add_argument("--grid", help="Eigenes Gitter als JSON-Datei")
+    run_parser.add_argument("--quick", action="store_true", help="Kleines Gitter (Smoke-Test)")
+    run_parser.add_argument("--steps", type=int, default=50, help="Gemessene Schritte pro Fall")
+    run_parser.add_argument("--cold", action="store_true",
+                            help="Mit leerem Numba-Cache messen (echte Kompilierzeit)")
+    run_parser.add_argument("--in-process", action="store_true",
+                            help="Alle Fälle im selben Prozess messen (schneller, ungenauer)")
+    run_parser.add_argument("--timeout", type=float, default=None,
+                            help="Maximale Laufzeit pro Fall in Sekunden")
+
+    compare_parser = commands.add_parser("compare", help="Gegen eine Baseline vergleichen")
+    compare_parser.add_argument("baseline", help="Referenz-Ergebnisdatei")
+    compare_parser.add_argument("current", help="Neue Ergebnisdatei")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Erlaubte relative Verschlechterung (Default: 0.1)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.grid:
+            with open(args.grid, encoding="utf-8") as f:
+                grid = json.load(f)
+        else:
+            grid = QUICK_GRID if args.quick else DEFAULT_GRID
+        n_cases = len(expand_grid(grid))
+        print(f"=== Particle Life Benchmark: {n_cases} Fälle -> {args.output} ===")
+        report = run_benchmarks(grid, steps=args.steps, isolate=not args.in_process,
+                                cold_cache=args.cold, timeout=args.timeout,
+                                progress=_print_result)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline["machine"] != current["machine"]:
+        print("Warnung: Baseline stammt von einer anderen Umgebung")
+
+    rows = compare(baseline, current, threshold=args.threshold)
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{_format_case(row['case'])} | {row['metric']:<16} | {row['baseline']:10.3f} -> "
+              f"{row['current']:10.3f} ({row['change']:+7.1%}) {flag}")
+    print(f"{len(regressions)} Regression(en) bei Schwelle {args.threshold:.0%} "
+          f"({len(rows)} Kennzahlen verglichen)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+Gebietszerlegung über mehrere Worker-Prozesse (Shared Memory).
+
+Ein paralleler Numba-Kernel bleibt in einem Prozess. Für sehr große Systeme
+wird der Torus hier in W senkrechte Streifen (Slabs) der Breite 1 / W
+zerlegt, einer pro Worker-Prozess. Jeder Worker hält die Partikel seines
+Streifens in einem eigenen multiprocessing.shared_memory-Block, den er
+selbst anlegt und beschreibt; bei First-Touch-Zuteilung liegt der Speicher
+damit auf dem NUMA-Knoten des Workers (optional an einen Kern gepinnt).
+
+Ein Schritt (Euler bzw. semi-implizites Euler) läuft in drei Phasen,
+getrennt durch eine gemeinsame Barriere:
+    1. Halo: Partikel der Nachbarstreifen mit x-Abstand <= max_r zum
+       eigenen Streifen werden direkt aus deren Blöcken gelesen, danach
+       werden die Kräfte auf die eigenen Partikel berechnet.
+    2. Integration der eigenen Partikel; wer den Streifen verlässt, wird in
+       den Ausgangspuffer des Workers geschrieben.
+    3. Migration: jeder Worker übernimmt die für ihn bestimmten Partikel
+       aus den Ausgangspuffern der anderen.
+
+Der Noise hängt nur von (Seed, Schritt, Partikel-ID) ab, die Ergebnisse
+stimmen daher bis auf die Summationsreihenfolge der Kräfte mit einer
+einzelnen Simulation überein.
+
+Verwendung:
+    with DistributedSimulation(sim, n_workers=8) as distributed:
+        distributed.run(1000)
+        distributed.write_back(sim)
+"""
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+from numba import jit
+
+from particle_life_simulator.forces import (
+    DETERMINISTIC_FASTMATH,
+    MAX_CELLS_PER_AXIS,
+    build_cell_list,
+    particle_force,
+    particle_force_cells,
+)
+from particle_life_simulator.integrators import drift, kick
+
+# Integratoren, deren Schritt nur aus Kräften, kick und drift besteht
+DISTRIBUTED_INTEGRATORS = ("euler", "semi_implicit_euler")
+
+# Ausrichtung der Arrays im Shared-Memory-Block (Cache-Zeile)
+_ALIGNMENT = 64
+
+
+class SharedArrays:
+    """Mehrere benannte Arrays in einem gemeinsamen SharedMemory-Block."""
+
+    def __init__(self, shm, fields):
+        self.shm = shm
+        self.fields = fields
+        self.arrays = {}
+        offset = 0
+        for name, (shape, dtype) in fields.items():
+            dtype = np.dtype(dtype)
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            offset += _aligned_size(shape, dtype)
+
+    @classmethod
+    def create(cls, fields):
+        """
+        Legt einen neuen Block an.
+
+        Args:
+            fields (dict): Name -> (shape, dtype).
+        """
+        size = sum(_aligned_size(shape, np.dtype(dtype)) for shape, dtype in fields.values())
+        return cls(shared_memory.SharedMemory(create=True, size=max(size, 1)), fields)
+
+    @classmethod
+    def attach(cls, name, fields):
+        """Blendet einen bestehenden Block (aus einem anderen Prozess) ein."""
+        return cls(shared_memory.SharedMemory(name=name), fields)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def close(self):
+        """Löst die Arrays vom Block (der Block selbst bleibt bestehen)."""
+        self.arrays = {}
+        self.shm.close()
+
+    def unlink(self):
+        """Gibt den Block frei (nur einmal, vom Besitzer)."""
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _aligned_size(shape, dtype):
+    size = int(np.prod(shape)) * dtype.itemsize
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _state_fields(n, dtype, types_dtype, prefix=""):
+    return {
+        prefix + "positions": ((n, 2), dtype),
+        prefix + "velocities": ((n, 2), dtype),
+        prefix + "accelerations": ((n, 2), dtype),
+        prefix + "types": ((n,), types_dtype),
+        prefix + "ids": ((n,), np.int64),
+    }
+
+
+def _worker_fields(capacity, dtype, types_dtype):
+    """Eigene Partikel plus Ausgangspuffer für abwandernde Partikel."""
+    return {
+        "count": ((1,), np.int64),
+        **_state_fields(capacity, dtype, types_dtype),
+        "out_count": ((1,), np.int64),
+        **_state_fields(capacity, dtype, types_dtype, prefix="out_"),
+        "out_dest": ((capacity,), np.int64),
+    }
+
+
+_STATE = ("positions", "velocities", "accelerations", "types", "ids")
+
+
+def slab_owner(x, n_workers):
+    """Worker, dem die x-Koordinaten gehören (Streifen der Breite 1 / n_workers)."""
+    return np.minimum((np.asarray(x) * n_workers).astype(np.int64), n_workers - 1)
+
+
+def slab_distance(x, lo, hi):
+    """x-Abstand auf dem Torus von Punkten außerhalb des Streifens [lo, hi) zum Streifen."""
+    return np.minimum((lo - x) % 1.0, (x - hi) % 1.0)
+
+
+@jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)
+def owned_forces(positions, types, table, max_r, forces, n_owned, n_cells):
+    """
+    Kräfte auf die ersten n_owned Partikel; die übrigen (Halo) wirken nur
+    als Quellen. n_cells < 3 = O(N²) über alle lokalen Partikel.
+    """
+    if n_cells >= 3:
+        cell_start, cell_particles = build_cell_list(positions, n_cells)
+        for i in range(n_owned):
+            fx, fy = particle_force_cells(i, positions, types, table, max_r, cell_start,
+                                          cell_particles, n_cells)
+            forces[i, 0] = fx
+            forces[i, 1] = fy
+    else:
+        for i in range(n_owned):
+            fx, fy = particle_force(i, positions, types, table, max_r)
+            forces[i, 0] = fx
+            forces[i, 1] = fy
+
+
+class _SlabWorker:
+    """Zustand und Schritt eines Workers (läuft im Worker-Prozess)."""
+
+    def __init__(self, rank, n_workers, params, block, barrier):
+        self.rank = rank
+        self.n_workers = n_workers
+        self.params = params
+        self.block = block
+        self.barrier = barrier
+        self.lo = rank / n_workers
+        self.hi = (rank + 1) / n_workers
+        self.blocks = {}
+        # Nachbarstreifen, aus denen Halo-Partikel kommen können
+        self.neighbors = sorted({(rank - 1) % n_workers, (rank + 1) % n_workers} - {rank})
+
+    def connect(self, names, fields):
+        """Blendet die Blöcke aller anderen Worker ein."""
+        self.blocks = {rank: SharedArrays.attach(name, fields)
+                       for rank, name in enumerate(names) if rank != self.rank}
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+        self.blocks = {}
+
+    def _halo(self):
+        positions, types = [], []
+        for rank in self.neighbors:
+            block = self.blocks[rank]
+            count = int(block["count"][0])
+            other = block["positions"][:count]
+            near = slab_distance(other[:, 0], self.lo, self.hi) <= self.params["max_r"]
+            positions.append(other[near])
+            types.append(block["types"][:count][near])
+        return positions, types
+
+    def step(self, step):
+        params = self.params
+        block = self.block
+        n = int(block["count"][0])
+        positions = block["positions"][:n]
+        velocities = block["velocities"][:n]
+        accelerations = block["accelerations"][:n]
+        ids = block["ids"][:n]
+
+        # 1. Halo lesen, Kräfte auf die eigenen Partikel
+        halo_positions, halo_types = self._halo()
+        local_positions = np.concatenate([positions] + halo_positions)
+        local_types = np.concatenate([block["types"][:n]] + halo_types)
+        owned_forces(local_positions, local_types, params["table"], params["max_r"],
+                     accelerations, n, params["n_cells"])
+        self.barrier.wait()
+
+        # 2. Integrieren, Abwanderer in den Ausgangspuffer
+        dt = params["dt"]
+        if params["integrator"] == "euler":
+            drift(positions, velocities, dt)
+        kick(velocities, accelerations, dt, params["friction"], params["noise_strength"],
+             params["seed"], step, ids)
+        if params["integrator"] == "semi_implicit_euler":
+            drift(positions, velocities, dt)
+
+        owner = slab_owner(positions[:, 0], self.n_workers)
+        leaving = owner != self.rank
+        n_out = int(np.count_nonzero(leaving))
+        if n_out:
+            for name in _STATE:
+                block["out_" + name][:n_out] = block[name][:n][leaving]
+            block["out_dest"][:n_out] = owner[leaving]
+            staying = ~leaving
+            n_stay = n - n_out
+            for name in _STATE:
+                block[name][:n_stay] = block[name][:n][staying]
+            n = n_stay
+        block["out_count"][0] = n_out
+        block["count"][0] = n
+        self.barrier.wait()
+
+        # 3. Zuwanderer aus den Ausgangspuffern der anderen übernehmen
+        for other in self.blocks.values():
+            n_in = int(other["out_count"][0])
+            if not n_in:
+                continue
+            arriving = other["out_dest"][:n_in] == self.rank
+            k = int(np.count_nonzero(arriving))
+            if not k:
+                continue
+            if n + k > len(block["ids"]):
+                raise RuntimeError(f"Worker {self.rank}: Kapazität {len(block['ids'])} "
+                                   f"überschritten (capacity_factor erhöhen)")
+            for name in _STATE:
+                block[name][n:n + k] = other["out_" + name][:n_in][arriving]
+            n += k
+        block["count"][0] = n
+        self.barrier.wait()
+
+
+def _worker_main(rank, n_workers, params, source_name, source_fields, capacity, barrier,
+                 conn, pin):
+    """Einstiegspunkt eines Worker-Prozesses."""
+    block = None
+    worker = None
+    try:
+        if pin and hasattr(os, "sched_setaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+            os.sched_setaffinity(0, {cpus[rank % len(cpus)]})
+
+        # Eigene Partikel aus dem Startzustand kopieren: der Worker beschreibt
+        # seinen Block als erster (First Touch)
+        source = SharedArrays.attach(source_name, source_fields)
+        fields = _worker_fields(capacity, source["positions"].dtype, source["types"].dtype)
+        block = SharedArrays.create(fields)
+        mine = np.flatnonzero(slab_owner(source["positions"][:, 0], n_workers) == rank)
+        if len(mine) > capacity:
+            raise RuntimeError(f"Worker {rank}: {len(mine)} Partikel, Kapazität {capacity}")
+        for name in _STATE:
+            block[name][:len(mine)] = source[name][mine]
+        block["count"][0] = len(mine)
+        block["out_count"][0] = 0
+        source.close()
+
+        worker = _SlabWorker(rank, n_workers, params, block, barrier)
+        conn.send(("ok", block.name))
+
+        while True:
+            command, arg = conn.recv()
+            if command == "stop":
+                break
+            try:
+                if command == "connect":
+                    worker.connect(arg, fields)
+                elif command == "run":
+                    start, n_steps = arg
+                    for step in range(start, start + n_steps):
+                        worker.step(step)
+                conn.send(("ok", None))
+            except Exception:
+                # Die anderen Worker nicht an der Barriere hängen lassen
+                barrier.abort()
+                conn.send(("error", traceback.format_exc()))
+    except Exception:
+        barrier.abort()
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        if worker is not None:
+            worker.close()
+        if block is not None:
+            block.close()
+            block.unlink()
+
+
+class DistributedSimulation:
+    """
+    Rechnet den Zustand einer Simulation verteilt auf n_workers Prozesse.
+
+    Parameter, Regeln, Seed und Schrittzähler werden beim Anlegen aus der
+    Simulation übernommen; die Simulation selbst bleibt unverändert, bis
+    write_back() aufgerufen wird.
+    """
+
+    def __init__(self, simulation, n_workers=None, capacity_factor=2.0, pin_workers=False):
+        """
+        Args:
+            simulation (Simulation): Ausgangszustand und Parameter.
+            n_workers (int, optional): Anzahl der Worker-Prozesse (Default:
+                alle Kerne, höchstens 1 / max_r, da ein Streifen mindestens
+                max_r breit sein muss).
+            capacity_factor (float): Platz pro Worker als Vielfaches des
+                Mittelwerts N / n_workers (Reserve für ungleiche Dichte).
+            pin_workers (bool): Worker w an Kern w binden (Linux).
+        """
+        max_slabs = max(int(1.0 / simulation.max_r), 1)
+        if n_workers is None:
+            n_workers = min(os.cpu_count() or 1, max_slabs)
+        if not 1 <= n_workers <= max_slabs:
+            raise ValueError(f"n_workers muss zwischen 1 und {max_slabs} liegen "
+                             f"(Streifenbreite >= max_r), nicht {n_workers}")
+        if simulation.integrator.name not in DISTRIBUTED_INTEGRATORS:
+            raise ValueError(f"Integrator {simulation.integrator.name!r} wird nicht unterstützt "
+                             f"(verfügbar: {', '.join(DISTRIBUTED_INTEGRATORS)})")
+
+        particles = simulation.particles
+        n_particles = len(particles.positions)
+        self.n_workers = n_workers
+        self.n_particles = n_particles
+        self.step_count = simulation.step_count
+        self.capacity = min(n_particles, int(capacity_factor * n_particles / n_workers) + 64)
+        self.params = {
+            "dt": simulation.dt,
+            "max_r": simulation.max_r,
+            "friction": simulation.friction,
+            "noise_strength": simulation.noise_strength,
+            "seed": simulation.seed,
+            "integrator": simulation.integrator.name,
+            "table": simulation.force_table(),
+            "n_cells": min(int(1.0 / simulation.max_r), MAX_CELLS_PER_AXIS),
+        }
+
+        self._processes = []
+        self._connections = []
+
+        # Startzustand in einen gemeinsamen Block, aus dem sich die Worker bedienen
+        dtype = particles.positions.dtype
+        types_dtype = particles.types.dtype
+        source_fields = _state_fields(n_particles, dtype, types_dtype)
+        source = SharedArrays.create(source_fields)
+        try:
+            source["positions"][:] = particles.positions
+            source["velocities"][:] = particles.velocities
+            source["accelerations"][:] = particles.accelerations
+            source["types"][:] = particles.types
+            ids = simulation.noise_ids()
+            source["ids"][:] = np.arange(n_particles) if len(ids) == 0 else ids
+
+            # spawn statt fork: Numba-Threadpools überleben fork nicht zuverlässig
+            context = multiprocessing.get_context("spawn")
+            barrier = context.Barrier(n_workers)
+            for rank in range(n_workers):
+                parent_conn, child_conn = context.Pipe()
+                process = context.Process(
+                    target=_worker_main,
+                    args=(rank, n_workers, self.params, source.name, source_fields,
+                          self.capacity, barrier, child_conn, pin_workers),
+                    daemon=True)
+                process.start()
+                child_conn.close()
+                self._processes.append(process)
+                self._connections.append(parent_conn)
+
+            names = self._collect()
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            source.close()
+            source.unlink()
+
+        fields = _worker_fields(self.capacity, dtype, types_dtype)
+        self._blocks = [SharedArrays.attach(name, fields) for name in names]
+        self._broadcast("connect", names)
+
+    def _collect(self):
+        """Wartet auf die Antworten aller Worker; Fehler werden weitergereicht."""
+        results, errors = [], []
+        for rank, conn in enumerate(self._connections):
+            try:
+                status, value = conn.recv()
+            except EOFError:
+                status, value = "error", f"Worker {rank} beendet"
+            if status == "error":
+                errors.append(value)
+            results.append(value)
+        if errors:
+            # Fehlerhafte Barriere: die Prozesse sind nicht mehr benutzbar
+            self.close()
+            raise RuntimeError("Fehler im Worker-Prozess:\n" + errors[0])
+        return results
+
+    def _broadcast(self, command, arg=None):
+        for conn in self._connections:
+            conn.send((command, arg))
+        return self._collect()
+
+    def run(self, n_steps):
+        """Führt n_steps Schritte auf allen Workern aus."""
+        if not self._connections:
+            raise RuntimeError("DistributedSimulation ist bereits geschlossen")
+        if n_steps > 0:
+            self._broadcast("run", (self.step_count, n_steps))
+            self.step_count += n_steps
+
+    def step(self):
+        self.run(1)
+
+    def counts(self):
+        """Anzahl der Partikel pro Worker (Lastverteilung)."""
+        return np.array([int(block["count"][0]) for block in self._blocks])
+
+    def gather(self):
+        """
+        Aktueller Gesamtzustand, nach Partikel-ID sortiert.
+
+        Returns:
+            dict: positions, velocities, accelerations, types, ids.
+        """
+        counts = self.counts()
+        state = {name: np.concatenate([block[name][:count]
+                                       for block, count in zip(self._blocks, counts)])
+                 for name in _STATE}
+        order = np.argsort(state["ids"], kind="stable")
+        return {name: array[order] for name, array in state.items()}
+
+    def write_back(self, simulation):
+        """Schreibt Zustand und Schrittzähler in die Ausgangs-Simulation zurück."""
+        state = self.gather()
+        particles = simulation.particles
+        ids = simulation.noise_ids()
+        slots = np.arange(self.n_particles) if len(ids) == 0 else ids
+        particles.positions[:] = state["positions"][slots]
+        particles.velocities[:] = state["velocities"][slots]
+        particles.accelerations[:] = state["accelerations"][slots]
+        simulation.step_count = self.step_count
+
+    def close(self):
+        """Beendet die Worker und gibt die Shared-Memory-Blöcke frei."""
+        for block in getattr(self, "_blocks", []):
+            block.close()
+        self._blocks = []
+        for conn, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    conn.send(("stop", None))
+                except (BrokenPipeError, OSError):
+                    pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,372 @@
+"""
+Ensemble-Simulation: viele unabhängige kleine Welten in einem Kernel-Aufruf.
+
+Für Statistiken über Interaktionsmatrizen und Seeds werden oft hunderte
+Welten mit wenigen hundert Partikeln gerechnet. Als einzelne Simulationen
+kostet jede davon Python- und Dispatch-Overhead pro Aufruf, und ein Kern
+rechnet nur eine kleine Welt. EnsembleSimulation stapelt B Welten gleicher
+Größe in Arrays (B, N, 2) und verteilt sie per prange auf die Threads; jede
+Welt rechnet dabei alle n_steps Schritte am Stück mit denselben
+fusionierten Kerneln wie Simulation.run().
+
+Verwendung:
+    ensemble = EnsembleSimulation.create(256, 300, 4, seed=0,
+                                         friction=np.linspace(0.05, 0.5, 256))
+    ensemble.run(1000)
+    metrics = ensemble.metrics()   # je Kennzahl ein Array (B,)
+"""
+import contextlib
+import io
+import types
+
+import numba
+import numpy as np
+from numba import jit, prange
+
+from particle_life_simulator.forces import (
+    MAX_CELLS_PER_AXIS,
+    compute_forces,
+    compute_forces_cells,
+    select_force_kernel,
+)
+from particle_life_simulator.integrators import (
+    fused_kernel,
+    run_euler,
+    run_semi_implicit_euler,
+    run_velocity_verlet,
+    source_fingerprint,
+)
+from particle_life_simulator.interaction import Interaction, build_force_table, check_force_profile
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.rng import counter_uniform, resolve_seed
+from particle_life_simulator.simulation import (
+    CELL_LIST_MIN_PARTICLES,
+    NEIGHBOR_MODES,
+    Simulation,
+)
+
+# Integrator-Name -> Vorlage des fusionierten Mehrschritt-Kernels
+ENSEMBLE_RUNS = {
+    "euler": run_euler,
+    "semi_implicit_euler": run_semi_implicit_euler,
+    "verlet": run_velocity_verlet,
+}
+
+# Platzhalter, pro Integrator durch die fusionierten Kernel ersetzt
+RUN_BRUTE = None
+RUN_CELLS = None
+
+# Leere ID-Liste: Slot = ID in allen Welten (Noise-Schlüssel, siehe rng)
+_NO_IDS = np.empty(0, dtype=np.int64)
+
+_ENSEMBLE_KERNELS = {}
+
+
+def run_ensemble(positions, velocities, accelerations, types, tables, max_r, dt, friction,
+                 noise_strength, seeds, step, ids, n_cells, n_steps):
+    """Jede Welt b rechnet n_steps Schritte; die Welten laufen parallel."""
+    for b in prange(len(positions)):
+        if n_cells[b] > 0:
+            RUN_CELLS(positions[b], velocities[b], accelerations[b], types[b], tables[b],
+                      max_r[b], dt, friction[b], noise_strength, seeds[b], step, ids,
+                      n_cells[b], n_steps)
+        else:
+            RUN_BRUTE(positions[b], velocities[b], accelerations[b], types[b], tables[b],
+                      max_r[b], dt, friction[b], noise_strength, seeds[b], step, ids, 0,
+                      n_steps)
+
+
+def ensemble_kernel(run_func):
+    """
+    Kompiliert run_ensemble für einen Integrator (siehe ENSEMBLE_RUNS),
+    cachebar wie integrators.fused_kernel. Innerhalb einer Welt wird seriell
+    gerechnet, parallelisiert wird über die Welten.
+    """
+    kernel = _ENSEMBLE_KERNELS.get(run_func)
+    if kernel is None:
+        fingerprint = source_fingerprint(run_func, compute_forces, compute_forces_cells,
+                                         counter_uniform)
+        name = f"run_ensemble__{run_func.__name__}__{fingerprint}"
+        bound = {**run_ensemble.__globals__,
+                 "RUN_BRUTE": fused_kernel(run_func, compute_forces),
+                 "RUN_CELLS": fused_kernel(run_func, compute_forces_cells)}
+        func = types.FunctionType(run_ensemble.__code__, bound, name)
+        func.__qualname__ = name
+        func.__doc__ = run_ensemble.__doc__
+        kernel = _ENSEMBLE_KERNELS[run_func] = jit(nopython=True, nogil=True, parallel=True,
+                                                   cache=True)(func)
+    return kernel
+
+
+class EnsembleSimulation:
+    """
+    B unabhängige Welten mit je N Partikeln und T Typen.
+
+    Pro Welt: eigene Interaktionsmatrix (und Paar-Radien), Reibung, Radius
+    und Noise-Seed; dt, Noise-Stärke, Kraftprofil, Integrator und
+    Nachbarsuche gelten für alle Welten.
+    Da der Noise zählerbasiert ist (siehe rng), ist das Ergebnis unabhängig
+    von der Thread-Anzahl.
+    """
+
+    def __init__(self, positions, types, matrices, dt=0.001, max_r=0.15, friction=0.1,
+                 noise_strength=0.0, velocities=None, neighbor_mode="auto", n_threads=None,
+                 integrator="semi_implicit_euler", seeds=None, profile="linear", core=0.0,
+                 repulsion=1.0, radii=None):
+        """
+        Args:
+            positions (np.ndarray): Startpositionen (B, N, 2).
+            types (np.ndarray): Typen (B, N).
+            matrices (np.ndarray): Interaktionsmatrizen (B, T, T).
+            max_r, friction (float oder np.ndarray): global oder pro Welt (B,).
+            velocities (np.ndarray, optional): (B, N, 2), Default: Stillstand.
+            neighbor_mode: wie bei Simulation ohne "verlet", pro Welt anhand
+                von max_r entschieden.
+            n_threads: Threads für die Welten (None = alle Kerne).
+            integrator (str): "euler", "semi_implicit_euler" oder "verlet".
+            seeds (np.ndarray, optional): Noise-Seed pro Welt (B,), Default:
+                aus np.random gezogen.
+            profile, core, repulsion: Kraftprofil wie bei Interaction.
+            radii (np.ndarray, optional): Paar-Radien (T, T) oder (B, T, T)
+                als Anteil von max_r.
+        """
+        if neighbor_mode not in NEIGHBOR_MODES:
+            raise ValueError(f"Unbekannter neighbor_mode: {neighbor_mode!r}")
+        if neighbor_mode == "verlet":
+            # Eine Liste pro Welt lohnt bei den kleinen Welten eines Ensembles nicht
+            raise ValueError("neighbor_mode='verlet' wird von EnsembleSimulation nicht "
+                             "unterstützt (auto, brute oder cells verwenden)")
+        if integrator not in ENSEMBLE_RUNS:
+            raise ValueError(f"Unbekannter Integrator: {integrator!r} "
+                             f"(verfügbar: {', '.join(ENSEMBLE_RUNS)})")
+
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64)
+        n_worlds, n_particles = self.positions.shape[:2]
+        self.types = np.ascontiguousarray(types, dtype=np.int64)
+        self.matrices = np.ascontiguousarray(matrices, dtype=np.float64)
+        if self.types.shape != (n_worlds, n_particles):
+            raise ValueError(f"types hat Form {self.types.shape}, erwartet "
+                             f"{(n_worlds, n_particles)}")
+        if self.matrices.ndim != 3 or len(self.matrices) != n_worlds:
+            raise ValueError(f"matrices hat Form {self.matrices.shape}, erwartet (B, T, T)")
+
+        check_force_profile(profile, core, repulsion)
+        self.profile = profile
+        self.core = core
+        self.repulsion = repulsion
+        self.radii = None if radii is None else np.broadcast_to(
+            np.asarray(radii, dtype=np.float64), self.matrices.shape).copy()
+        self._tables = None
+        self._tables_key = None
+        self._tables_matrices = None
+        self._tables_radii = None
+
+        if velocities is None:
+            self.velocities = np.zeros_like(self.positions)
+        else:
+            self.velocities = np.ascontiguousarray(velocities, dtype=np.float64)
+        self.accelerations = np.zeros_like(self.positions)
+
+        self.dt = dt
+        self.max_r = np.broadcast_to(np.asarray(max_r, dtype=np.float64), (n_worlds,)).copy()
+        self.friction = np.broadcast_to(np.asarray(friction, dtype=np.float64),
+                                        (n_worlds,)).copy()
+        self.noise_strength = noise_strength
+        if seeds is None:
+            seeds = [resolve_seed() for _ in range(n_worlds)]
+        self.seeds = np.asarray(seeds, dtype=np.int64)
+        if self.seeds.shape != (n_worlds,):
+            raise ValueError(f"seeds hat Form {self.seeds.shape}, erwartet ({n_worlds},)")
+        self.neighbor_mode = neighbor_mode
+        self.n_threads = numba.config.NUMBA_NUM_THREADS if n_threads is None else n_threads
+        self.integrator = integrator
+
+        self.step_count = 0
+        self._primed = False
+
+    @classmethod
+    def create(cls, n_worlds, n_particles, n_types, seed=None, matrices=None, **kwargs):
+        """
+        Erzeugt B zufällige Welten (gleichverteilte Positionen und Typen,
+        Matrizen gleichverteilt in [-1, 1], falls nicht angegeben).
+
+        Args:
+            seed (int, optional): Seed für Startzustand, Matrizen und die
+                Noise-Seeds der Welten (None = aus np.random gezogen).
+            **kwargs: weitere Argumente für EnsembleSimulation.
+        """
+        rng = np.random.default_rng(resolve_seed(seed))
+        positions = rng.random((n_worlds, n_particles, 2))
+        types = rng.integers(0, n_types, size=(n_worlds, n_particles))
+        if matrices is None:
+            matrices = rng.uniform(-1.0, 1.0, (n_worlds, n_types, n_types))
+        kwargs.setdefault("seeds", rng.integers(0, 2**63 - 1, size=n_worlds))
+        return cls(positions, types, matrices, **kwargs)
+
+    @classmethod
+    def from_simulations(cls, simulations, n_threads=None):
+        """
+        Stapelt den Zustand gleich großer Simulationen (Kopie). dt, Noise,
+        Kraftprofil, Nachbarsuche und Integrator werden von der ersten
+        übernommen.
+        """
+        first = simulations[0]
+        integrator = first.integrator.name
+        rules = first.interaction
+        radii = None
+        if any(getattr(s.interaction, "radii", None) is not None for s in simulations):
+            radii = np.stack([np.ones(s.interaction.matrix.shape)
+                              if getattr(s.interaction, "radii", None) is None
+                              else s.interaction.radii for s in simulations])
+        ensemble = cls(np.stack([s.particles.positions for s in simulations]),
+                       np.stack([s.particles.types for s in simulations]),
+                       np.stack([s.interaction.matrix for s in simulations]),
+                       dt=first.dt, max_r=[s.max_r for s in simulations],
+                       friction=[s.friction for s in simulations],
+                       noise_strength=first.noise_strength,
+                       velocities=np.stack([s.particles.velocities for s in simulations]),
+                       neighbor_mode=first.neighbor_mode, n_threads=n_threads,
+                       integrator=integrator, seeds=[s.seed for s in simulations],
+                       profile=getattr(rules, "profile", "linear"),
+                       core=getattr(rules, "core", 0.0),
+                       repulsion=getattr(rules, "repulsion", 1.0), radii=radii)
+        ensemble.step_count = first.step_count
+        if integrator == "verlet" and all(s.integrator.state_dict()["primed"]
+                                          for s in simulations):
+            ensemble.accelerations[:] = np.stack([s.particles.accelerations for s in simulations])
+            ensemble._primed = True
+        return ensemble
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def n_particles(self):
+        return self.positions.shape[1]
+
+    def force_tables(self):
+        """
+        Kraft-Tabellen aller Welten (B, T, T, K), siehe
+        interaction.build_force_table. Wie bei Interaction.force_table werden
+        nach Änderungen an matrices oder radii nur die geänderten Paare neu
+        berechnet, nach Änderungen an profile, core oder repulsion alle.
+        """
+        radii = np.ones(self.matrices.shape) if self.radii is None else self.radii
+        key = (self.profile, self.core, self.repulsion, self.matrices.shape)
+
+        if self._tables is None or key != self._tables_key or radii.shape != self.matrices.shape:
+            self._tables = build_force_table(self.matrices, self.profile, radii, self.core,
+                                             self.repulsion)
+            self._tables_key = key
+            self._tables_matrices = self.matrices.copy()
+            self._tables_radii = np.array(radii, dtype=np.float64)
+            return self._tables
+
+        changed = (self.matrices != self._tables_matrices) | (radii != self._tables_radii)
+        if changed.any():
+            build_force_table(self.matrices, self.profile, radii, self.core,
+                              self.repulsion, self._tables.shape[-1] - 1, out=self._tables,
+                              mask=changed)
+            self._tables_matrices[changed] = self.matrices[changed]
+            self._tables_radii[changed] = radii[changed]
+        return self._tables
+
+    def cells_per_axis(self):
+        """Zellen pro Achse je Welt (B,), 0 = O(N²)-Kernel; wie Simulation.uses_cell_list."""
+        cells = np.minimum((1.0 / self.max_r).astype(np.int64), MAX_CELLS_PER_AXIS)
+        if self.neighbor_mode == "brute" or (self.neighbor_mode == "auto" and
+                                             self.n_particles < CELL_LIST_MIN_PARTICLES):
+            return np.zeros(len(self), dtype=np.int64)
+        return np.where(cells >= 3, cells, 0)
+
+    def world(self, index):
+        """
+        Simulation der Welt index auf Sichten in die Ensemble-Arrays (ohne
+        Kopie), z.B. zum Anzeigen oder zum Vergleich mit einem Einzellauf.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            particles = ParticleSystem.from_arrays(self.positions[index], self.velocities[index],
+                                                   self.types[index], self.accelerations[index],
+                                                   n_types=self.matrices.shape[1])
+        sim = Simulation(self.dt, float(self.max_r[index]), float(self.friction[index]),
+                         self.noise_strength, particles,
+                         Interaction.from_matrix(
+                             self.matrices[index], self.profile, self.core, self.repulsion,
+                             None if self.radii is None else self.radii[index]),
+                         neighbor_mode=self.neighbor_mode, n_threads=1,
+                         integrator=self.integrator, seed=int(self.seeds[index]))
+        sim.step_count = self.step_count
+        if self.integrator == "verlet":
+            sim.integrator.load_state_dict({"primed": self._primed})
+        return sim
+
+    def select(self, indices):
+        """
+        Neues Ensemble aus den Welten indices (Kopie), das an derselben
+        Stelle weiterrechnet, z.B. um nur noch ausgewählte Welten fortzusetzen.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        ensemble = type(self)(self.positions[indices], self.types[indices],
+                              self.matrices[indices], dt=self.dt, max_r=self.max_r[indices],
+                              friction=self.friction[indices],
+                              noise_strength=self.noise_strength,
+                              velocities=self.velocities[indices],
+                              neighbor_mode=self.neighbor_mode, n_threads=self.n_threads,
+                              integrator=self.integrator, seeds=self.seeds[indices],
+                              profile=self.profile, core=self.core, repulsion=self.repulsion,
+                              radii=None if self.radii is None else self.radii[indices])
+        ensemble.accelerations[:] = self.accelerations[indices]
+        ensemble.step_count = self.step_count
+        ensemble._primed = self._primed
+        return ensemble
+
+    def _prime(self, n_cells):
+        """Velocity-Verlet braucht vor dem ersten Schritt die Kräfte a(t)."""
+        tables = self.force_tables()
+        for b in range(len(self)):
+            kernel = select_force_kernel(n_cells[b], False)
+            kernel(self.positions[b], self.types[b], tables[b], self.max_r[b],
+                   self.accelerations[b], n_cells[b])
+        self._primed = True
+
+    def run(self, n_steps):
+        """Bringt alle Welten um n_steps Schritte voran (ein Kernel-Aufruf)."""
+        n_cells = self.cells_per_axis()
+        if self.integrator == "verlet" and not self._primed:
+            self._prime(n_cells)
+
+        numba.set_num_threads(self.n_threads)
+        ensemble_kernel(ENSEMBLE_RUNS[self.integrator])(
+            self.positions, self.velocities, self.accelerations, self.types,
+            self.force_tables(), self.max_r, self.dt, self.friction, self.noise_strength,
+            self.seeds, self.step_count, _NO_IDS, n_cells, n_steps)
+        self.step_count += n_steps
+
+    def step(self):
+        self.run(1)
+
+    def metrics(self, bins=16):
+        """
+        Kennzahlen wie batch.summarize, je Welt.
+
+        Returns:
+            dict: kinetic_energy, mean_speed, max_speed, spatial_entropy
+            jeweils als np.ndarray (B,).
+        """
+        n_worlds, n_particles = self.positions.shape[:2]
+        speeds = np.sqrt(np.sum(self.velocities * self.velocities, axis=2))
+
+        # Ein gemeinsames Histogramm mit bins² Fächern pro Welt
+        cells = np.minimum((self.positions * bins).astype(np.int64), bins - 1)
+        flat = cells[:, :, 0] * bins + cells[:, :, 1] + (np.arange(n_worlds) * bins * bins)[:, None]
+        hist = np.bincount(flat.ravel(), minlength=n_worlds * bins * bins)
+        p = hist.reshape(n_worlds, bins * bins) / n_particles
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = -np.sum(np.where(p > 0, p * np.log(p), 0.0), axis=1) / np.log(bins * bins)
+
+        return {
+            "kinetic_energy": 0.5 * np.mean(speeds * speeds, axis=1),
+            "mean_speed": np.mean(speeds, axis=1),
+            "max_speed": np.max(speeds, axis=1),
+            "spatial_entropy": entropy,
+        }
@@ -0,0 +1,230 @@
+"""
+Kraft-Kernel der Simulation (Numba JIT).
+
+Alle Kernel schreiben die Summe der Kräfte auf Partikel i nach forces[i]
+und verändern weder Positionen noch Geschwindigkeiten.
+"""
+import types
+
+import numpy as np
+from numba import jit, prange
+
+# fastmath ohne 'reassoc'/'contract'/'arcp'/'afn': Der Compiler darf die
+# Summationsreihenfolge nicht umstellen, damit serieller und paralleler
+# Pfad bitgleiche Ergebnisse liefern.
+DETERMINISTIC_FASTMATH = {"nnan", "ninf", "nsz"}
+
+# Obergrenze für Zellen pro Achse, damit sehr kleine Radien den Speicher
+# für das Gitter nicht explodieren lassen.
+MAX_CELLS_PER_AXIS = 256
+
+
+@jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)
+def pair_force(pos_x_i, pos_y_i, pos_x_j, pos_y_j, table, type_i, type_j, inv_max_r):
+    """
+    Kraft von Partikel j auf Partikel i (kürzester Weg auf dem Torus).
+
+    Der Betrag kommt aus der Kraft-Tabelle des Typ-Paares (siehe
+    interaction.build_force_table), linear interpoliert über s = r / max_r.
+    Wurzel und Division fallen nur für Paare innerhalb von max_r an.
+
+    Returns:
+        Tuple (fx, fy); (0.0, 0.0) außerhalb von max_r.
+    """
+    dx = pos_x_j - pos_x_i
+    dy = pos_y_j - pos_y_i
+
+    if dx > 0.5:
+        dx -= 1.0
+    elif dx < -0.5:
+        dx += 1.0
+
+    if dy > 0.5:
+        dy -= 1.0
+    elif dy < -0.5:
+        dy += 1.0
+
+    dist_sq = dx * dx + dy * dy
+
+    if dist_sq > 0 and dist_sq * inv_max_r * inv_max_r < 1.0:
+        dist = np.sqrt(dist_sq)
+        x = dist * inv_max_r * (table.shape[2] - 1)
+        # Knapp unter max_r kann x durch Rundung auf die letzte Stützstelle fallen
+        k = min(int(x), table.shape[2] - 2)
+        low = table[type_i, type_j, k]
+        force_val = low + (x - k) * (table[type_i, type_j, k + 1] - low)
+        return dx / dist * force_val, dy / dist * force_val
+
+    return 0.0, 0.0
+
+
+@jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)
+def particle_force(i, positions, types, table, max_r):
+    """Summe der Kräfte aller anderen Partikel auf Partikel i (j aufsteigend)."""
+    total_force_x = 0.0
+    total_force_y = 0.0
+
+    pos_x_i = positions[i, 0]
+    pos_y_i = positions[i, 1]
+    type_i = types[i]
+    inv_max_r = 1.0 / max_r
+
+    for j in range(len(positions)):
+        if i == j:
+            continue
+
+        fx, fy = pair_force(pos_x_i, pos_y_i, positions[j, 0], positions[j, 1], table, type_i,
+                            types[j], inv_max_r)
+        total_force_x += fx
+        total_force_y += fy
+
+    return total_force_x, total_force_y
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def cell_index(pos_x, pos_y, n_cells):
+    """Zellkoordinaten (cx, cy) einer Position im periodischen Gitter."""
+    cx = int(np.floor(pos_x * n_cells)) % n_cells
+    cy = int(np.floor(pos_y * n_cells)) % n_cells
+    return cx, cy
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def build_cell_list(positions, n_cells):
+    """
+    Sortiert die Partikel per Counting-Sort in ein (n_cells x n_cells) Gitter.
+
+    Returns:
+        cell_start (n_cells² + 1,): Partikel der Zelle c liegen in
+            cell_particles[cell_start[c]:cell_start[c + 1]].
+        cell_particles (N,): Partikel-Indizes, nach Zellen sortiert.
+    """
+    n_particles = len(positions)
+    cell_of = np.empty(n_particles, dtype=np.int64)
+    cell_start = np.zeros(n_cells * n_cells + 1, dtype=np.int64)
+
+    # 1. Partikel pro Zelle zählen
+    for i in range(n_particles):
+        cx, cy = cell_index(positions[i, 0], positions[i, 1], n_cells)
+        cell_of[i] = cx * n_cells + cy
+        cell_start[cell_of[i] + 1] += 1
+
+    # 2. Präfixsumme -> Startoffsets
+    for c in range(n_cells * n_cells):
+        cell_start[c + 1] += cell_start[c]
+
+    # 3. Einsortieren (stabil, d.h. innerhalb einer Zelle aufsteigende Indizes)
+    fill = cell_start[:-1].copy()
+    cell_particles = np.empty(n_particles, dtype=np.int64)
+    for i in range(n_particles):
+        c = cell_of[i]
+        cell_particles[fill[c]] = i
+        fill[c] += 1
+
+    return cell_start, cell_particles
+
+
+@jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)
+def particle_force_cells(i, positions, types, table, max_r, cell_start, cell_particles,
+                         n_cells):
+    """
+    Wie particle_force, besucht aber nur die Partikel der 3x3 benachbarten
+    Zellen (periodisch), in fester Zell- und Indexreihenfolge.
+    """
+    total_force_x = 0.0
+    total_force_y = 0.0
+
+    pos_x_i = positions[i, 0]
+    pos_y_i = positions[i, 1]
+    type_i = types[i]
+    inv_max_r = 1.0 / max_r
+    cx, cy = cell_index(pos_x_i, pos_y_i, n_cells)
+
+    for ox in range(-1, 2):
+        ncx = (cx + ox) % n_cells
+        for oy in range(-1, 2):
+            cell = ncx * n_cells + (cy + oy) % n_cells
+
+            for k in range(cell_start[cell], cell_start[cell + 1]):
+                j = cell_particles[k]
+                if i == j:
+                    continue
+
+                fx, fy = pair_force(pos_x_i, pos_y_i, positions[j, 0], positions[j, 1], table,
+                                    type_i, types[j], inv_max_r)
+                total_force_x += fx
+                total_force_y += fy
+
+    return total_force_x, total_force_y
+
+
+def _compute_forces(positions, types, table, max_r, forces, n_cells):
+    """
+    O(N²)-Kraft-Kernel: forces[i] = Summe der Kräfte auf Partikel i.
+
+    Jede Iteration schreibt nur forces[i]. Parallel kompiliert bearbeitet
+    jeder Thread einen Block von i, ohne Races und ohne Reduktion über
+    Threads hinweg (Ergebnis unabhängig von der Thread-Anzahl).
+    n_cells wird ignoriert (einheitliche Signatur aller Kraft-Kernel).
+    """
+    for i in prange(len(positions)):
+        fx, fy = particle_force(i, positions, types, table, max_r)
+        forces[i, 0] = fx
+        forces[i, 1] = fy
+
+
+def _compute_forces_cells(positions, types, table, max_r, forces, n_cells):
+    """
+    Kraft-Kernel mit Zellliste (Aufbau seriell, O(N)).
+
+    Voraussetzung: n_cells >= 3 und 1 / n_cells >= max_r.
+    """
+    cell_start, cell_particles = build_cell_list(positions, n_cells)
+
+    for i in prange(len(positions)):
+        fx, fy = particle_force_cells(i, positions, types, table, max_r, cell_start,
+                                      cell_particles, n_cells)
+        forces[i, 0] = fx
+        forces[i, 1] = fy
+
+
+def _variant(py_func, suffix):
+    """
+    Kopie von py_func unter eigenem Namen. Numba legt den Disk-Cache pro
+    Funktionsname an und unterscheidet dabei nicht nach parallel=True.
+    """
+    func = types.FunctionType(py_func.__code__, py_func.__globals__,
+                              py_func.__name__ + suffix, py_func.__defaults__)
+    func.__qualname__ = py_func.__qualname__ + suffix
+    func.__doc__ = py_func.__doc__
+    return func
+
+
+# Serielle und parallele Kernel werden aus demselben Quelltext kompiliert;
+# ohne parallel=True verhält sich prange wie range.
+compute_forces = jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces, "_serial"))
+compute_forces_parallel = jit(nopython=True, nogil=True, parallel=True, cache=True,
+                              fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces, "_parallel"))
+compute_forces_cells = jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces_cells, "_serial"))
+compute_forces_cells_parallel = jit(nopython=True, nogil=True, parallel=True, cache=True,
+                                    fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces_cells, "_parallel"))
+
+
+def select_force_kernel(n_cells, parallel):
+    """
+    Wählt den passenden Kraft-Kernel. Alle haben die Signatur
+    kernel(positions, types, table, max_r, forces, n_cells) und können auch
+    als Argument an andere Kernel übergeben werden; table ist die
+    Kraft-Tabelle (T, T, K) aus Interaction.force_table().
+
+    Args:
+        n_cells: Zellen pro Achse für die Zellliste, 0 = O(N²)-Kernel
+        parallel: True = prange-parallele Variante
+    """
+    if n_cells > 0:
+        return compute_forces_cells_parallel if parallel else compute_forces_cells
+    return compute_forces_parallel if parallel else compute_forces
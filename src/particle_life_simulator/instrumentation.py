@@ -0,0 +1,178 @@
+"""
+Leichtgewichtige Zeitmessung der Hot-Path-Stufen.
+
+Ein StageTimer misst benannte Abschnitte (Kräfte, Integration, Observer,
+Upload, Zeichnen, ...) und legt sie in einem Ringpuffer fester Größe ab:
+nur die letzten `capacity` Messungen werden gehalten, der Speicherbedarf
+ist konstant. Physik-Thread und Renderer können denselben Timer benutzen;
+jede Messung speichert ihren Thread.
+
+Verwendung:
+    timer = StageTimer()
+    with timer.stage("forces"):
+        ...
+    timer.summary()                     # Mittelwert/p95/Maximum pro Stufe
+    timer.export_trace("trace.json")    # für chrome://tracing bzw. Perfetto
+
+Ist der Timer abgeschaltet (enabled=False), liefert stage() ein
+gemeinsames Null-Objekt ohne Zeitmessung; das kostet nur einen
+Methodenaufruf und kann deshalb dauerhaft im Code bleiben.
+"""
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Ein gemeinsames Objekt für alle abgeschalteten Messungen
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    """Eine laufende Messung (Kontextmanager von StageTimer.stage)."""
+
+    __slots__ = ("timer", "stage_id", "start")
+
+    def __init__(self, timer, stage_id):
+        self.timer = timer
+        self.stage_id = stage_id
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.record(self.stage_id, self.start, time.perf_counter_ns() - self.start)
+
+
+class StageTimer:
+    """Ringpuffer der letzten Stufen-Messungen (Start, Dauer, Stufe, Thread)."""
+
+    def __init__(self, capacity=4096, enabled=True):
+        """
+        Args:
+            capacity (int): Anzahl der gehaltenen Messungen.
+            enabled (bool): Messungen aufzeichnen (abschaltbar zur Laufzeit).
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity muss >= 1 sein, nicht {capacity}")
+
+        self.capacity = capacity
+        self.enabled = enabled
+        self.stages = []
+        self._stage_ids = {}
+        # Puffer erst bei der ersten Messung anlegen (abgeschaltete Timer kosten nichts)
+        self._starts = None
+        # next() auf itertools.count ist unter dem GIL atomar: mehrere
+        # Threads bekommen nie denselben Slot
+        self._counter = itertools.count()
+        self._n_recorded = 0
+        self._lock = threading.Lock()
+
+    def _allocate(self):
+        with self._lock:
+            if self._starts is None:
+                self._durations = np.zeros(self.capacity, dtype=np.int64)
+                self._stage_of = np.zeros(self.capacity, dtype=np.int32)
+                self._threads = np.zeros(self.capacity, dtype=np.uint64)
+                self._starts = np.zeros(self.capacity, dtype=np.int64)
+
+    def stage_id(self, name):
+        """Nummer einer Stufe (wird beim ersten Aufruf vergeben)."""
+        stage_id = self._stage_ids.get(name)
+        if stage_id is None:
+            with self._lock:
+                stage_id = self._stage_ids.setdefault(name, len(self.stages))
+                if stage_id == len(self.stages):
+                    self.stages.append(name)
+        return stage_id
+
+    def stage(self, name):
+        """Kontextmanager, der die Dauer des Blocks unter name aufzeichnet."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, self.stage_id(name))
+
+    def record(self, stage_id, start_ns, duration_ns):
+        """Legt eine Messung im Ringpuffer ab (überschreibt die älteste)."""
+        if self._starts is None:
+            self._allocate()
+        index = next(self._counter)
+        slot = index % self.capacity
+        self._starts[slot] = start_ns
+        self._durations[slot] = duration_ns
+        self._stage_of[slot] = stage_id
+        self._threads[slot] = threading.get_ident()
+        self._n_recorded = max(self._n_recorded, index + 1)
+
+    def __len__(self):
+        return min(self._n_recorded, self.capacity)
+
+    def clear(self):
+        """Verwirft alle Messungen (Stufennamen bleiben erhalten)."""
+        self._counter = itertools.count()
+        self._n_recorded = 0
+
+    def snapshot(self):
+        """
+        Kopie des Puffers in zeitlicher Reihenfolge.
+
+        Returns:
+            Tuple (Startzeiten ns, Dauern ns, Stufen-Nummern, Thread-IDs).
+        """
+        n = len(self)
+        if n == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        order = np.argsort(self._starts[:n], kind="stable")
+        return (self._starts[:n][order], self._durations[:n][order],
+                self._stage_of[:n][order], self._threads[:n][order])
+
+    def summary(self):
+        """
+        Kennzahlen pro Stufe über den aktuellen Pufferinhalt.
+
+        Returns:
+            dict: Stufe -> {"count", "mean_ms", "p95_ms", "max_ms"}.
+        """
+        _, durations, stage_of, _ = self.snapshot()
+        result = {}
+        for stage_id, name in enumerate(self.stages):
+            values = durations[stage_of == stage_id] / 1e6
+            if len(values):
+                result[name] = {"count": len(values), "mean_ms": float(values.mean()),
+                                "p95_ms": float(np.percentile(values, 95)),
+                                "max_ms": float(values.max())}
+        return result
+
+    def format_summary(self):
+        """Mehrzeiliger Text für das HUD (eine Zeile pro Stufe)."""
+        lines = [f"{'Stufe':<10} {'Ø ms':>7} {'p95':>7} {'max':>7}"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<10} {stats['mean_ms']:7.2f} {stats['p95_ms']:7.2f} "
+                         f"{stats['max_ms']:7.2f}")
+        return "\n".join(lines)
+
+    def trace_events(self):
+        """Messungen als Ereignisse im Chrome-Trace-Format (Mikrosekunden)."""
+        starts, durations, stage_of, threads = self.snapshot()
+        if not len(starts):
+            return []
+        origin = int(starts[0])
+        thread_numbers = {ident: n for n, ident in enumerate(dict.fromkeys(threads.tolist()))}
+        return [{"name": self.stages[stage_id], "ph": "X", "pid": os.getpid(),
+                 "tid": thread_numbers[thread], "ts": (start - origin) / 1000,
+                 "dur": duration / 1000}
+                for start, duration, stage_id, thread in zip(starts.tolist(), durations.tolist(),
+                                                             stage_of.tolist(), threads.tolist())]
+
+    def export_trace(self, path):
+        """
+        Schreibt den Pufferinhalt als Trace-Datei (JSON), lesbar in
+        chrome://tracing oder https://ui.perfetto.dev.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
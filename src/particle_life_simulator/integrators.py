@@ -0,0 +1,308 @@
+"""
+Austauschbare Integrationsverfahren für die Simulation.
+
+Alle Integratoren arbeiten auf den von Simulation.update_accelerations()
+berechneten Kräften in particles.accelerations (Masse = 1). Die Kraft-
+berechnung ist damit vollständig von der Zeitintegration getrennt.
+"""
+import hashlib
+import inspect
+import types
+
+import numpy as np
+from numba import jit
+
+from particle_life_simulator.forces import pair_force
+from particle_life_simulator.rng import counter_uniform
+
+
+class Integrator:
+    """Basisklasse: Ein Integrator führt genau einen Zeitschritt aus."""
+
+    name = ""
+
+    def reset(self):
+        """Verwirft internen Zustand (z.B. nach Austausch des Integrators)."""
+
+    def state_dict(self):
+        """Interner Zustand als JSON-fähiges dict (für Checkpoints)."""
+        return {}
+
+    def load_state_dict(self, state):
+        """Stellt einen mit state_dict() gesicherten Zustand wieder her."""
+
+    def step(self, simulation):
+        """Bringt simulation.particles um simulation.dt voran."""
+        raise NotImplementedError
+
+    def run(self, simulation, n_steps):
+        """
+        Führt n_steps Schritte aus. Eigene Integratoren können hier einen
+        fusionierten Kernel verwenden; der Standard ruft step() in einer Schleife.
+
+        simulation.step_count zählt dabei mit (für den Noise), steht danach
+        aber wieder am Anfang: Simulation.run() zählt den Block selbst weiter.
+        """
+        start = simulation.step_count
+        try:
+            for s in range(n_steps):
+                simulation.step_count = start + s
+                self.step(simulation)
+        finally:
+            simulation.step_count = start
+
+
+class EulerIntegrator(Integrator):
+    """
+    Explizites Euler-Verfahren:
+        x(t+1) = x(t) + v(t) dt
+        v(t+1) = (1 - γ dt) v(t) + a(t) dt
+    """
+
+    name = "euler"
+
+    def step(self, simulation):
+        simulation.update_accelerations()
+        simulation.update_positions()
+        simulation.update_velocities()
+
+    def run(self, simulation, n_steps):
+        if not simulation.resolve_backend().fused:
+            return super().run(simulation, n_steps)
+        kernel, n_cells = simulation.force_kernel()
+        fused_kernel(run_euler, kernel)(*_state_args(simulation), n_cells, n_steps)
+
+
+class SemiImplicitEulerIntegrator(Integrator):
+    """
+    Semi-implizites (symplektisches) Euler-Verfahren, das bisherige Standard-
+    verfahren der Simulation:
+        v(t+1) = (1 - γ dt) v(t) + a(t) dt
+        x(t+1) = x(t) + v(t+1) dt
+    """
+
+    name = "semi_implicit_euler"
+
+    def step(self, simulation):
+        simulation.update_accelerations()
+        simulation.update_velocities()
+        simulation.update_positions()
+
+    def run(self, simulation, n_steps):
+        if not simulation.resolve_backend().fused:
+            return super().run(simulation, n_steps)
+        kernel, n_cells = simulation.force_kernel()
+        fused_kernel(run_semi_implicit_euler, kernel)(*_state_args(simulation), n_cells, n_steps)
+
+
+class VelocityVerletIntegrator(Integrator):
+    """
+    Velocity-Verlet mit Reibung. Die Kräfte am Ende eines Schritts werden im
+    nächsten Schritt wiederverwendet (eine Kraftberechnung pro Schritt).
+    Die Reibung wird in der zweiten Halbphase implizit behandelt:
+        v' = v + dt/2 (a(t) - γ v)
+        x(t+1) = x(t) + v' dt
+        v(t+1) = (v' + dt/2 a(t+1)) / (1 + γ dt/2)
+    """
+
+    name = "verlet"
+
+    def __init__(self):
+        self._primed = False
+
+    def reset(self):
+        self._primed = False
+
+    def state_dict(self):
+        # primed = particles.accelerations enthält gültige Kräfte a(t)
+        return {"primed": self._primed}
+
+    def load_state_dict(self, state):
+        self._primed = bool(state.get("primed", False))
+
+    def step(self, simulation):
+        particles = simulation.particles
+
+        # Beim ersten Schritt liegen noch keine Kräfte a(t) vor
+        if not self._primed:
+            simulation.update_accelerations()
+            self._primed = True
+
+        verlet_half_kick(particles.velocities, particles.accelerations, simulation.dt,
+                         simulation.friction)
+        simulation.update_positions()
+        simulation.update_accelerations()
+        verlet_finish_kick(particles.velocities, particles.accelerations, simulation.dt,
+                           simulation.friction, simulation.noise_strength, simulation.seed,
+                           simulation.step_count, simulation.noise_ids())
+
+    def run(self, simulation, n_steps):
+        if not simulation.resolve_backend().fused:
+            return super().run(simulation, n_steps)
+        if not self._primed:
+            simulation.update_accelerations()
+            self._primed = True
+
+        kernel, n_cells = simulation.force_kernel()
+        fused_kernel(run_velocity_verlet, kernel)(*_state_args(simulation), n_cells, n_steps)
+
+
+INTEGRATORS = {
+    cls.name: cls
+    for cls in (EulerIntegrator, SemiImplicitEulerIntegrator, VelocityVerletIntegrator)
+}
+
+
+def _state_args(simulation):
+    """Gemeinsame Argumente der fusionierten Mehrschritt-Kernel."""
+    particles = simulation.particles
+    return (particles.positions, particles.velocities, particles.accelerations,
+            particles.types, simulation.force_table(), simulation.max_r, simulation.dt,
+            simulation.friction, simulation.noise_strength, simulation.seed,
+            simulation.step_count, simulation.noise_ids())
+
+
+def make_integrator(integrator):
+    """Erzeugt einen Integrator aus Name oder gibt eine Instanz unverändert zurück."""
+    if isinstance(integrator, Integrator):
+        return integrator
+    try:
+        return INTEGRATORS[integrator]()
+    except KeyError:
+        raise ValueError(
+            f"Unbekannter Integrator: {integrator!r} (verfügbar: {', '.join(INTEGRATORS)})"
+        ) from None
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def add_noise(velocities, i, dt, noise_strength, seed, step, ids):
+    """
+    Gleichverteilter Noise für Partikel i, bestimmt durch (seed, step, ID).
+    ids leer = Slot i ist die ID (nie umsortiert).
+    """
+    particle = i if len(ids) == 0 else ids[i]
+    velocities[i, 0] += (counter_uniform(seed, step, particle, 0) - 0.5) * noise_strength * dt
+    velocities[i, 1] += (counter_uniform(seed, step, particle, 1) - 0.5) * noise_strength * dt
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def kick(velocities, accelerations, dt, friction, noise_strength, seed, step, ids):
+    """v <- (1 - γ dt) v + a dt, zzgl. Noise."""
+    for i in range(len(velocities)):
+        velocities[i, 0] *= (1.0 - friction * dt)
+        velocities[i, 1] *= (1.0 - friction * dt)
+
+        velocities[i, 0] += accelerations[i, 0] * dt
+        velocities[i, 1] += accelerations[i, 1] * dt
+
+        if noise_strength > 0.0:
+            add_noise(velocities, i, dt, noise_strength, seed, step, ids)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def drift(positions, velocities, dt):
+    """x <- (x + v dt) mod 1.0, Wrapping im selben Durchlauf."""
+    for i in range(len(positions)):
+        x = positions[i, 0] + velocities[i, 0] * dt
+        y = positions[i, 1] + velocities[i, 1] * dt
+        positions[i, 0] = x - np.floor(x)
+        positions[i, 1] = y - np.floor(y)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def verlet_half_kick(velocities, accelerations, dt, friction):
+    """v <- v + dt/2 (a - γ v)"""
+    half_dt = 0.5 * dt
+    for i in range(len(velocities)):
+        velocities[i, 0] += half_dt * (accelerations[i, 0] - friction * velocities[i, 0])
+        velocities[i, 1] += half_dt * (accelerations[i, 1] - friction * velocities[i, 1])
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def verlet_finish_kick(velocities, accelerations, dt, friction, noise_strength, seed, step, ids):
+    """v <- (v + dt/2 a) / (1 + γ dt/2), zzgl. Noise."""
+    half_dt = 0.5 * dt
+    damping = 1.0 / (1.0 + friction * half_dt)
+    for i in range(len(velocities)):
+        velocities[i, 0] = (velocities[i, 0] + half_dt * accelerations[i, 0]) * damping
+        velocities[i, 1] = (velocities[i, 1] + half_dt * accelerations[i, 1]) * damping
+
+        if noise_strength > 0.0:
+            add_noise(velocities, i, dt, noise_strength, seed, step, ids)
+
+
+# Fusionierte Mehrschritt-Kernel: n_steps Schritte in einem kompilierten
+# Aufruf. Die Funktionen hier sind nur Vorlagen; fused_kernel() kompiliert
+# sie mit einem konkreten Kraft-Kernel anstelle von FORCE_KERNEL.
+
+# Platzhalter, wird pro Variante durch einen Kernel aus forces ersetzt
+FORCE_KERNEL = None
+
+_FUSED_KERNELS = {}
+
+
+def source_fingerprint(*functions):
+    """
+    Kurzer Hash über die Quelldateien, in denen functions definiert sind.
+
+    Numbas Platten-Cache prüft nur die Datei der kompilierten Funktion.
+    Die fusionierten Kernel inlinen aber Code aus anderen Modulen (Kraft-
+    Kernel, pair_force, Noise); der Hash im Namen sorgt dafür, dass eine
+    Änderung dort einen neuen Cache-Eintrag statt des alten Kernels ergibt.
+    """
+    digest = hashlib.sha1()
+    for path in sorted({inspect.getsourcefile(getattr(f, "py_func", f)) for f in functions}):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def fused_kernel(run_func, force_kernel):
+    """
+    Kompiliert eine der run_*-Vorlagen mit fest eingesetztem Kraft-Kernel.
+
+    Ein Kernel, der den Kraft-Kernel als Argument bekommt, lässt sich von
+    Numba nicht auf der Platte cachen (der Typ eines Dispatchers gilt nur
+    im aktuellen Prozess) und würde bei jedem Programmstart neu kompiliert.
+    Als globaler Name eingesetzt, bekommt jede Kombination einen eigenen,
+    cachebaren Kernel; der Name enthält source_fingerprint() des
+    eingesetzten Codes.
+    """
+    key = (run_func, force_kernel)
+    kernel = _FUSED_KERNELS.get(key)
+    if kernel is None:
+        fingerprint = source_fingerprint(run_func, force_kernel, pair_force, counter_uniform)
+        name = f"{run_func.__name__}__{force_kernel.__name__}__{fingerprint}"
+        func = types.FunctionType(run_func.__code__,
+                                  {**run_func.__globals__, "FORCE_KERNEL": force_kernel}, name)
+        func.__qualname__ = name
+        func.__doc__ = run_func.__doc__
+        kernel = _FUSED_KERNELS[key] = jit(nopython=True, nogil=True, cache=True)(func)
+    return kernel
+
+
+def run_euler(positions, velocities, accelerations, types, table, max_r, dt, friction,
+              noise_strength, seed, step, ids, n_cells, n_steps):
+    for s in range(n_steps):
+        FORCE_KERNEL(positions, types, table, max_r, accelerations, n_cells)
+        drift(positions, velocities, dt)
+        kick(velocities, accelerations, dt, friction, noise_strength, seed, step + s, ids)
+
+
+def run_semi_implicit_euler(positions, velocities, accelerations, types, table, max_r, dt,
+                            friction, noise_strength, seed, step, ids, n_cells, n_steps):
+    for s in range(n_steps):
+        FORCE_KERNEL(positions, types, table, max_r, accelerations, n_cells)
+        kick(velocities, accelerations, dt, friction, noise_strength, seed, step + s, ids)
+        drift(positions, velocities, dt)
+
+
+def run_velocity_verlet(positions, velocities, accelerations, types, table, max_r, dt,
+                        friction, noise_strength, seed, step, ids, n_cells, n_steps):
+    """Erwartet gültige Kräfte a(t) in accelerations."""
+    for s in range(n_steps):
+        verlet_half_kick(velocities, accelerations, dt, friction)
+        drift(positions, velocities, dt)
+        FORCE_KERNEL(positions, types, table, max_r, accelerations, n_cells)
+        verlet_finish_kick(velocities, accelerations, dt, friction, noise_strength, seed,
+                           step + s, ids)
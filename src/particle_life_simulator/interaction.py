@@ -1,5 +1,91 @@
 import numpy as np
 
+from particle_life_simulator.rng import resolve_seed
+
+# Kraftprofile, jeweils über dem auf den Radius des Typ-Paares normierten
+# Abstand s = r / (radii[a, b] * max_r) in [0, 1):
+#   "linear":  rule * (1 - s)                        (bisheriges Modell)
+#   "classic": Dreieck mit Spitze rule bei (1 + core) / 2, 0 bei core und 1
+#   "smooth":  rule * sin(pi * (s - core) / (1 - core))
+# Für s < core stoßen sich alle Typen ab (linear von -repulsion auf 0).
+FORCE_PROFILES = ("linear", "classic", "smooth")
+
+# Intervalle der Kraft-Tabelle pro Typ-Paar über r / max_r in [0, 1]
+# (size + 1 Stützstellen, linear interpoliert). Das lineare Profil ist
+# damit exakt (bis auf Rundung); "classic" weicht nur in den Intervallen
+# mit Knick ab, "smooth" um < 1e-5 (relativ zur Regel).
+FORCE_TABLE_SIZE = 1024
+
+
+def profile_force(profile, s, rule, core=0.0, repulsion=1.0):
+    """
+    Kraftbetrag bei normiertem Abstand s (positiv = Anziehung), 0 ab s >= 1.
+    Alle Argumente außer profile dürfen Arrays sein (Broadcasting).
+    """
+    s = np.asarray(s, dtype=np.float64)
+    if profile == "linear":
+        outer = rule * (1.0 - s)
+    elif profile == "classic":
+        outer = rule * (1.0 - np.abs(2.0 * s - 1.0 - core) / (1.0 - core))
+    elif profile == "smooth":
+        outer = rule * np.sin(np.pi * (s - core) / (1.0 - core))
+    else:
+        raise ValueError(f"Unbekanntes Kraftprofil: {profile!r} "
+                         f"(verfügbar: {', '.join(FORCE_PROFILES)})")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inner = repulsion * (s / core - 1.0)
+    force = np.where(s < core, inner, outer)
+    return np.where(s < 1.0, force, 0.0)
+
+
+def build_force_table(matrix, profile="linear", radii=None, core=0.0, repulsion=1.0,
+                      size=FORCE_TABLE_SIZE, out=None, mask=None):
+    """
+    Tabelliert die Kraft für alle Typ-Paare (auch gestapelt, z.B. (B, T, T)).
+
+    Eintrag k von Paar (a, b) ist der Kraftbetrag an der Stützstelle
+    s = r / max_r = k / size (endlich auch bei r = 0). Die Kraft-Kernel
+    berechnen damit F = (dx, dy) / r * table[a, b](s), linear interpoliert,
+    mit einer Wurzel pro Paar innerhalb von max_r. Die Tabelle hängt nicht
+    von max_r ab.
+
+    Args:
+        matrix (np.ndarray): Regeln (..., T, T).
+        radii (np.ndarray, optional): Radius je Paar als Anteil von max_r
+            in (0, 1], Default: 1.
+        out (np.ndarray, optional): Tabelle (..., T, T, size + 1) zum Überschreiben.
+        mask (np.ndarray, optional): Nur diese Paare (bool, Form wie matrix)
+            neu berechnen.
+
+    Returns:
+        np.ndarray: Tabelle (..., T, T, size + 1), float64.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    radii = np.ones(matrix.shape) if radii is None else np.broadcast_to(radii, matrix.shape)
+    if np.any((radii <= 0.0) | (radii > 1.0)):
+        raise ValueError("radii müssen in (0, 1] liegen")
+    if out is None:
+        out = np.empty(matrix.shape + (size + 1,), dtype=np.float64)
+    if mask is None:
+        mask = np.ones(matrix.shape, dtype=bool)
+
+    s = np.arange(size + 1) / size
+    out[mask] = profile_force(profile, s / radii[mask][:, None], matrix[mask][:, None], core,
+                              repulsion)
+    return out
+
+
+def check_force_profile(profile, core, repulsion):
+    """Prüft die Parameter eines Kraftprofils (ValueError bei Fehlern)."""
+    if profile not in FORCE_PROFILES:
+        raise ValueError(f"Unbekanntes Kraftprofil: {profile!r} "
+                         f"(verfügbar: {', '.join(FORCE_PROFILES)})")
+    if not 0.0 <= core < 1.0:
+        raise ValueError(f"core muss in [0, 1) liegen, nicht {core}")
+    if repulsion < 0.0:
+        raise ValueError(f"repulsion muss >= 0 sein, nicht {repulsion}")
+
 
 class Interaction:
     """
@@ -7,21 +93,127 @@ class Interaction:
 
     """
 
-    def __init__(self, num_types: int):
+    def __init__(self, num_types: int, seed=None, profile="linear", core=0.0, repulsion=1.0,
+                 radii=None, table_size=FORCE_TABLE_SIZE):
         """
         Initialisiert die Interaktions-Logik.
+
+        Args:
+            num_types (int): Anzahl der Partikel-Typen.
+            seed (int, optional): Seed für randomize() (None = aus
+                np.random gezogen, siehe rng.resolve_seed).
+            profile (str): Kraftprofil, siehe FORCE_PROFILES.
+            core (float): Abstoßender Kern als Anteil des Paar-Radius (0 = keiner).
+            repulsion (float): Stärke der Abstoßung bei Abstand 0.
+            radii (np.ndarray, optional): Radius je Typ-Paar (T, T) als
+                Anteil von max_r, Default: überall max_r.
+            table_size (int): Einträge der Kraft-Tabelle pro Typ-Paar.
         """
         self.num_types = num_types
+        self.seed = seed
+        self._rng = None
 
         # Die Interaktions-Matrix (N_types x N_types)
         # Wertebereich: -1.0 (Abstoßung) bis +1.0 (Anziehung)
         self.matrix = self._make_default_matrix()
+        self._init_forces(profile, core, repulsion, radii, table_size)
 
         print(f"--> [Interaction] Initialisiert: {num_types} Typen")
 
-    def set_rule(self, type_a: int, type_b: int, force: float):
-        """Setzt eine spezifische Regel manuell."""
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, profile="linear", core=0.0, repulsion=1.0,
+                    radii=None, table_size=FORCE_TABLE_SIZE):
+        """
+        Erzeugt die Regeln aus einer vorhandenen (T, T) Matrix.
+
+        Listen (z.B. aus einer JSON-Datei von particle-life-search) werden
+        in ein float-Array umgewandelt; ein float-Array wird übernommen.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        interaction = cls.__new__(cls)
+        interaction.num_types = matrix.shape[0]
+        interaction.matrix = matrix
+        interaction.seed = None
+        interaction._rng = None
+        interaction._init_forces(profile, core, repulsion, radii, table_size)
+        return interaction
+
+    def _init_forces(self, profile, core, repulsion, radii, table_size):
+        check_force_profile(profile, core, repulsion)
+        self.profile = profile
+        self.core = core
+        self.repulsion = repulsion
+        self.radii = None if radii is None else np.array(radii, dtype=np.float64)
+        self.table_size = table_size
+
+        # Kraft-Tabelle und die Regeln, aus denen sie berechnet wurde
+        self._table = None
+        self._table_key = None
+        self._table_matrix = None
+        self._table_radii = None
+
+    def set_profile(self, profile=None, core=None, repulsion=None):
+        """Wechselt Kraftprofil, Kern und/oder Abstoßung (None = unverändert)."""
+        profile = self.profile if profile is None else profile
+        core = self.core if core is None else core
+        repulsion = self.repulsion if repulsion is None else repulsion
+        check_force_profile(profile, core, repulsion)
+        self.profile, self.core, self.repulsion = profile, core, repulsion
+
+    def force_table(self):
+        """
+        Kraft-Tabelle (T, T, table_size + 1) für die Kraft-Kernel, siehe
+        build_force_table.
+
+        Die Tabelle wird zwischengespeichert. Ändern sich Regeln oder Radien
+        (set_rule oder direkte Zuweisung an matrix), werden nur die
+        betroffenen Paare neu berechnet; nach set_profile alle.
+        """
+        radii = np.ones(self.matrix.shape) if self.radii is None else self.radii
+        key = (self.profile, self.core, self.repulsion, self.table_size, self.matrix.shape)
+
+        if self._table is None or key != self._table_key or radii.shape != self.matrix.shape:
+            self._table = build_force_table(self.matrix, self.profile, radii, self.core,
+                                            self.repulsion, self.table_size)
+            self._table_key = key
+            self._table_matrix = np.array(self.matrix, dtype=np.float64)
+            self._table_radii = np.array(radii, dtype=np.float64)
+            return self._table
+
+        changed = (self.matrix != self._table_matrix) | (radii != self._table_radii)
+        if changed.any():
+            build_force_table(self.matrix, self.profile, radii, self.core, self.repulsion,
+                              self.table_size, out=self._table, mask=changed)
+            self._table_matrix[changed] = self.matrix[changed]
+            self._table_radii[changed] = radii[changed]
+        return self._table
+
+    @property
+    def rng(self):
+        """Eigener Zufallsgenerator für randomize()."""
+        if self._rng is None:
+            self.seed = resolve_seed(self.seed)
+            self._rng = np.random.default_rng(self.seed)
+        return self._rng
+
+    def randomize(self, low=-1.0, high=1.0):
+        """Würfelt eine neue Matrix, gleichverteilt in [low, high)."""
+        self.matrix = self.rng.uniform(low, high, (self.num_types, self.num_types))
+        return self.matrix
+
+    def set_rule(self, type_a: int, type_b: int, force: float, radius=None):
+        """
+        Setzt eine spezifische Regel manuell, optional mit eigenem Radius
+        (Anteil von max_r). Die Kraft-Tabelle wird nur für dieses Paar neu
+        berechnet (beim nächsten force_table()).
+        """
         self.matrix[type_a, type_b] = force
+        if radius is not None:
+            if not 0.0 < radius <= 1.0:
+                raise ValueError(f"radius muss in (0, 1] liegen, nicht {radius}")
+            if self.radii is None:
+                self.radii = np.ones(self.matrix.shape)
+            self.radii[type_a, type_b] = radius
 
     def _make_default_matrix(self):
         """
@@ -0,0 +1,261 @@
+"""
+Level of Detail für die Darstellung sehr vieler Partikel.
+
+Ab einigen hunderttausend Partikeln kosten die Marker (ein Punkt mit 8 px
+pro Partikel) mehr Upload und Füllrate, als das Bild an Information trägt.
+LevelOfDetail wählt pro Frame anhand der sichtbaren Partikel und des
+Zooms der Kamera zwischen:
+
+    markers   ein Punkt pro Partikel; beim Hineinzoomen werden nur die
+              Partikel im Sichtbereich hochgeladen (Viewport-Culling)
+    density   eine Dichte-Textur pro Bildschirm-Block, Farbe gemischt aus
+              den Typen, Helligkeit logarithmisch in der Anzahl
+
+Histogramm und Culling sind kompilierte Einzeldurchläufe über die
+Positionen; die Textur hat die Größe des Sichtbereichs in Blöcken, nicht
+die der Simulation.
+"""
+import numpy as np
+from numba import jit
+
+MODES = ("auto", "markers", "density")
+
+# Ab so vielen sichtbaren Partikeln wird auf die Dichte-Textur umgeschaltet
+MAX_MARKERS = 200_000
+
+# ... oder ab so vielen sichtbaren Partikeln pro Bildschirm-Pixel
+MAX_PARTICLES_PER_PIXEL = 0.5
+
+# Zurück zu den Markern erst unterhalb dieses Anteils der Schwellen
+# (kein Flackern an der Grenze)
+HYSTERESIS = 0.8
+
+# Culling nur, wenn höchstens dieser Anteil sichtbar ist: Ein gecullter
+# Partikel kostet Position + Farbe (24 Byte) statt nur Position (8 Byte).
+CULL_FRACTION = 0.3
+
+# Kantenlänge eines Dichte-Blocks in Bildschirm-Pixeln
+DENSITY_BLOCK_PX = 2
+
+# Obergrenze für Blöcke pro Achse
+MAX_DENSITY_RESOLUTION = 1024
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def viewport_indices(positions, x0, y0, x1, y1, out):
+    """
+    Schreibt die Indizes aller Partikel in [x0, x1) x [y0, y1) aufsteigend
+    nach out (mindestens N Einträge).
+
+    Returns:
+        int: Anzahl der sichtbaren Partikel.
+    """
+    count = 0
+    for i in range(len(positions)):
+        x = positions[i, 0]
+        y = positions[i, 1]
+        if x0 <= x < x1 and y0 <= y < y1:
+            out[count] = i
+            count += 1
+    return count
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def density_histogram(positions, types, x0, y0, x1, y1, counts):
+    """
+    2D-Histogramm pro Typ über den Ausschnitt [x0, x1) x [y0, y1).
+
+    Args:
+        counts (np.ndarray): (T, H, W), wird überschrieben; Zeile = y, Spalte = x.
+
+    Returns:
+        int: Anzahl der einsortierten Partikel.
+    """
+    n_types, height, width = counts.shape
+    counts[:] = 0
+    scale_x = width / (x1 - x0)
+    scale_y = height / (y1 - y0)
+    count = 0
+    for i in range(len(positions)):
+        x = positions[i, 0]
+        y = positions[i, 1]
+        if x0 <= x < x1 and y0 <= y < y1:
+            # min(): Rundung direkt an der oberen Kante
+            col = min(int((x - x0) * scale_x), width - 1)
+            row = min(int((y - y0) * scale_y), height - 1)
+            counts[types[i], row, col] += 1
+            count += 1
+    return count
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def density_image(counts, colors, out):
+    """
+    Mischt das Histogramm zu einem RGBA-Bild (H, W, 4) uint8.
+
+    Die Farbe eines Blocks ist das nach Anzahl gewichtete Mittel der
+    Typ-Farben, die Helligkeit log(1 + n) / log(1 + n_max) mit dem
+    vollsten Block des Bildes als Referenz. Leere Blöcke sind transparent.
+
+    Args:
+        counts (np.ndarray): (T, H, W) aus density_histogram.
+        colors (np.ndarray): RGBA-Farben pro Typ (T, 4) in [0, 1].
+        out (np.ndarray): (H, W, 4) uint8, wird überschrieben.
+    """
+    n_types, height, width = counts.shape
+    n_max = 0
+    for row in range(height):
+        for col in range(width):
+            total = 0
+            for t in range(n_types):
+                total += counts[t, row, col]
+            n_max = max(n_max, total)
+    inv_log_max = 1.0 / np.log1p(n_max) if n_max > 0 else 0.0
+
+    for row in range(height):
+        for col in range(width):
+            total = 0
+            red = 0.0
+            green = 0.0
+            blue = 0.0
+            for t in range(n_types):
+                n = counts[t, row, col]
+                total += n
+                red += n * colors[t, 0]
+                green += n * colors[t, 1]
+                blue += n * colors[t, 2]
+            if total == 0:
+                out[row, col, :] = 0
+                continue
+            gain = 255.0 * np.log1p(total) * inv_log_max / total
+            out[row, col, 0] = min(255, int(red * gain + 0.5))
+            out[row, col, 1] = min(255, int(green * gain + 0.5))
+            out[row, col, 2] = min(255, int(blue * gain + 0.5))
+            out[row, col, 3] = 255
+
+
+class LevelOfDetail:
+    """
+    Entscheidet pro Frame zwischen Markern und Dichte-Textur und liefert
+    die dafür nötigen Daten (gecullte Indizes bzw. RGBA-Bild).
+
+    Die Puffer für Indizes, Histogramm und Bild werden wiederverwendet und
+    wachsen nur bei Bedarf.
+    """
+
+    def __init__(self, mode="auto", max_markers=MAX_MARKERS,
+                 max_particles_per_pixel=MAX_PARTICLES_PER_PIXEL, cull_fraction=CULL_FRACTION,
+                 block_px=DENSITY_BLOCK_PX):
+        """
+        Args:
+            mode (str): "auto" (umschalten), "markers" oder "density" (fest).
+            max_markers (int): Sichtbare Partikel, ab denen "auto" die
+                Dichte-Textur zeigt.
+            max_particles_per_pixel (float): Ebenso ab dieser Dichte auf dem
+                Bildschirm (d.h. abhängig vom Zoom).
+            cull_fraction (float): Marker nur für sichtbare Partikel
+                hochladen, wenn höchstens dieser Anteil sichtbar ist (0 = nie).
+            block_px (int): Kantenlänge eines Dichte-Blocks in Pixeln.
+        """
+        self.mode = mode
+        self.max_markers = max_markers
+        self.max_particles_per_pixel = max_particles_per_pixel
+        self.cull_fraction = cull_fraction
+        self.block_px = block_px
+
+        # Ergebnis des letzten update()
+        self.level = "markers"
+        self.n_visible = 0
+        self.indices = None
+        self.image = None
+        self.image_rect = None
+
+        self._indices = np.empty(0, dtype=np.int64)
+        self._counts = np.empty((0, 0, 0), dtype=np.uint32)
+        self._image = np.empty((0, 0, 4), dtype=np.uint8)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        if value not in MODES:
+            raise ValueError(f"Unbekannter LOD-Modus: {value!r} (verfügbar: {', '.join(MODES)})")
+        self._mode = value
+
+    def cycle_mode(self):
+        """Nächster Modus in MODES (für die Tastatursteuerung)."""
+        self.mode = MODES[(MODES.index(self.mode) + 1) % len(MODES)]
+        return self.mode
+
+    def _choose(self, n_visible, pixels):
+        """Stufe für n_visible Partikel auf pixels Bildschirm-Pixeln (mit Hysterese)."""
+        if self.mode != "auto":
+            return self.mode
+        factor = HYSTERESIS if self.level == "density" else 1.0
+        crowded = (n_visible > factor * self.max_markers
+                   or n_visible > factor * self.max_particles_per_pixel * pixels)
+        return "density" if crowded else "markers"
+
+    def update(self, positions, types, colors, rect, viewport_px):
+        """
+        Bereitet den nächsten Frame vor.
+
+        Args:
+            positions (np.ndarray): (N, 2) in [0, 1)².
+            types (np.ndarray): Typ pro Partikel (N,), gleiche Reihenfolge.
+            colors (np.ndarray): RGBA-Farben pro Typ (T, 4).
+            rect (tuple): Sichtbereich der Kamera (x, y, Breite, Höhe) in
+                Simulationseinheiten, z.B. PanZoomCamera.rect.
+            viewport_px (tuple): Größe des Sichtbereichs in Pixeln (Breite, Höhe).
+
+        Returns:
+            str: "markers" oder "density". Bei "markers" ist indices None
+            (alle Partikel) oder ein Array der sichtbaren Partikel; bei
+            "density" enthält image das RGBA-Bild für image_rect
+            (x, y, Breite, Höhe), den auf die Box [0, 1)² beschnittenen Sichtbereich.
+        """
+        x, y, width, height = rect
+        x0, y0 = max(x, 0.0), max(y, 0.0)
+        x1, y1 = min(x + width, 1.0), min(y + height, 1.0)
+        n_particles = len(positions)
+        pixels = max(viewport_px[0] * viewport_px[1], 1)
+        self.indices = None
+
+        if x1 <= x0 or y1 <= y0:
+            # Kamera zeigt nur Bereich außerhalb der Box
+            self.level, self.n_visible = "markers", 0
+            self.indices = self._indices[:0]
+            return self.level
+
+        covers_box = x0 == 0.0 and y0 == 0.0 and x1 == 1.0 and y1 == 1.0
+        if covers_box:
+            n_visible = n_particles
+        else:
+            if len(self._indices) < n_particles:
+                self._indices = np.empty(max(n_particles, 2 * len(self._indices)),
+                                         dtype=np.int64)
+            n_visible = viewport_indices(positions, x0, y0, x1, y1, self._indices)
+        self.n_visible = n_visible
+        self.level = self._choose(n_visible, pixels)
+
+        if self.level == "markers":
+            if not covers_box and n_visible <= self.cull_fraction * n_particles:
+                self.indices = self._indices[:n_visible]
+            return self.level
+
+        # Blöcke nach der Pixelgröße des beschnittenen Ausschnitts
+        columns = min(max(1, int(np.ceil(viewport_px[0] * (x1 - x0) / width / self.block_px))),
+                      MAX_DENSITY_RESOLUTION)
+        rows = min(max(1, int(np.ceil(viewport_px[1] * (y1 - y0) / height / self.block_px))),
+                   MAX_DENSITY_RESOLUTION)
+        n_types = len(colors)
+        if self._counts.shape != (n_types, rows, columns):
+            self._counts = np.empty((n_types, rows, columns), dtype=np.uint32)
+            self._image = np.empty((rows, columns, 4), dtype=np.uint8)
+        density_histogram(positions, types, x0, y0, x1, y1, self._counts)
+        density_image(self._counts, np.asarray(colors, dtype=np.float64), self._image)
+        self.image = self._image
+        self.image_rect = (x0, y0, x1 - x0, y1 - y0)
+        return self.level
@@ -4,13 +4,17 @@ Haupteinstiegspunkt für den Particle Life Simulator.
 Dieses Skript initialisiert das Partikelsystem, die physikalischen Regeln
 (Interaktionen) und die Simulationsengine. Anschließend wird die visuelle
 Darstellung (Frontend) mittels Vispy gestartet.
+
+Die Paket-Importe stehen bewusst in main(): So lässt sich die Startzeit
+(Import, Kompilierung, erster Schritt) getrennt messen, und wer dieses Modul
+nur importiert, lädt weder Numba noch Vispy.
 """
-from src.particle_life_simulator.particles import ParticleSystem
-from src.particle_life_simulator.interaction import Interaction
-from src.particle_life_simulator.simulation import Simulation
-from src.particle_life_simulator.visualisation import Visualizer
+import argparse
+import json
+
+from particle_life_simulator.startup import StartupTimer
 
-def main():
+def main(argv=None):
     """
     Hauptfunktion zum Starten der Particle-Life-Simulation.
     
@@ -18,11 +22,51 @@ def main():
     initialisiert die notwendigen Backend-Klassen (Partikel, Interaktionen, Simulation)
     und startet das grafische Frontend in einem eigenen Fenster.
     """
+    parser = argparse.ArgumentParser(prog="particle-life")
+    parser.add_argument("--replay", metavar="TRAJEKTORIE",
+                        help="Aufgezeichnete Trajektorie abspielen statt live zu simulieren")
+    parser.add_argument("--steps-per-frame", type=int, default=1, metavar="N",
+                        help="Physik-Schritte pro gezeichnetem Frame (Default: 1)")
+    parser.add_argument("--profile", default="linear",
+                        help="Kraftprofil: linear, classic oder smooth (Default: linear)")
+    parser.add_argument("--core", type=float, default=0.0,
+                        help="Abstoßender Kern als Anteil des Radius (Default: 0)")
+    parser.add_argument("--matrix", metavar="JSON",
+                        help="Interaktionsmatrix aus Datei (z.B. von particle-life-search)")
+    parser.add_argument("--backend", default=None,
+                        help="Rechen-Backend der Kraftberechnung, z.B. numpy, cells oder "
+                             "auto (Autotuner); Default: aus Partikelzahl und max_r")
+    parser.add_argument("--lod", default="auto", choices=("auto", "markers", "density"),
+                        help="Level of Detail: Marker, Dichte-Textur oder automatisch "
+                             "nach Anzahl und Zoom (Default: auto)")
+    args = parser.parse_args(argv)
+
     print("=== Particle Life Simulator (Milestone 4 Build) ===")
+    timer = StartupTimer()
+
+    with timer.phase("import"):
+        from particle_life_simulator.particles import ParticleSystem
+        from particle_life_simulator.interaction import Interaction
+        from particle_life_simulator.simulation import Simulation
+        from particle_life_simulator.replay import ReplayPlayer
+        from particle_life_simulator.trajectory import TrajectoryReader
+    with timer.phase("import_gui"):
+        from particle_life_simulator.visualisation import Visualizer
+
+    if args.replay:
+        print(f"-> Replay: {args.replay}")
+        viz = Visualizer(replay=ReplayPlayer(TrajectoryReader(args.replay)), lod=args.lod)
+        viz.run()
+        return
  
     # 1. Konfiguration
     NUMBER_OF_PARTICLES = 2000  # Zielwert für Performance-Optimierung
     NUMBER_OF_TYPES = 4         # Mindestens 4 Typen erforderlich
+    matrix = None
+    if args.matrix:
+        with open(args.matrix, encoding="utf-8") as f:
+            matrix = json.load(f)["matrix"]
+        NUMBER_OF_TYPES = len(matrix)
 
     # Physik-Parameter
     DT = 0.001       # Zeitschritt
@@ -35,15 +79,25 @@ def main():
     particles = ParticleSystem(NUMBER_OF_PARTICLES, NUMBER_OF_TYPES)
 
     print("-> Initialisiere Regeln...")
-    interactions = Interaction(NUMBER_OF_TYPES)
+    if matrix is None:
+        interactions = Interaction(NUMBER_OF_TYPES, profile=args.profile, core=args.core)
+    else:
+        interactions = Interaction.from_matrix(matrix, profile=args.profile, core=args.core)
 
     print("-> Starte Physik-Engine...") 
     # Übergabe aller Parameter inkl. Noise an die Simulation
-    sim = Simulation(DT, MAX_R, FRICTION, NOISE, particles, interactions)
+    sim = Simulation(DT, MAX_R, FRICTION, NOISE, particles, interactions, backend=args.backend)
+
+    # Kernel vor dem ersten Frame kompilieren bzw. aus dem Cache laden
+    print("-> Kompiliere Kernel...")
+    timer.record("compile", sim.warmup())
+    with timer.phase("first_step"):
+        sim.step()
+    print(f"-> {timer.report()}")
 
     # 3. Start Frontend
     print("-> Öffne Fenster (Vispy)...")
-    viz = Visualizer(sim)
+    viz = Visualizer(sim, steps_per_frame=args.steps_per_frame, lod=args.lod)
     viz.run()
 
 if __name__ == "__main__":
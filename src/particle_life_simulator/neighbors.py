@@ -0,0 +1,303 @@
+"""
+Verlet-Nachbarlisten mit Skin-Radius.
+
+Statt in jedem Schritt die Zellliste neu aufzubauen und alle 3x3
+Nachbarzellen abzusuchen, wird einmal eine kompakte Paarliste im
+CSR-Format angelegt: die Nachbarn von Partikel i stehen in
+neighbors[offsets[i]:offsets[i + 1]]. Aufgenommen werden alle Partikel
+innerhalb von list_r = max_r + skin. Solange sich seit dem Aufbau kein
+Partikel um mehr als skin / 2 bewegt hat, liegt jedes Paar mit Abstand
+< max_r noch in der Liste, und sie kann unverändert weiterbenutzt werden.
+
+Die Liste ist vollständig (jedes Paar steht bei beiden Partnern), damit
+jede Iteration wie bei den anderen Kernen nur forces[i] schreibt: keine
+Races, keine Reduktion, serielles und paralleles Ergebnis bitgleich. Die
+Nachbarn jeder Zeile sind aufsteigend sortiert; Paare außerhalb von max_r
+tragen exakt 0 bei, das Ergebnis ist daher bitgleich zum O(N²)-Kernel und
+hängt nicht davon ab, wann die Liste zuletzt aufgebaut wurde (Checkpoints
+setzen bitgenau fort).
+
+Der Kraft-Kernel prüft die Verschiebung selbst und baut die Liste bei
+Bedarf neu auf, auch innerhalb eines fusionierten run()-Blocks. Reicht
+die Kapazität nicht, rechnet er den Schritt über die Zellliste und
+NeighborList vergrößert die Puffer vor dem nächsten Aufruf.
+"""
+import numpy as np
+from numba import jit, prange
+
+from particle_life_simulator.forces import (
+    DETERMINISTIC_FASTMATH,
+    _variant,
+    build_cell_list,
+    cell_index,
+    pair_force,
+    particle_force,
+    particle_force_cells,
+)
+
+# Indizes im Zähler-Array stats
+BUILDS = 0          # Aufbauten der Liste
+STEPS = 1           # Kraftberechnungen über die Liste
+FALLBACKS = 2       # Schritte ohne gültige Liste (Kapazität zu klein)
+PAIRS = 3           # Paare beim letzten Aufbau (auch wenn sie nicht passten)
+N_STATS = 4
+
+# Obergrenze für Zellen pro Achse beim Listenaufbau (wie in simulation.py)
+MAX_BUILD_CELLS = 256
+
+# Reserve beim Anlegen der Puffer, damit die Paarzahl schwanken darf
+CAPACITY_HEADROOM = 1.25
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def distance_sq(pos_x_i, pos_y_i, pos_x_j, pos_y_j):
+    """Quadrierter Abstand auf dem Torus (kürzester Weg)."""
+    dx = pos_x_j - pos_x_i
+    dy = pos_y_j - pos_y_i
+
+    if dx > 0.5:
+        dx -= 1.0
+    elif dx < -0.5:
+        dx += 1.0
+
+    if dy > 0.5:
+        dy -= 1.0
+    elif dy < -0.5:
+        dy += 1.0
+
+    return dx * dx + dy * dy
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def exceeds_displacement(positions, reference, limit_sq):
+    """True, sobald ein Partikel weiter als sqrt(limit_sq) von reference entfernt ist."""
+    for i in range(len(positions)):
+        if distance_sq(reference[i, 0], reference[i, 1], positions[i, 0],
+                       positions[i, 1]) > limit_sq:
+            return True
+    return False
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _sort_rows(offsets, neighbors, n_pairs):
+    """
+    Sortiert die Nachbarn jeder Zeile aufsteigend, indem die (symmetrische)
+    Liste transponiert wird: Zeile a wird in aufsteigender Reihenfolge
+    abgearbeitet und a an die Zeilen ihrer Nachbarn angehängt. Ein linearer
+    Durchlauf statt einer Sortierung pro Zeile.
+    """
+    unsorted = neighbors[:n_pairs].copy()
+    fill = offsets[:-1].copy()
+    for a in range(len(offsets) - 1):
+        for k in range(offsets[a], offsets[a + 1]):
+            b = unsorted[k]
+            neighbors[fill[b]] = a
+            fill[b] += 1
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def build_neighbor_list(positions, list_r, offsets, neighbors, reference):
+    """
+    Baut die CSR-Liste aller Paare mit Abstand < list_r auf (über eine
+    Zellliste mit Zellbreite >= list_r, bei weniger als 3 Zellen O(N²)) und
+    merkt sich die Positionen in reference. Die Nachbarn jeder Zeile sind
+    aufsteigend sortiert.
+
+    Passen nicht alle Paare in neighbors, wird weitergezählt, aber nichts
+    mehr geschrieben; die Liste ist dann ungültig.
+
+    Returns:
+        int: Anzahl der Paare (> len(neighbors) = Kapazität zu klein).
+    """
+    n_particles = len(positions)
+    capacity = len(neighbors)
+    list_r_sq = list_r * list_r
+    n_cells = min(int(1.0 / list_r), MAX_BUILD_CELLS)
+    n_pairs = 0
+
+    if n_cells < 3:
+        for i in range(n_particles):
+            offsets[i] = min(n_pairs, capacity)
+            for j in range(n_particles):
+                if i != j and distance_sq(positions[i, 0], positions[i, 1], positions[j, 0],
+                                          positions[j, 1]) < list_r_sq:
+                    if n_pairs < capacity:
+                        neighbors[n_pairs] = j
+                    n_pairs += 1
+    else:
+        cell_start, cell_particles = build_cell_list(positions, n_cells)
+        for i in range(n_particles):
+            offsets[i] = min(n_pairs, capacity)
+            pos_x_i = positions[i, 0]
+            pos_y_i = positions[i, 1]
+            cx, cy = cell_index(pos_x_i, pos_y_i, n_cells)
+            for ox in range(-1, 2):
+                ncx = (cx + ox) % n_cells
+                for oy in range(-1, 2):
+                    cell = ncx * n_cells + (cy + oy) % n_cells
+                    for k in range(cell_start[cell], cell_start[cell + 1]):
+                        j = cell_particles[k]
+                        if i != j and distance_sq(pos_x_i, pos_y_i, positions[j, 0],
+                                                  positions[j, 1]) < list_r_sq:
+                            if n_pairs < capacity:
+                                neighbors[n_pairs] = j
+                            n_pairs += 1
+    offsets[n_particles] = min(n_pairs, capacity)
+
+    # Über die Zellliste liegen die Zeilen in Zellreihenfolge vor
+    if n_cells >= 3 and n_pairs <= capacity:
+        _sort_rows(offsets, neighbors, n_pairs)
+
+    for i in range(n_particles):
+        reference[i, 0] = positions[i, 0]
+        reference[i, 1] = positions[i, 1]
+    return n_pairs
+
+
+def _compute_forces_list(positions, types, table, max_r, forces, neighbor_list):
+    """
+    Kraft-Kernel über die Verlet-Liste.
+
+    neighbor_list ist das Tupel aus NeighborList.prepare() und wird an der
+    Stelle von n_cells übergeben (einheitliche Signatur aller Kraft-Kernel).
+    Hat sich ein Partikel seit dem Aufbau um mehr als skin / 2 bewegt, wird
+    die Liste zuerst (seriell) neu aufgebaut.
+    """
+    offsets, neighbors, reference, stats, list_r, limit_sq = neighbor_list
+    stats[STEPS] += 1
+    if exceeds_displacement(positions, reference, limit_sq):
+        stats[PAIRS] = build_neighbor_list(positions, list_r, offsets, neighbors, reference)
+        stats[BUILDS] += 1
+
+    if stats[PAIRS] > len(neighbors):
+        # Liste unvollständig: diesen Schritt ohne Liste rechnen
+        stats[FALLBACKS] += 1
+        n_cells = min(int(1.0 / max_r), MAX_BUILD_CELLS)
+        if n_cells < 3:
+            for i in prange(len(positions)):
+                fx, fy = particle_force(i, positions, types, table, max_r)
+                forces[i, 0] = fx
+                forces[i, 1] = fy
+        else:
+            cell_start, cell_particles = build_cell_list(positions, n_cells)
+            for i in prange(len(positions)):
+                fx, fy = particle_force_cells(i, positions, types, table, max_r, cell_start,
+                                              cell_particles, n_cells)
+                forces[i, 0] = fx
+                forces[i, 1] = fy
+        return
+
+    inv_max_r = 1.0 / max_r
+    for i in prange(len(positions)):
+        total_force_x = 0.0
+        total_force_y = 0.0
+        pos_x_i = positions[i, 0]
+        pos_y_i = positions[i, 1]
+        type_i = types[i]
+
+        for k in range(offsets[i], offsets[i + 1]):
+            j = neighbors[k]
+            fx, fy = pair_force(pos_x_i, pos_y_i, positions[j, 0], positions[j, 1], table,
+                                type_i, types[j], inv_max_r)
+            total_force_x += fx
+            total_force_y += fy
+
+        forces[i, 0] = total_force_x
+        forces[i, 1] = total_force_y
+
+
+compute_forces_list = jit(nopython=True, nogil=True, cache=True, fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces_list, "_serial"))
+compute_forces_list_parallel = jit(nopython=True, nogil=True, parallel=True, cache=True,
+                                   fastmath=DETERMINISTIC_FASTMATH)(
+    _variant(_compute_forces_list, "_parallel"))
+
+
+class NeighborList:
+    """
+    Puffer und Zähler einer Verlet-Liste für eine Simulation.
+
+    Die Liste selbst wird im Kraft-Kernel gepflegt; prepare() sorgt vor
+    jedem Kernel-Aufruf dafür, dass Puffer und Parameter zum aktuellen
+    Zustand passen (Partikelanzahl, max_r, Kapazität).
+    """
+
+    def __init__(self, skin=0.1):
+        """
+        Args:
+            skin (float): Skin-Radius als Anteil von max_r. Größer = seltener
+                neu aufbauen, aber mehr Paare pro Schritt.
+        """
+        if skin <= 0:
+            raise ValueError(f"skin muss > 0 sein, nicht {skin}")
+
+        self.skin = skin
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.neighbors = np.zeros(0, dtype=np.int32)
+        self.reference = None
+        self.stats = np.zeros(N_STATS, dtype=np.int64)
+        self._max_r = None
+
+    def prepare(self, positions, max_r):
+        """
+        Passt die Puffer an und gibt das Tupel für compute_forces_list zurück.
+
+        Baut die Liste sofort neu auf, wenn sich Partikelanzahl, Datentyp
+        oder max_r geändert haben oder der letzte Aufbau nicht in die Puffer
+        gepasst hat (dann mit größerer Kapazität).
+        """
+        list_r = max_r * (1.0 + self.skin)
+        n_particles = len(positions)
+        stale = (self.reference is None or len(self.reference) != n_particles
+                 or self.reference.dtype != positions.dtype or self._max_r != max_r)
+        if stale or self.stats[PAIRS] > len(self.neighbors):
+            if stale:
+                self.offsets = np.zeros(n_particles + 1, dtype=np.int64)
+                self.reference = np.empty((n_particles, 2), dtype=positions.dtype)
+                self._max_r = max_r
+            n_pairs = build_neighbor_list(positions, list_r, self.offsets, self.neighbors,
+                                          self.reference)
+            if n_pairs > len(self.neighbors):
+                self.neighbors = np.zeros(int(n_pairs * CAPACITY_HEADROOM) + 1, dtype=np.int32)
+                n_pairs = build_neighbor_list(positions, list_r, self.offsets, self.neighbors,
+                                              self.reference)
+            self.stats[PAIRS] = n_pairs
+            self.stats[BUILDS] += 1
+
+        limit = 0.5 * self.skin * max_r
+        return (self.offsets, self.neighbors, self.reference, self.stats, list_r, limit * limit)
+
+    def reset_stats(self):
+        """Setzt die Zähler für Aufbauten, Schritte und Fallbacks zurück."""
+        self.stats[[BUILDS, STEPS, FALLBACKS]] = 0
+
+    @property
+    def n_builds(self):
+        return int(self.stats[BUILDS])
+
+    @property
+    def n_steps(self):
+        return int(self.stats[STEPS])
+
+    @property
+    def n_pairs(self):
+        """Anzahl der Paare in der aktuellen Liste (jedes Paar zweimal)."""
+        return int(self.stats[PAIRS])
+
+    @property
+    def rebuild_rate(self):
+        """Aufbauten pro Kraftberechnung (0 = Liste nie erneuert)."""
+        return self.n_builds / max(self.n_steps, 1)
+
+    @property
+    def nbytes(self):
+        """Speicher der Liste in Bytes (Offsets, Nachbarn, Referenzpositionen)."""
+        reference = 0 if self.reference is None else self.reference.nbytes
+        return self.offsets.nbytes + self.neighbors.nbytes + reference
+
+    def metrics(self):
+        """Kennzahlen für Logs und Benchmarks."""
+        return {"neighbor_builds": self.n_builds, "neighbor_steps": self.n_steps,
+                "neighbor_rebuild_rate": self.rebuild_rate,
+                "neighbor_fallback_steps": int(self.stats[FALLBACKS]),
+                "neighbor_pairs": self.n_pairs, "neighbor_list_mb": self.nbytes / 1e6}
@@ -0,0 +1,187 @@
+"""
+Schlanker Vispy-Visual für Partikel mit persistentem Vertex-Buffer.
+
+Markers.set_data baut bei jedem Aufruf den kompletten Vertex-Buffer neu auf
+(Position, Größe, Rand, Füll- und Randfarbe, Symbol) und lädt alles erneut
+auf die GPU. Farben und Größen der Partikel ändern sich aber nie. Dieser
+Visual lädt sie einmalig hoch; pro Frame werden nur die Positionen als
+float32 (8 Byte pro Partikel) in einen bestehenden Buffer gestreamt.
+
+Die Buffer haben eine Kapazität; ändert sich die Partikelanzahl, werden nur
+die betroffenen Slots nachgeladen (Farben per set_colors(), Größe 0 für
+inaktive Slots).
+"""
+import colorsys
+import time
+
+import numpy as np
+from vispy import gloo
+from vispy.scene.visuals import create_visual_node
+from vispy.visuals import Visual
+
+VERTEX_SHADER = """
+attribute vec2 a_position;
+attribute vec4 a_color;
+attribute float a_size;
+varying vec4 v_color;
+
+void main() {
+    gl_Position = $transform(vec4(a_position, 0.0, 1.0));
+    gl_PointSize = a_size;
+    v_color = a_color;
+    // Inaktive Slots (Größe 0) außerhalb des Sichtbereichs verwerfen
+    if (a_size <= 0.0)
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+}
+"""
+
+# Runde Punkte ohne Rand, wie Markers(edge_width=0, symbol="disc")
+FRAGMENT_SHADER = """
+varying vec4 v_color;
+
+void main() {
+    vec2 d = gl_PointCoord - vec2(0.5);
+    if (dot(d, d) > 0.25)
+        discard;
+    gl_FragColor = v_color;
+}
+"""
+
+# Feste Farben der ersten Typen: 0=Rot, 1=Grün, 2=Blau, 3=Weiß
+BASE_COLORS = np.array([
+    [1.0, 0.2, 0.2, 1.0],  # Rot
+    [0.2, 1.0, 0.2, 1.0],  # Grün
+    [0.2, 0.2, 1.0, 1.0],  # Blau
+    [1.0, 1.0, 1.0, 1.0]   # Weiß
+])
+
+
+def type_colors(n_types):
+    """
+    RGBA-Farben für n_types Typen (n_types, 4).
+
+    Die ersten Typen bekommen BASE_COLORS, weitere Typen Farbtöne im
+    goldenen Winkel, damit auch benachbarte Typ-IDs unterscheidbar bleiben.
+    """
+    colors = np.ones((n_types, 4))
+    n_base = min(n_types, len(BASE_COLORS))
+    colors[:n_base] = BASE_COLORS[:n_base]
+    for t in range(n_base, n_types):
+        hue = (0.1 + (t - n_base) * 0.618034) % 1.0
+        colors[t, :3] = colorsys.hsv_to_rgb(hue, 0.7, 1.0)
+    return colors
+
+
+class ParticleVisual(Visual):
+    """
+    Zeichnet N Partikel als Punkte. Farben und Größen sind statisch,
+    set_positions() ersetzt nur den Inhalt des Positions-Buffers.
+    """
+
+    def __init__(self, colors, size=8.0, capacity=None):
+        """
+        Args:
+            colors (np.ndarray): RGBA-Farben pro Partikel (N, 4).
+            size (float oder np.ndarray): Punktgröße in Pixeln (global oder pro Partikel).
+            capacity (int, optional): Slots der GPU-Buffer (Default: N).
+        """
+        Visual.__init__(self, vcode=VERTEX_SHADER, fcode=FRAGMENT_SHADER)
+        colors = np.asarray(colors, dtype=np.float32)
+        self._count = len(colors)
+        self._size = size
+        self._allocate(self._count if capacity is None else max(capacity, self._count))
+        self._colors[:self._count] = colors
+        self._color_buffer.set_subdata(self._colors)
+        self.upload_time = 0.0
+
+        self._draw_mode = "points"
+        self.set_gl_state("translucent", depth_test=False)
+
+    def _allocate(self, capacity):
+        """Legt alle Buffer mit capacity Slots neu an (bisherige Daten bleiben)."""
+        staging = np.zeros((capacity, 2), dtype=np.float32)
+        colors = np.zeros((capacity, 4), dtype=np.float32)
+        if hasattr(self, "_staging"):
+            staging[:len(self._staging)] = self._staging
+            colors[:len(self._colors)] = self._colors
+
+        # Staging-Array: float64 -> float32 in einem Durchgang, ohne neue Allokation
+        self._staging = staging
+        self._colors = colors
+        self._sizes = np.zeros(capacity, dtype=np.float32)
+        self._sizes[:self._count] = np.broadcast_to(np.asarray(self._size, dtype=np.float32),
+                                                    (capacity,))[:self._count]
+
+        self._positions = gloo.VertexBuffer(self._staging)
+        self._color_buffer = gloo.VertexBuffer(self._colors)
+        self._size_buffer = gloo.VertexBuffer(self._sizes)
+        self.shared_program["a_position"] = self._positions
+        self.shared_program["a_color"] = self._color_buffer
+        self.shared_program["a_size"] = self._size_buffer
+
+    @property
+    def n_particles(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return len(self._staging)
+
+    def _set_count(self, count):
+        """Aktiviert bzw. deaktiviert Slots; lädt nur die geänderten Größen hoch."""
+        if count > self.capacity:
+            self._allocate(max(count, 2 * self.capacity))
+        low, high = sorted((self._count, count))
+        sizes = np.broadcast_to(np.asarray(self._size, dtype=np.float32), (self.capacity,))
+        self._sizes[low:high] = sizes[low:high] if count > self._count else 0.0
+        self._count = count
+        if high > low:
+            self._size_buffer.set_subdata(self._sizes[low:high], offset=low)
+
+    def set_colors(self, ids, colors):
+        """
+        Setzt die Farben einzelner Slots und lädt nur den Bereich zwischen
+        kleinstem und größtem geänderten Slot hoch.
+
+        Args:
+            ids (np.ndarray): Slots (sortiert oder nicht).
+            colors (np.ndarray): RGBA-Farben (len(ids), 4).
+        """
+        if len(ids) == 0:
+            return
+        if ids.max() >= self.capacity:
+            self._allocate(max(int(ids.max()) + 1, 2 * self.capacity))
+        self._colors[ids] = colors
+        low, high = int(ids.min()), int(ids.max()) + 1
+        self._color_buffer.set_subdata(self._colors[low:high], offset=low)
+        self.update()
+
+    def set_positions(self, positions):
+        """
+        Überträgt neue Positionen (N, 2) in den bestehenden Vertex-Buffer.
+
+        Die Daten werden in das float32-Staging-Array kopiert und per
+        set_subdata hochgeladen; Größe und Layout des Buffers bleiben gleich.
+        Wird zweimal vor dem nächsten Zeichnen aufgerufen, zeigt die GPU den
+        neueren Stand, da beide Befehle auf dasselbe Array verweisen. Weicht
+        N von der bisherigen Anzahl ab, werden Slots (de)aktiviert.
+        """
+        start_time = time.perf_counter()
+        count = len(positions)
+        if count != self._count:
+            self._set_count(count)
+        staging = self._staging[:count]
+        np.copyto(staging, positions, casting="same_kind")
+        self._positions.set_subdata(staging)
+        self.upload_time = time.perf_counter() - start_time
+        self.update()
+
+    def _prepare_transforms(self, view):
+        view.view_program.vert["transform"] = view.get_transform()
+
+    def _compute_bounds(self, axis, view):
+        # Die Simulationsbox ist immer [0, 1)²
+        return (0.0, 1.0) if axis < 2 else (0.0, 0.0)
+
+
+Particles = create_visual_node(ParticleVisual)
@@ -1,41 +1,394 @@
 import numpy as np
 
+from particle_life_simulator.rng import resolve_seed
+
+LAYOUTS = ("aos", "soa")
+
+
+def _allocate(n_particles, dtype, layout):
+    """
+    Leeres (N, 2) Array. Bei "soa" ist es die transponierte Sicht auf ein
+    (2, N) Array: x und y liegen jeweils zusammenhängend im Speicher, alle
+    Kernel können es trotzdem wie gewohnt mit [i, 0] / [i, 1] indizieren.
+    """
+    if layout == "soa":
+        return np.zeros((2, n_particles), dtype=dtype).T
+    return np.zeros((n_particles, 2), dtype=dtype)
+
+
+def _survivors(removed, start, stop):
+    """Werte aus range(start, stop), die nicht in removed vorkommen (sortiert)."""
+    keep = np.ones(stop - start, dtype=bool)
+    removed = removed[(removed >= start) & (removed < stop)]
+    keep[removed - start] = False
+    return start + np.flatnonzero(keep)
+
+
 class ParticleSystem:
     """
     Zentrale Klasse zur Verwaltung aller Partikel.
     Nutzt NumPy Arrays für performante Berechnungen (Vektorisierung),
     statt einzelner Python-Objekte pro Partikel.
+
+    Die Arrays werden mit einer Kapazität angelegt; aktiv sind nur die ersten
+    n_particles Slots. positions, velocities, types, accelerations und ids
+    sind Sichten auf genau diese Slots, alle Kernel laufen also nur über
+    aktive Partikel. spawn()/add() hängen hinten an, remove() füllt Lücken
+    mit den letzten aktiven Partikeln (Swap-Remove), beides in O(k).
     """
-    def __init__(self, n_particles: int, n_types: int):
+    def __init__(self, n_particles: int, n_types: int, dtype=np.float64, types_dtype=np.int64,
+                 layout="aos", capacity=None, seed=None):
         """
         Initialisiert das System mit N Partikeln und T Typen.
 
         Args:
             n_particles (int): Anzahl der zu simulierenden Partikel (z.B. 2000).
             n_types (int): Anzahl der verschiedenen Partikel-Typen/Farben.
+            dtype: Gleitkommatyp des Zustands. np.float32 halbiert die
+                Datenmenge, die der Kraft-Kernel pro Schritt liest.
+            types_dtype: Ganzzahltyp der Typen, z.B. np.uint8 (bis 256 Typen).
+            layout (str): "aos" = (N, 2) zeilenweise, "soa" = x und y als
+                getrennte zusammenhängende Arrays (siehe x / y).
+            capacity (int, optional): Vorab reservierte Slots für spätere
+                spawn()-Aufrufe (Default: n_particles). Reicht sie nicht,
+                wird sie verdoppelt.
+            seed (int, optional): Seed für Startzustand und spawn() (None =
+                aus np.random gezogen, siehe rng.resolve_seed).
         """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unbekanntes Layout: {layout!r} (verfügbar: {', '.join(LAYOUTS)})")
+        if n_types - 1 > np.iinfo(types_dtype).max:
+            raise ValueError(f"{n_types} Typen passen nicht in {np.dtype(types_dtype).name}")
+        capacity = n_particles if capacity is None else capacity
+        if capacity < n_particles:
+            raise ValueError(f"capacity ({capacity}) ist kleiner als n_particles ({n_particles})")
+
         self.n_particles = n_particles
         self.n_types = n_types
+        self.layout = layout
+        self.seed = resolve_seed(seed)
+        self._rng = None
 
         # 1. Positionen (x, y)
         # Ein Array der Form (N, 2). Werte zwischen 0.0 und 1.0.
         # Zeile = Partikel, Spalte 0 = x, Spalte 1 = y
-        self.positions = np.random.rand(n_particles, 2)
+        self._positions = _allocate(capacity, dtype, layout)
+        self.positions[:] = self.rng.random((n_particles, 2))
 
         # 2. Geschwindigkeiten (vx, vy)
         # ein Array der Form (N, 2). Initialisiert mit 0.
-        self.velocities = np.zeros((n_particles, 2))
+        self._velocities = _allocate(capacity, dtype, layout)
 
-        # 3. Beschleunigungen (ax, ay)
-        self.accelerations= np.zeros((n_particles, 2))
+        # 3. Beschleunigungen (ax, ay): erst beim ersten Zugriff angelegt,
+        # also nur, wenn ein Integrator tatsächlich Kräfte berechnet
+        self._accelerations = None
 
         # 4. Typen (Farben)
         # ein Array der Form (N,). Werte sind Integer von 0 bis n_types-1.
         # Z.B. [0, 3, 1, 0, 2, ...]
-        self.types = np.random.randint(0, n_types, size=n_particles)
+        self._types = np.zeros(capacity, dtype=types_dtype)
+        self.types[:] = self.rng.integers(0, n_types, size=n_particles)
+
+        # 5. Stabile IDs: ids[k] = ID des Partikels in Slot k, _slots ist die
+        # Umkehrung. Beide None, solange Slot = ID gilt, siehe permute()
+        self._ids = None
+        self._slots = None
+
+        # Seit dem letzten pop_changes() neu vergebene IDs (siehe dort)
+        self._changed_ids = set()
+        self._changed_from = n_particles
 
         print(f"--> ParticleSystem initialisiert: {n_particles} Partikel, {n_types} Typen.")
-        print(f"    Memory Layout: Positions={self.positions.shape}, Types={self.types.shape}")
+        print(f"    Memory Layout: Positions={self.positions.shape} {self.positions.dtype} "
+              f"({layout}), Types={self.types.shape} {self.types.dtype}")
+
+    @classmethod
+    def from_arrays(cls, positions, velocities, types, accelerations=None, ids=None, seed=None,
+                    n_types=None):
+        """
+        Erzeugt ein System aus vorhandenen Arrays (z.B. aus einem Checkpoint),
+        ohne sie zu kopieren. Die Kapazität entspricht der Partikelanzahl.
+
+        n_types (Default: größter vorkommender Typ + 1) sollte angegeben
+        werden, wenn nicht jeder Typ vorkommen muss, etwa nach remove();
+        spawn() akzeptiert nur Typen darunter.
+        """
+        system = cls.__new__(cls)
+        # Seed erst bei Bedarf ziehen (siehe rng), from_arrays verbraucht nichts
+        system.seed = seed
+        system._rng = None
+        system.n_particles = len(positions)
+        if n_types is None:
+            n_types = int(types.max()) + 1 if len(types) else 0
+        system.n_types = n_types
+        system.layout = "soa" if positions.flags.f_contiguous and len(positions) > 1 else "aos"
+        system._positions = positions
+        system._velocities = velocities
+        system._accelerations = accelerations
+        system._types = types
+        system._ids = ids
+        system._slots = None
+        if ids is not None:
+            system._slots = np.empty_like(ids)
+            system._slots[ids] = np.arange(len(ids))
+        system._changed_ids = set()
+        system._changed_from = system.n_particles
+        return system
+
+    @property
+    def rng(self):
+        """Eigener Zufallsgenerator (Startzustand, spawn())."""
+        if self._rng is None:
+            self.seed = resolve_seed(self.seed)
+            self._rng = np.random.default_rng(self.seed)
+        return self._rng
+
+    @property
+    def positions(self):
+        """Positionen der aktiven Partikel (N, 2)."""
+        return self._positions[:self.n_particles]
+
+    @property
+    def velocities(self):
+        """Geschwindigkeiten der aktiven Partikel (N, 2)."""
+        return self._velocities[:self.n_particles]
+
+    @property
+    def types(self):
+        """Typen der aktiven Partikel (N,)."""
+        return self._types[:self.n_particles]
+
+    @property
+    def accelerations(self):
+        """Kraft-Puffer (N, 2) im Layout und Datentyp der Positionen."""
+        if self._accelerations is None:
+            self._accelerations = np.zeros_like(self._positions)
+        return self._accelerations[:self.n_particles]
+
+    @accelerations.setter
+    def accelerations(self, value):
+        self._accelerations = value
+
+    @property
+    def ids(self):
+        """ID je aktivem Slot (N,) oder None, solange Slot = ID gilt."""
+        if self._ids is None:
+            return None
+        return self._ids[:self.n_particles]
+
+    @property
+    def capacity(self):
+        """Anzahl der Slots, die ohne Umkopieren belegt werden können."""
+        return len(self._positions)
+
+    def _buffers(self):
+        """Alle angelegten Arrays über die volle Kapazität."""
+        buffers = [self._positions, self._velocities, self._types]
+        for array in (self._accelerations, self._ids, self._slots):
+            if array is not None:
+                buffers.append(array)
+        return buffers
+
+    def reserve(self, capacity):
+        """
+        Vergrößert die Kapazität auf mindestens capacity. Danach sind
+        positions & Co. neue Arrays; Referenzen darauf nicht festhalten.
+        """
+        if capacity <= self.capacity:
+            return
+
+        def grow(array, allocate):
+            out = allocate(capacity)
+            out[:self.n_particles] = array[:self.n_particles]
+            return out
+
+        dtype = self._positions.dtype
+        self._positions = grow(self._positions, lambda c: _allocate(c, dtype, self.layout))
+        self._velocities = grow(self._velocities, lambda c: _allocate(c, dtype, self.layout))
+        if self._accelerations is not None:
+            self._accelerations = grow(self._accelerations,
+                                       lambda c: _allocate(c, dtype, self.layout))
+        self._types = grow(self._types, lambda c: np.zeros(c, dtype=self._types.dtype))
+        if self._ids is not None:
+            self._ids = grow(self._ids, lambda c: np.zeros(c, dtype=self._ids.dtype))
+            # _slots ist nach ID indiziert, die IDs sind aber ebenfalls 0..N-1
+            self._slots = grow(self._slots, lambda c: np.zeros(c, dtype=self._slots.dtype))
+
+    def add(self, positions, types, velocities=None):
+        """
+        Hängt k Partikel hinten an (amortisiert O(k)). Sie erhalten die IDs
+        n_particles .. n_particles+k-1 und starten ohne Beschleunigung.
+
+        Returns:
+            np.ndarray: Die IDs der neuen Partikel.
+        """
+        positions = np.asarray(positions)
+        types = np.broadcast_to(np.asarray(types), (len(positions),))
+        if len(types) and (types.min() < 0 or types.max() >= self.n_types):
+            raise ValueError(f"Typen müssen zwischen 0 und {self.n_types - 1} liegen")
+
+        start, stop = self.n_particles, self.n_particles + len(positions)
+        if stop > self.capacity:
+            self.reserve(max(stop, 2 * self.capacity))
+
+        self._positions[start:stop] = positions
+        self._velocities[start:stop] = 0.0 if velocities is None else velocities
+        if self._accelerations is not None:
+            self._accelerations[start:stop] = 0.0
+        self._types[start:stop] = types
+        new_ids = np.arange(start, stop)
+        if self._ids is not None:
+            self._ids[start:stop] = new_ids
+            self._slots[start:stop] = new_ids
+        self.n_particles = stop
+        self._changed_from = min(self._changed_from, start)
+        return new_ids
+
+    def spawn(self, k, particle_type=None, region=(0.0, 0.0, 1.0, 1.0)):
+        """
+        Erzeugt k ruhende Partikel gleichverteilt in einem Rechteck.
+
+        Args:
+            k (int): Anzahl neuer Partikel.
+            particle_type (int, optional): Typ aller neuen Partikel
+                (None = zufällig).
+            region (tuple): (x0, y0, x1, y1) innerhalb von [0, 1)².
+
+        Returns:
+            np.ndarray: Die IDs der neuen Partikel.
+        """
+        x0, y0, x1, y1 = region
+        positions = self.rng.random((k, 2)) * (x1 - x0, y1 - y0) + (x0, y0)
+        if particle_type is None:
+            types = self.rng.integers(0, self.n_types, size=k)
+        else:
+            types = particle_type
+        return self.add(positions, types)
+
+    def remove(self, slots):
+        """
+        Entfernt Partikel per Swap-Remove in O(k): Lücken werden mit den
+        letzten aktiven Partikeln aufgefüllt. Damit die IDs lückenlos
+        0..N-1 bleiben, übernehmen die Partikel mit den höchsten IDs die
+        frei gewordenen IDs (siehe pop_changes()).
+
+        Args:
+            slots: Slot-Indizes (oder boolesche Maske über die aktiven Slots).
+        """
+        slots = np.asarray(slots)
+        if slots.dtype == bool:
+            slots = np.flatnonzero(slots)
+        slots = np.unique(slots)
+        if len(slots) and (slots[0] < 0 or slots[-1] >= self.n_particles):
+            raise IndexError(f"Slots müssen zwischen 0 und {self.n_particles - 1} liegen")
+
+        n_old = self.n_particles
+        n_new = n_old - len(slots)
+
+        # Frei werdende IDs < n_new an die überlebenden IDs >= n_new vergeben
+        removed_ids = slots if self._ids is None else self._ids[slots]
+        id_holes = np.sort(removed_ids[removed_ids < n_new])
+        if self._ids is not None:
+            id_movers = _survivors(removed_ids, n_new, n_old)
+            mover_slots = self._slots[id_movers]
+            self._ids[mover_slots] = id_holes
+
+        # Lücken vorne mit den überlebenden Slots vom Ende füllen
+        holes = slots[slots < n_new]
+        tail = _survivors(slots, n_new, n_old)
+        for array in self._buffers():
+            if array is not self._slots:
+                array[holes] = array[tail]
+        self.n_particles = n_new
+
+        if self._ids is not None:
+            touched = np.union1d(holes, mover_slots[mover_slots < n_new])
+            self._slots[self._ids[touched]] = touched
+        self._changed_ids.update(id_holes.tolist())
+
+    def slot_of(self, ids):
+        """Aktuelle Slots der Partikel mit den IDs ids."""
+        return ids if self._slots is None else self._slots[ids]
+
+    def pop_changes(self):
+        """
+        IDs, deren Typ sich seit dem letzten Aufruf geändert hat: neue
+        Partikel und von remove() neu vergebene IDs. Für inkrementelle
+        Farb-Updates (siehe Visualizer).
+
+        Returns:
+            Tuple (ids, types): sortierte IDs und ihre aktuellen Typen.
+        """
+        changed = [i for i in self._changed_ids if i < self._changed_from]
+        ids = np.concatenate([np.array(changed, dtype=np.int64),
+                              np.arange(self._changed_from, self.n_particles)])
+        ids = np.sort(ids[ids < self.n_particles])
+        self._changed_ids = set()
+        self._changed_from = self.n_particles
+        return ids, self.types[self.slot_of(ids)]
+
+    def permute(self, order):
+        """
+        Ordnet alle Partikel-Arrays in-place um: neuer Slot k = alter Slot
+        order[k]. Die Arrays bleiben dieselben Objekte; ids merkt sich die
+        ursprüngliche Reihenfolge.
+        """
+        if self._ids is None:
+            self._ids = np.arange(self.capacity)
+            self._slots = np.arange(self.capacity)
+        arrays = [self.positions, self.velocities, self.types, self.ids]
+        if self._accelerations is not None:
+            arrays.append(self.accelerations)
+        for array in arrays:
+            array[:] = array[order]
+        self._slots[self.ids] = np.arange(self.n_particles)
+
+    def by_id(self, array, out=None):
+        """
+        Ein Partikel-Array (z.B. positions) in ID-Reihenfolge, also so, als
+        wäre nie umsortiert worden. Ohne Umsortierung ohne Kopie (außer out
+        ist angegeben).
+        """
+        if self._ids is None:
+            if out is None:
+                return array
+            np.copyto(out, array)
+            return out
+        if out is None:
+            out = np.empty_like(array)
+        out[self.ids] = array
+        return out
+
+    @property
+    def x(self):
+        """x-Koordinaten (N,); bei layout="soa" ohne Stride zusammenhängend."""
+        return self.positions[:, 0]
+
+    @property
+    def y(self):
+        """y-Koordinaten (N,); bei layout="soa" ohne Stride zusammenhängend."""
+        return self.positions[:, 1]
+
+    @property
+    def nbytes(self):
+        """Speicherbedarf aller bisher angelegten Arrays (volle Kapazität) in Byte."""
+        return sum(array.nbytes for array in self._buffers())
+
+    def astype(self, dtype=np.float64, types_dtype=np.int64, layout="aos"):
+        """Kopie mit anderem Datentyp und/oder Layout (gleicher Zustand)."""
+        def convert(array):
+            out = _allocate(len(array), dtype, layout)
+            out[:] = array
+            return out
+
+        accelerations = None if self._accelerations is None else convert(self.accelerations)
+        ids = None if self._ids is None else self.ids.copy()
+        system = ParticleSystem.from_arrays(convert(self.positions), convert(self.velocities),
+                                            self.types.astype(types_dtype), accelerations, ids,
+                                            seed=self.seed, n_types=self.n_types)
+        system.layout = layout
+        system.reserve(self.capacity)
+        return system
 
     def get_positions(self):
         """Gibt die rohen Positionsdaten zurück."""
@@ -0,0 +1,217 @@
+"""
+Physik in einem Hintergrund-Thread, entkoppelt von der Render-Schleife.
+
+Die Numba-Kernel sind mit nogil=True kompiliert und geben das GIL frei,
+solange sie rechnen; der GUI-Thread bleibt dadurch reaktionsfähig.
+Zustände werden über einen TripleBuffer veröffentlicht: Der Physik-Thread
+schreibt in den hinteren Puffer, der Renderer liest den vorderen, getauscht
+werden nur Indizes, nie Daten.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class TripleBuffer:
+    """
+    Drei gleich große Arrays: front (Renderer), ready (neuester fertiger
+    Zustand) und back (wird vom Physik-Thread beschrieben).
+
+    Schreiber und Leser blockieren sich nie gegenseitig: publish() tauscht
+    back <-> ready, acquire() tauscht ready <-> front, falls es Neues gibt.
+    Jeder Puffer merkt sich, wie viele Zeilen gültig sind (variable
+    Partikelanzahl bis zur Kapazität).
+    """
+
+    def __init__(self, initial, capacity=None):
+        capacity = len(initial) if capacity is None else capacity
+        self._buffers = []
+        for _ in range(3):
+            buffer = np.zeros((capacity,) + initial.shape[1:], dtype=initial.dtype)
+            buffer[:len(initial)] = initial
+            self._buffers.append(buffer)
+        self._steps = [0, 0, 0]
+        self._counts = [len(initial)] * 3
+        self._front, self._ready, self._back = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.consumed = threading.Event()
+        self.consumed.set()
+
+    @property
+    def back(self):
+        """Puffer, in den der Schreiber den nächsten Zustand schreibt."""
+        return self._buffers[self._back]
+
+    @property
+    def capacity(self):
+        return len(self._buffers[0])
+
+    def publish(self, step=0, count=None):
+        """
+        Macht den hinteren Puffer als neuesten Zustand verfügbar.
+
+        Args:
+            count (int, optional): Gültige Zeilen (Default: alle).
+        """
+        with self._lock:
+            self._steps[self._back] = step
+            self._counts[self._back] = self.capacity if count is None else count
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.consumed.clear()
+
+    def acquire(self):
+        """
+        Liefert den neuesten veröffentlichten Zustand (ohne Kopie).
+
+        Returns:
+            Tuple (array, step, fresh): fresh ist False, wenn seit dem letzten
+            Aufruf nichts Neues veröffentlicht wurde. array enthält nur die
+            gültigen Zeilen.
+        """
+        with self._lock:
+            fresh = self._fresh
+            if fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+                self.consumed.set()
+            buffer, count = self._buffers[self._front], self._counts[self._front]
+            if count < len(buffer):
+                buffer = buffer[:count]
+            return buffer, self._steps[self._front], fresh
+
+
+class PhysicsWorker:
+    """
+    Führt eine Simulation in einem eigenen Thread aus und veröffentlicht
+    nach jeweils steps_per_frame Schritten die Positionen.
+
+    Parameteränderungen (Reibung, Radius, Matrix, ...) werden mit submit()
+    eingereiht und zwischen zwei Schrittblöcken angewendet, nie während
+    ein Kernel läuft. Das gilt auch für spawn()/remove() am Partikelsystem;
+    die dadurch geänderten Typen landen in type_changes, damit der Renderer
+    nur diese Farben neu hochlädt.
+    """
+
+    def __init__(self, simulation, steps_per_frame=1, free_running=False):
+        """
+        Args:
+            simulation (Simulation): Die zu rechnende Simulation.
+            steps_per_frame (int): Physik-Schritte pro veröffentlichtem Frame.
+            free_running (bool): False = erst weiterrechnen, wenn der Renderer
+                den letzten Frame abgeholt hat (genau steps_per_frame Schritte
+                pro angezeigtem Frame); True = so schnell wie möglich.
+        """
+        self.simulation = simulation
+        self.steps_per_frame = steps_per_frame
+        self.free_running = free_running
+        particles = simulation.particles
+        self.buffer = TripleBuffer(particles.by_id(particles.positions),
+                                   capacity=particles.capacity)
+
+        # (step, ids, types) je Änderung, siehe ParticleSystem.pop_changes()
+        self.type_changes = queue.SimpleQueue()
+
+        self.steps_per_second = 0.0
+        self._commands = queue.SimpleQueue()
+        self._running = threading.Event()
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._loop, name="PhysicsWorker", daemon=True)
+
+    def start(self):
+        self._running.set()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Beendet den Thread nach dem aktuellen Schrittblock."""
+        self._stop.set()
+        self._running.set()
+        self.buffer.consumed.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._raise_error()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def submit(self, command):
+        """Reiht command(simulation) ein; ausgeführt zwischen zwei Schrittblöcken."""
+        self._commands.put(command)
+
+    def set_param(self, name, value):
+        """Setzt ein Attribut der Simulation (z.B. "friction") thread-sicher."""
+        self.submit(lambda sim: setattr(sim, name, value))
+
+    def latest_positions(self):
+        """
+        Neueste Positionen für den Renderer, siehe TripleBuffer.acquire().
+
+        Ist der Physik-Thread mit einem Fehler abgebrochen, wird dieser hier
+        (beim nächsten Frame) als RuntimeError weitergereicht.
+        """
+        self._raise_error()
+        return self.buffer.acquire()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Fehler im Physik-Thread") from self._error
+
+    def _apply_commands(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            command(self.simulation)
+
+    def _publish(self):
+        particles = self.simulation.particles
+        n_particles = len(particles.positions)
+        ids, types = particles.pop_changes()
+        if len(ids):
+            self.type_changes.put((self.simulation.step_count, ids, types))
+        if n_particles > self.buffer.capacity:
+            # Der Renderer hält höchstens den alten vorderen Puffer, der gültig bleibt
+            self.buffer = TripleBuffer(particles.positions[:0], capacity=particles.capacity)
+
+        # In ID-Reihenfolge, damit Farben auch nach Umsortieren passen
+        particles.by_id(particles.positions, out=self.buffer.back[:n_particles])
+        self.buffer.publish(self.simulation.step_count, n_particles)
+
+    def _loop(self):
+        sim = self.simulation
+        try:
+            while not self._stop.is_set():
+                self._running.wait()
+                if not self.free_running:
+                    # Warten, bis der Renderer den letzten Frame abgeholt hat
+                    while not self.buffer.consumed.wait(timeout=0.1):
+                        self._apply_commands()
+                        if self._stop.is_set():
+                            return
+                if self._stop.is_set():
+                    return
+
+                self._apply_commands()
+                start_time = time.perf_counter()
+                sim.run(self.steps_per_frame)
+                elapsed = time.perf_counter() - start_time
+                if elapsed > 0:
+                    self.steps_per_second = self.steps_per_frame / elapsed
+
+                with sim.timer.stage("publish"):
+                    self._publish()
+        except BaseException as exc:
+            self._error = exc
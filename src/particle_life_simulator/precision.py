@@ -0,0 +1,132 @@
+"""
+Genauigkeitsbericht für die Präzisionsmodi des ParticleSystem.
+
+Alle Modi starten vom selben Anfangszustand wie die float64-Referenz und
+werden gleich lange simuliert. Verglichen werden in regelmäßigen Abständen
+die Positionen (Abstand auf dem Torus) und die kinetische Energie. Da
+Particle Life chaotisch ist, wächst der Fehler mit der Zeit; der Bericht
+zeigt, wie schnell.
+
+Aufruf:
+    python -m particle_life_simulator.precision -n 2000 --steps 500
+"""
+import argparse
+import contextlib
+import io
+import sys
+
+import numpy as np
+
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+# Name -> (dtype, types_dtype, layout); verglichen mit float64 / int64 / "aos"
+PRECISION_MODES = {
+    "float64-soa": (np.float64, np.int64, "soa"),
+    "float32": (np.float32, np.uint8, "aos"),
+    "float32-soa": (np.float32, np.uint8, "soa"),
+}
+
+
+def position_error(positions, reference):
+    """Abstand jedes Partikels zur Referenz auf dem Torus (N,)."""
+    delta = np.asarray(positions, dtype=np.float64) - reference
+    delta -= np.round(delta)
+    return np.sqrt(np.sum(delta * delta, axis=1))
+
+
+def kinetic_energy(velocities):
+    velocities = np.asarray(velocities, dtype=np.float64)
+    return 0.5 * float(np.sum(velocities * velocities))
+
+
+def drift_report(n_particles=1000, n_types=4, n_steps=500, sample_every=50, seed=0,
+                 modes=None, dt=0.001, max_r=0.15, friction=0.1, neighbor_mode="auto"):
+    """
+    Simuliert Referenz und alle Modi parallel und misst die Abweichung.
+
+    Args:
+        modes (dict, optional): Name -> (dtype, types_dtype, layout).
+            Default: PRECISION_MODES.
+
+    Returns:
+        dict: {"steps": [...], "modes": {Name: {"mean_error", "max_error",
+        "energy_rel_error" (je Liste pro Messpunkt), "nbytes"}}, "reference_nbytes"}
+    """
+    modes = modes or PRECISION_MODES
+    np.random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reference = ParticleSystem(n_particles, n_types)
+        interactions = Interaction(n_types)
+    interactions.matrix = np.random.uniform(-1.0, 1.0, (n_types, n_types))
+
+    def make_simulation(particles):
+        return Simulation(dt, max_r, friction, 0.0, particles,
+                          Interaction.from_matrix(interactions.matrix.copy()),
+                          neighbor_mode=neighbor_mode)
+
+    simulations = {name: make_simulation(reference.astype(*spec)) for name, spec in modes.items()}
+    reference_sim = make_simulation(reference)
+
+    report = {"steps": [],
+              "modes": {name: {"mean_error": [], "max_error": [], "energy_rel_error": []}
+                        for name in modes}}
+
+    done = 0
+    while done < n_steps:
+        chunk = min(sample_every, n_steps - done)
+        reference_sim.run(chunk)
+        for sim in simulations.values():
+            sim.run(chunk)
+        done += chunk
+
+        report["steps"].append(done)
+        reference_energy = kinetic_energy(reference.velocities)
+        for name, sim in simulations.items():
+            error = position_error(sim.particles.positions, reference.positions)
+            energy = kinetic_energy(sim.particles.velocities)
+            entry = report["modes"][name]
+            entry["mean_error"].append(float(error.mean()))
+            entry["max_error"].append(float(error.max()))
+            entry["energy_rel_error"].append(
+                abs(energy - reference_energy) / reference_energy if reference_energy > 0 else 0.0)
+
+    report["reference_nbytes"] = reference.nbytes
+    for name, sim in simulations.items():
+        report["modes"][name]["nbytes"] = sim.particles.nbytes
+    return report
+
+
+def format_report(report):
+    """Tabellarische Textausgabe eines drift_report()."""
+    lines = [f"Referenz float64/aos: {report['reference_nbytes']} Byte"]
+    for name, entry in report["modes"].items():
+        lines.append(f"\n{name}: {entry['nbytes']} Byte "
+                     f"({entry['nbytes'] / report['reference_nbytes']:.0%} der Referenz)")
+        lines.append(f"{'Schritt':>8} | {'mittl. Fehler':>13} | {'max. Fehler':>11} | "
+                     f"{'rel. Fehler E_kin':>17}")
+        for i, step in enumerate(report["steps"]):
+            lines.append(f"{step:>8} | {entry['mean_error'][i]:>13.3e} | "
+                         f"{entry['max_error'][i]:>11.3e} | {entry['energy_rel_error'][i]:>17.3e}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m particle_life_simulator.precision",
+        description="Trajektorien-Drift der Präzisionsmodi gegenüber float64.")
+    parser.add_argument("-n", "--particles", type=int, default=1000)
+    parser.add_argument("--types", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--every", type=int, default=50, help="Messabstand in Schritten")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = drift_report(args.particles, args.types, args.steps, args.every, args.seed)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
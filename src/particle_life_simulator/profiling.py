@@ -4,13 +4,19 @@ Profiling-Skript für den Particle Life Simulator.
 Dieses Skript dient zur Messung und Analyse der Performance der physikalischen
 Simulation (insbesondere der durch Numba optimierten Funktionen). Er gibt
 detaillierte Statistiken zu den Laufzeiten und Bottlenecks auf der Konsole aus.
+
+Für reproduzierbare Messreihen und Regressionsvergleiche siehe benchmark.py
+(`particle-life-bench`); dieses Skript dient der Detailanalyse einzelner Fälle.
 """
 import cProfile
 import pstats
 import time
-from particles import ParticleSystem
-from interaction import Interaction
-from simulation import Simulation
+
+import numba
+import numpy as np
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.simulation import Simulation
 
   
 def profile_simulation():
@@ -18,9 +24,9 @@ def profile_simulation():
     Führt das Performance-Profiling der Simulation durch.
     
     Initialisiert ein Partikelsystem mit hoher Last und simuliert eine
-    festgelegte Anzahl an Zeitschritten. Ein JIT-Warmup wird vorab ausgeführt, 
-    damit die initiale Kompilierungszeit von Numba die Leistungsmessung 
-    nicht verfälscht.
+    festgelegte Anzahl an Zeitschritten. Die Kernel werden vorab mit
+    Simulation.warmup() kompiliert (bzw. aus dem Cache geladen), damit die
+    Kompilierungszeit von Numba die Leistungsmessung nicht verfälscht.
     """
     print("=== Performance Profiling (Milestone 4) ===")
 
@@ -39,9 +45,10 @@ def profile_simulation():
     sim = Simulation(0.02, 0.15, 0.1, 0.0, particles, interactions)
 
     # 2. Warmup (Wichtig bei JIT!)
-    # Numba braucht einen Durchlauf zum Kompilieren. Den wollen wir NICHT messen.
+    # Alle Kernel von step() kompilieren, ohne den Zustand zu verändern.
+    # Das wollen wir NICHT messen.
     print("-> JIT-Warmup...")
-    sim.step()
+    print(f"   {sim.warmup():.2f} s")
 
     # 3. Der Profiler-Start
     print("-> Starte Profiling...")
@@ -52,7 +59,7 @@ def profile_simulation():
 
     # Hot Path Loop
     for _ in range(STEPS):
-        sim.step()  # Wir nutzen jetzt direkt .step(), da die Wrapper leer sind
+        sim.step()  # Kraftphase + Integration über den eingestellten Integrator
 
     end_time = time.time()
 
@@ -76,5 +83,261 @@ def profile_simulation():
     stats.sort_stats('tottime').print_stats(10)
 
 
+def profile_thread_scaling(thread_counts=(1, 2, 4, 8)):
+    """
+    Misst die Skalierung des parallelen Kraft-Kernels über die Thread-Anzahl.
+
+    Alle Läufe starten vom selben Anfangszustand. Thread-Anzahlen über
+    NUMBA_NUM_THREADS werden übersprungen.
+    """
+    print("\n=== Thread-Skalierung (paralleler Kraft-Kernel) ===")
+
+    N_PARTICLES = 20000
+    N_TYPES = 4
+    STEPS = 20
+
+    particles = ParticleSystem(N_PARTICLES, N_TYPES)
+    interactions = Interaction(N_TYPES)
+    start_positions = particles.positions.copy()
+
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    baseline = None
+
+    print(f"{'Threads':>8} | {'ms/Schritt':>10} | {'Speedup':>8} | {'Effizienz':>9}")
+    for n_threads in thread_counts:
+        if n_threads > max_threads:
+            print(f"{n_threads:>8} | übersprungen (NUMBA_NUM_THREADS={max_threads})")
+            continue
+
+        particles.positions[:] = start_positions
+        particles.velocities[:] = 0.0
+        sim = Simulation(0.02, 0.15, 0.1, 0.0, particles, interactions, n_threads=n_threads)
+        sim.warmup()
+
+        start_time = time.perf_counter()
+        for _ in range(STEPS):
+            sim.step()
+        ms_per_step = (time.perf_counter() - start_time) / STEPS * 1000
+
+        if baseline is None:
+            baseline = ms_per_step
+        speedup = baseline / ms_per_step
+        print(f"{n_threads:>8} | {ms_per_step:>10.2f} | {speedup:>7.2f}x | "
+              f"{speedup / n_threads:>8.0%}")
+
+
+def profile_fused_run(particle_counts=(50, 200, 1000, 5000), callback_every=100):
+    """
+    Vergleicht Schritte pro Sekunde: step() in einer Python-Schleife gegen
+    Simulation.run() mit fusioniertem Mehrschritt-Kernel.
+    """
+    print("\n=== Fusionierter Kernel: step()-Schleife vs. run() ===")
+
+    N_TYPES = 4
+    STEPS = 500
+
+    print(f"{'Partikel':>8} | {'step() [Schritte/s]':>20} | {'run() [Schritte/s]':>19} | "
+          f"{'Speedup':>8}")
+    for n_particles in particle_counts:
+        interactions = Interaction(N_TYPES)
+        particles = ParticleSystem(n_particles, N_TYPES)
+        start_positions = particles.positions.copy()
+        sim = Simulation(0.02, 0.15, 0.1, 0.0, particles, interactions)
+
+        sim.warmup()  # Kernel für step() und run()
+
+        steps = max(20, STEPS * 1000 // n_particles)
+        particles.positions[:] = start_positions
+        particles.velocities[:] = 0.0
+        start_time = time.perf_counter()
+        for _ in range(steps):
+            sim.step()
+        loop_rate = steps / (time.perf_counter() - start_time)
+
+        particles.positions[:] = start_positions
+        particles.velocities[:] = 0.0
+        start_time = time.perf_counter()
+        sim.run(steps, callback_every=callback_every)
+        run_rate = steps / (time.perf_counter() - start_time)
+
+        print(f"{n_particles:>8} | {loop_rate:>20.1f} | {run_rate:>19.1f} | "
+              f"{run_rate / loop_rate:>7.2f}x")
+
+
+def profile_render_upload(particle_counts=(10_000, 100_000, 1_000_000), frames=20):
+    """
+    Vergleicht den Aufwand pro Frame für das Hochladen der Partikel:
+    Markers.set_data (alles neu) gegen ParticleVisual.set_positions (nur
+    float32-Positionen in einen bestehenden Buffer). Gemessen wird die
+    CPU-Seite (Aufbereitung + GLIR-Befehl), dazu die Bytes pro Frame.
+    """
+    # Vispy nur hier importieren, die übrigen Messungen laufen auch ohne
+    from vispy import scene
+    from particle_life_simulator.particle_visual import ParticleVisual
+
+    print("\n=== GPU-Upload pro Frame: Markers.set_data vs. ParticleVisual ===")
+    print(f"{'Partikel':>9} | {'set_data [ms]':>13} | {'Bytes':>10} | "
+          f"{'set_positions [ms]':>18} | {'Bytes':>10} | {'Speedup':>8}")
+    for n_particles in particle_counts:
+        positions = np.random.rand(n_particles, 2)
+        colors = np.random.rand(n_particles, 4)
+
+        markers = scene.visuals.Markers()
+        start_time = time.perf_counter()
+        for _ in range(frames):
+            markers.set_data(pos=positions, edge_width=0, face_color=colors, size=8)
+        markers_ms = (time.perf_counter() - start_time) / frames * 1000
+        markers_bytes = markers._data.nbytes
+
+        visual = ParticleVisual(colors)
+        start_time = time.perf_counter()
+        for _ in range(frames):
+            visual.set_positions(positions)
+        visual_ms = (time.perf_counter() - start_time) / frames * 1000
+        visual_bytes = visual.n_particles * 2 * 4
+
+        print(f"{n_particles:>9} | {markers_ms:>13.2f} | {markers_bytes:>10} | "
+              f"{visual_ms:>18.2f} | {visual_bytes:>10} | {markers_ms / visual_ms:>7.1f}x")
+
+
+def profile_ensemble(n_worlds=128, n_particles=300, steps=200):
+    """
+    Vergleicht den Durchsatz (Welt-Schritte pro Sekunde) von B einzelnen
+    Simulationen (step()-Schleife bzw. run()) mit einer EnsembleSimulation,
+    die alle Welten in einem Kernel-Aufruf rechnet.
+    """
+    from particle_life_simulator.ensemble import EnsembleSimulation
+
+    print(f"\n=== Ensemble: {n_worlds} Welten x {n_particles} Partikel, {steps} Schritte ===")
+    ensemble = EnsembleSimulation.create(n_worlds, n_particles, 4, seed=0)
+    simulations = [ensemble.world(b) for b in range(n_worlds)]
+    for sim in simulations:
+        sim.warmup()
+    ensemble.run(1)
+
+    start_time = time.perf_counter()
+    for sim in simulations:
+        for _ in range(steps):
+            sim.step()
+    step_rate = n_worlds * steps / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for sim in simulations:
+        sim.run(steps)
+    run_rate = n_worlds * steps / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    ensemble.run(steps)
+    ensemble_rate = n_worlds * steps / (time.perf_counter() - start_time)
+
+    print(f"{'Variante':<22} | {'Welt-Schritte/s':>15} | {'Speedup':>8}")
+    for name, rate in (("Simulation.step()", step_rate), ("Simulation.run()", run_rate),
+                       (f"Ensemble ({ensemble.n_threads} Threads)", ensemble_rate)):
+        print(f"{name:<22} | {rate:>15.0f} | {rate / step_rate:>7.2f}x")
+
+
+def profile_neighbor_lists(n_particles=20_000, max_r=0.05, steps=100, skin=0.1,
+                           settings=((0.5, 0.0), (0.1, 0.0), (0.1, 0.5), (0.02, 1.0))):
+    """
+    Vergleicht die Zellliste pro Schritt mit der Verlet-Liste für
+    verschiedene Reibungs- und Noise-Stärken (langsame vs. schnelle
+    Bewegung) und gibt Schrittzeit, Aufbaurate und Listenspeicher aus.
+    """
+    import contextlib
+    import io
+
+    print(f"\n=== Nachbarlisten: {n_particles} Partikel, max_r = {max_r}, "
+          f"skin = {skin} * max_r, {steps} Schritte ===")
+    print(f"{'friction':>8} | {'noise':>5} | {'cells ms':>8} | {'verlet ms':>9} | "
+          f"{'Speedup':>7} | {'Aufbau/Schritt':>14} | {'Liste MB':>8}")
+    for friction, noise_strength in settings:
+        np.random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            particles = ParticleSystem(n_particles, 4)
+            interactions = Interaction(4, seed=0)
+        state = (particles.positions.copy(), particles.velocities.copy(), particles.types.copy())
+
+        times = {}
+        for neighbor_mode in ("cells", "verlet"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                particles = ParticleSystem.from_arrays(*(array.copy() for array in state))
+            sim = Simulation(0.001, max_r, friction, noise_strength, particles, interactions,
+                             neighbor_mode=neighbor_mode, seed=0, neighbor_skin=skin)
+            sim.warmup()
+            sim.run(20)  # Einschwingen, erster Listenaufbau
+            if sim.neighbor_list is not None:
+                sim.neighbor_list.reset_stats()
+            start_time = time.perf_counter()
+            sim.run(steps)
+            times[neighbor_mode] = (time.perf_counter() - start_time) / steps * 1000
+
+        neighbor_list = sim.neighbor_list
+        print(f"{friction:>8} | {noise_strength:>5} | {times['cells']:>8.2f} | "
+              f"{times['verlet']:>9.2f} | {times['cells'] / times['verlet']:>6.2f}x | "
+              f"{neighbor_list.rebuild_rate:>14.2f} | {neighbor_list.nbytes / 1e6:>8.1f}")
+
+
+def profile_domain_decomposition(worker_counts=(1, 2, 4, 8), n_particles=200_000,
+                                 particles_per_worker=50_000, max_r=0.02, steps=20):
+    """
+    Starke und schwache Skalierung der Gebietszerlegung (distributed.py):
+    stark = feste Partikelanzahl auf W Workern, schwach = feste Anzahl pro
+    Worker. Referenz ist eine serielle Simulation (ein Prozess, ein Thread).
+    """
+    import contextlib
+    import io
+    import os
+
+    from particle_life_simulator.distributed import DistributedSimulation
+
+    def make_simulation(n):
+        np.random.seed(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            particles = ParticleSystem(n, 4)
+            interactions = Interaction(4, seed=0)
+        return Simulation(0.001, max_r, 0.1, 0.0, particles, interactions, n_threads=1, seed=0)
+
+    def steps_per_second(n, n_workers):
+        sim = make_simulation(n)
+        with DistributedSimulation(sim, n_workers=n_workers) as distributed:
+            distributed.run(2)  # JIT bzw. Cache laden
+            start_time = time.perf_counter()
+            distributed.run(steps)
+            return steps / (time.perf_counter() - start_time)
+
+    worker_counts = [w for w in worker_counts if w * max_r <= 1.0]
+    print(f"\n=== Gebietszerlegung: max_r = {max_r}, {steps} Schritte, "
+          f"{os.cpu_count()} Kerne ===")
+
+    sim = make_simulation(n_particles)
+    sim.warmup()
+    start_time = time.perf_counter()
+    sim.run(steps)
+    baseline = steps / (time.perf_counter() - start_time)
+    print(f"Referenz (1 Prozess, seriell): {baseline:.2f} Schritte/s")
+
+    print(f"\nStark ({n_particles} Partikel)")
+    print(f"{'Worker':>6} | {'Schritte/s':>10} | {'Speedup':>7} | {'Effizienz':>9}")
+    for n_workers in worker_counts:
+        rate = steps_per_second(n_particles, n_workers)
+        print(f"{n_workers:>6} | {rate:>10.2f} | {rate / baseline:>6.2f}x | "
+              f"{rate / baseline / n_workers:>9.0%}")
+
+    print(f"\nSchwach ({particles_per_worker} Partikel pro Worker)")
+    print(f"{'Worker':>6} | {'Partikel':>9} | {'Schritte/s':>10} | {'Effizienz':>9}")
+    single = None
+    for n_workers in worker_counts:
+        rate = steps_per_second(particles_per_worker * n_workers, n_workers)
+        single = single or rate
+        print(f"{n_workers:>6} | {particles_per_worker * n_workers:>9} | {rate:>10.2f} | "
+              f"{rate / single:>9.0%}")
+
+
 if __name__ == "__main__":
     profile_simulation()
+    profile_thread_scaling()
+    profile_fused_run()
+    profile_render_upload()
+    profile_ensemble()
+    profile_neighbor_lists()
+    profile_domain_decomposition()
@@ -0,0 +1,136 @@
+"""
+Räumliche Umsortierung der Partikel für bessere Cache-Lokalität.
+
+Ohne Umsortierung liegen räumlich benachbarte Partikel verstreut im
+Speicher; die Kraft-Kernel springen dann für jeden Nachbarn an eine
+zufällige Adresse. Der SpatialReorderer sortiert die Partikel-Arrays
+regelmäßig nach Gitterzelle (dieselbe Reihenfolge wie die Zellliste) oder
+entlang einer Morton-Kurve (Z-Order).
+
+Die Slots der Partikel ändern sich dabei, ihre IDs nicht: particles.ids[k]
+ist die ursprüngliche ID des Partikels in Slot k, particles.by_id() liefert
+Arrays in ID-Reihenfolge (für Farben, Recorder, Visualizer).
+"""
+import numpy as np
+from numba import jit
+
+from particle_life_simulator.forces import cell_index
+
+ORDERS = ("cells", "morton")
+
+# Bits pro Achse für die Morton-Schlüssel (2^16 x 2^16 Raster)
+MORTON_BITS = 16
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _spread_bits(v):
+    """Verteilt die unteren 16 Bit von v auf die geraden Bitpositionen."""
+    v &= 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def morton_keys(positions):
+    """Z-Order-Schlüssel (N,) der Positionen im Einheitsquadrat."""
+    scale = 1 << MORTON_BITS
+    keys = np.empty(len(positions), dtype=np.int64)
+    for i in range(len(positions)):
+        qx = min(int(positions[i, 0] * scale), scale - 1)
+        qy = min(int(positions[i, 1] * scale), scale - 1)
+        keys[i] = (_spread_bits(qx) << 1) | _spread_bits(qy)
+    return keys
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def cell_keys(positions, n_cells):
+    """Zellindex (N,) in der Reihenfolge von forces.build_cell_list."""
+    keys = np.empty(len(positions), dtype=np.int64)
+    for i in range(len(positions)):
+        cx, cy = cell_index(positions[i, 0], positions[i, 1], n_cells)
+        keys[i] = cx * n_cells + cy
+    return keys
+
+
+def spatial_order(positions, order="cells", n_cells=16):
+    """
+    Permutation, die die Partikel räumlich sortiert (stabil).
+
+    Returns:
+        np.ndarray: order, sodass positions[order] sortiert ist.
+    """
+    if order == "cells":
+        keys = cell_keys(positions, n_cells)
+    elif order == "morton":
+        keys = morton_keys(positions)
+    else:
+        raise ValueError(f"Unbekannte Sortierung: {order!r} (verfügbar: {', '.join(ORDERS)})")
+    return np.argsort(keys, kind="stable")
+
+
+class SpatialReorderer:
+    """
+    Beobachter, der die Partikel einer Simulation regelmäßig umsortiert.
+
+    Das Intervall passt sich der Bewegung an: Alle check_every Schritte wird
+    aus der mittleren Geschwindigkeit abgeschätzt, wie weit sich die
+    Partikel seit der letzten Sortierung bewegt haben. Umsortiert wird, wenn
+    das mehr als max_travel Zellbreiten sind. Schnelle Partikel werden also
+    häufig, fast ruhende kaum umsortiert.
+
+    Verwendung:
+        reorderer = SpatialReorderer()
+        reorderer.attach(sim)        # bzw. sim.enable_reordering()
+    """
+
+    def __init__(self, order="cells", check_every=10, max_travel=0.5):
+        """
+        Args:
+            order (str): "cells" (Zellreihenfolge) oder "morton" (Z-Order).
+            check_every (int): Schritte zwischen zwei Prüfungen.
+            max_travel (float): Mittlere Strecke seit der letzten Sortierung
+                in Zellbreiten, ab der neu sortiert wird.
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unbekannte Sortierung: {order!r} (verfügbar: {', '.join(ORDERS)})")
+        self.order = order
+        self.check_every = check_every
+        self.max_travel = max_travel
+
+        self.n_reorders = 0
+        self.last_reorder_step = None
+        self.intervals = []  # Schritte zwischen zwei Sortierungen
+        self._travel = 0.0
+
+    def attach(self, simulation):
+        """Registriert den Reorderer als Beobachter und sortiert sofort."""
+        self.reorder(simulation)
+        simulation.add_observer(self, self.check_every)
+        return self
+
+    def _n_cells(self, simulation):
+        return max(simulation.cells_per_axis(), 1)
+
+    def reorder(self, simulation):
+        """Sortiert alle Partikel-Arrays der Simulation jetzt um."""
+        particles = simulation.particles
+        order = spatial_order(particles.positions, self.order, self._n_cells(simulation))
+        particles.permute(order)
+
+        if self.last_reorder_step is not None:
+            self.intervals.append(simulation.step_count - self.last_reorder_step)
+        self.last_reorder_step = simulation.step_count
+        self.n_reorders += 1
+        self._travel = 0.0
+
+    def __call__(self, simulation):
+        velocities = simulation.particles.velocities
+        mean_speed = float(np.mean(np.sqrt(np.sum(velocities * velocities, axis=1))))
+        cell_width = 1.0 / self._n_cells(simulation)
+        self._travel += mean_speed * simulation.dt * self.check_every / cell_width
+
+        if self._travel > self.max_travel:
+            self.reorder(simulation)
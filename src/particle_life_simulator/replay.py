@@ -0,0 +1,247 @@
+"""
+Wiedergabe vorberechneter Frames, entkoppelt von der Physik.
+
+Quellen sind alles, was len() und [i] -> Frame unterstützt und ein
+types-Array besitzt: ein TrajectoryReader (aufgezeichnete Läufe) oder ein
+FrameRingBuffer (die letzten Frames einer laufenden Simulation).
+
+Der ReplayPlayer lädt die als Nächstes benötigten Frames in einem
+Hintergrund-Thread vor. next_frame() greift nur auf den Cache zu und
+blockiert daher nie auf I/O; ist ein Frame noch nicht da, wird der zuletzt
+gezeigte erneut geliefert. Quellen im Speicher (in_memory = True) werden
+direkt gelesen und im Live-Betrieb am jeweils neuesten Frame verfolgt.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from particle_life_simulator.trajectory import Frame
+
+
+class FrameRingBuffer:
+    """
+    Ringpuffer der letzten `capacity` Frames einer laufenden Simulation.
+
+    Index 0 ist der älteste noch gespeicherte Frame. Als Beobachter
+    registrierbar: sim.add_observer(buffer.record, every=k).
+    """
+
+    in_memory = True
+
+    def __init__(self, capacity, types, dtype=np.float32):
+        self.capacity = capacity
+        self.types = np.array(types)
+        n_particles = len(types)
+        self._positions = np.empty((capacity, n_particles, 2), dtype=dtype)
+        self._velocities = np.empty((capacity, n_particles, 2), dtype=dtype)
+        self._steps = np.empty(capacity, dtype=np.int64)
+        self._count = 0  # insgesamt geschriebene Frames
+        self._lock = threading.Lock()
+
+    def append(self, positions, velocities, step=-1):
+        with self._lock:
+            slot = self._count % self.capacity
+            self._positions[slot] = positions
+            self._velocities[slot] = velocities
+            self._steps[slot] = step
+            self._count += 1
+
+    def record(self, simulation):
+        """Callback für Simulation.add_observer / Simulation.run (in ID-Reihenfolge)."""
+        particles = simulation.particles
+        self.append(particles.by_id(particles.positions), particles.by_id(particles.velocities),
+                    simulation.step_count)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def __getitem__(self, index):
+        with self._lock:
+            n_frames = min(self._count, self.capacity)
+            if index < 0:
+                index += n_frames
+            if not 0 <= index < n_frames:
+                raise IndexError(f"Frame {index} außerhalb von 0..{n_frames - 1}")
+            slot = (self._count - n_frames + index) % self.capacity
+            return Frame(int(self._steps[slot]), self._positions[slot].copy(),
+                         self._velocities[slot].copy())
+
+
+class ReplayPlayer:
+    """
+    Wiedergabezustand (Position, Geschwindigkeit, Pause) plus Prefetching.
+
+    speed ist die Anzahl Frames pro Aufruf von next_frame(): 1 = normal,
+    > 1 = Vorspulen mit Frame-Skipping, 0 < speed < 1 = Zeitlupe,
+    negativ = rückwärts.
+    """
+
+    def __init__(self, source, prefetch=16, loop=True):
+        """
+        Args:
+            source: TrajectoryReader, FrameRingBuffer o.ä.
+            prefetch (int): Anzahl vorausgeladener Frames.
+            loop (bool): Am Ende wieder von vorne beginnen (sonst anhalten).
+        """
+        self.source = source
+        self.types = source.types
+        self.prefetch = prefetch
+        self.loop = loop
+        self.speed = 1.0
+        self.paused = False
+        self._position = 0.0
+        self._last_frame = None
+
+        # Speicherquellen brauchen keinen Prefetch; live dem neuesten Frame folgen
+        self.in_memory = getattr(source, "in_memory", False)
+        self.follow_live = self.in_memory
+
+        self._cache = OrderedDict()
+        self._cond = threading.Condition()
+        self._running = not self.in_memory
+        self._thread = None
+        if self._running:
+            self._thread = threading.Thread(target=self._prefetch_loop, name="ReplayPrefetch",
+                                            daemon=True)
+            self._thread.start()
+
+    @property
+    def index(self):
+        """Index des aktuell gezeigten Frames."""
+        return int(self._position)
+
+    def __len__(self):
+        return len(self.source)
+
+    def seek(self, index):
+        """Springt zu Frame `index` (negativ = vom Ende, -1 = live folgen)."""
+        n_frames = len(self.source)
+        if n_frames == 0:
+            return
+        self.follow_live = self.in_memory and index == -1
+        if index < 0:
+            index += n_frames
+        with self._cond:
+            self._position = float(min(max(index, 0), n_frames - 1))
+            self._cond.notify()
+
+    def scrub(self, delta):
+        """Verschiebt die Position um delta Frames."""
+        self.seek(self.index + delta)
+
+    def set_speed(self, speed):
+        with self._cond:
+            self.speed = float(speed)
+            self._cond.notify()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def next_frame(self):
+        """
+        Liefert den Frame an der aktuellen Position (aus dem Cache) und
+        rückt um speed Frames vor. Blockiert nie.
+
+        Returns:
+            Frame oder None, solange noch kein Frame geladen wurde.
+        """
+        if self.in_memory:
+            return self._next_frame_in_memory()
+
+        with self._cond:
+            frame = self._cache.get(self.index)
+            if frame is None:
+                # Noch nicht geladen: Prefetcher wecken, alten Frame halten
+                self._cond.notify()
+                return self._last_frame
+
+            self._last_frame = frame
+            if not self.paused:
+                self._advance()
+            return frame
+
+    def close(self):
+        """Beendet den Prefetch-Thread."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _next_frame_in_memory(self):
+        with self._cond:
+            n_frames = len(self.source)
+            if n_frames == 0:
+                return self._last_frame
+            if self.follow_live:
+                self._position = float(n_frames - 1)
+
+            frame = self.source[min(self.index, n_frames - 1)]
+            self._last_frame = frame
+            if not self.paused and not self.follow_live:
+                self._advance()
+            return frame
+
+    def _advance(self):
+        n_frames = len(self.source)
+        position = self._position + self.speed
+        if self.loop:
+            position %= n_frames
+        else:
+            position = min(max(position, 0.0), n_frames - 1)
+        self._position = position
+        self._cond.notify()
+
+    def _wanted(self):
+        """Indizes, die als Nächstes gebraucht werden (inkl. des aktuellen)."""
+        n_frames = len(self.source)
+        if n_frames == 0:
+            return []
+        step = self.speed if self.speed != 0 else 1.0
+        wanted = []
+        for k in range(self.prefetch):
+            position = self._position + k * step
+            if self.loop:
+                position %= n_frames
+            elif not 0 <= position < n_frames:
+                break
+            index = int(position)
+            if index not in wanted:
+                wanted.append(index)
+        return wanted
+
+    def _load(self, index):
+        """
+        Liest Frame index vollständig in den Speicher. Unkomprimierte Chunks
+        liefert der TrajectoryReader als Memory-Map; ohne Kopie würde erst
+        der Renderer beim Hochladen von der Platte lesen.
+        """
+        frame = self.source[index]
+        velocities = None if frame.velocities is None else np.array(frame.velocities)
+        return Frame(frame.step, np.array(frame.positions), velocities)
+
+    def _prefetch_loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    wanted = self._wanted()
+                    missing = [i for i in wanted if i not in self._cache]
+                    if missing:
+                        break
+                    self._cond.wait(timeout=0.1)
+                if not self._running:
+                    return
+
+            # I/O außerhalb des Locks, damit next_frame() nie wartet
+            loaded = [(index, self._load(index)) for index in missing[:4]]
+
+            with self._cond:
+                for index, frame in loaded:
+                    self._cache[index] = frame
+                keep = set(self._wanted())
+                while len(self._cache) > 2 * self.prefetch:
+                    stale = next((i for i in self._cache if i not in keep), None)
+                    if stale is None:
+                        break
+                    del self._cache[stale]
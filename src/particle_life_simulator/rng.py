@@ -0,0 +1,69 @@
+"""
+Reproduzierbare Zufallszahlen.
+
+Der Noise-Term verwendet keinen Generator mit internem Zustand, sondern
+einen zählerbasierten: Jede Zufallszahl ist ein Hash aus (seed, step,
+Partikel-ID, Komponente). Das Ergebnis hängt damit weder von der Anzahl
+der Threads noch von der Aufteilung in run()-Blöcke oder der Reihenfolge
+der Partikel im Speicher ab, und ein Checkpoint muss nur den Seed sichern.
+
+Gerechnet wird mit 32-Bit-Werten in 64-Bit-Ganzzahlen, jedes Produkt wird
+sofort maskiert. So liefern kompilierte Kernel (Überlauf wird abgeschnitten)
+und reines Python (beliebig große int) bitgleiche Ergebnisse.
+"""
+import numpy as np
+from numba import jit
+
+MASK32 = 0xFFFFFFFF
+
+# Startwert der Hash-Kette (hash32(0) == 0 wäre sonst ein Fixpunkt)
+HASH_OFFSET = 0x9E3779B9
+
+# Größter Seed, der aus dem globalen NumPy-Generator gezogen wird
+MAX_SEED = 2**63 - 1
+
+
+def resolve_seed(seed=None):
+    """
+    seed unverändert; ohne Seed wird einer aus np.random gezogen, damit
+    np.random.seed() weiterhin ganze Läufe reproduzierbar macht.
+    """
+    if seed is None:
+        return int(np.random.randint(0, MAX_SEED, dtype=np.int64))
+    return int(seed)
+
+
+def derive_seeds(seed, n):
+    """n unabhängige Seeds aus einem (z.B. für Partikel, Regeln, Noise)."""
+    if seed is None:
+        return [None] * n
+    return [int(s) for s in np.random.SeedSequence(seed).generate_state(n, dtype=np.uint64)
+            >> np.uint64(1)]
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def hash32(x):
+    """32-Bit-Integer-Hash (lowbias32) für 0 <= x < 2^32."""
+    x ^= x >> 16
+    x = (x * 0x7FEB352D) & MASK32
+    x ^= x >> 15
+    x = (x * 0x846CA68B) & MASK32
+    x ^= x >> 16
+    return x
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def counter_uniform(seed, step, particle, component):
+    """
+    Gleichverteilte Zahl in [0, 1), eindeutig bestimmt durch
+    (seed, step, particle, component). Alle Argumente >= 0.
+    """
+    # int(): ohne JIT aus NumPy-Skalaren Python-int machen (kein Überlauf)
+    seed, step, particle = int(seed), int(step), int(particle)
+    h = hash32((seed & MASK32) ^ HASH_OFFSET)
+    h = hash32(h ^ ((seed >> 32) & MASK32))
+    h = hash32(h ^ (step & MASK32))
+    h = hash32(h ^ ((step >> 32) & MASK32))
+    h = hash32(h ^ ((2 * particle + component) & MASK32))
+    h = hash32(h ^ (((2 * particle + component) >> 32) & MASK32))
+    return h * (1.0 / 4294967296.0)
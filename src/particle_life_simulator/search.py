@@ -0,0 +1,342 @@
+"""
+Evolutionäre Suche nach Interaktionsmatrizen (headless).
+
+Eine Population von Kandidaten-Matrizen wird über Generationen mit
+Mutation und Crossover weiterentwickelt. Bewertet wird jeder Kandidat
+nach einem kurzen Lauf anhand der entstehenden Struktur (siehe
+analytics.MetricsRecorder und FITNESS_FUNCTIONS).
+
+Die Kandidaten einer Generation laufen als Welten einer EnsembleSimulation
+(parallel über die Threads) und mit demselben Startzustand, damit sie nur
+die Matrix unterscheidet. Hoffnungslose Kandidaten werden per Successive
+Halving früh aussortiert: nach jeder Stufe rechnet nur das beste
+1 / eta weiter, bis zur vollen Schrittzahl. Ergebnisse werden unter einem
+Hash von Matrix und Bewertungs-Konfiguration zwischengespeichert (optional
+als JSON Lines auf der Platte), doppelte Kandidaten werden nie erneut
+simuliert.
+
+Aufruf:
+    particle-life-search --generations 20 --population 32 -o best.json
+    particle-life --matrix best.json
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from particle_life_simulator.analytics import MetricsRecorder
+from particle_life_simulator.ensemble import EnsembleSimulation
+from particle_life_simulator.rng import resolve_seed
+
+
+def fitness_clusters(metrics):
+    """Viele Partikel in Clustern, aber nicht alle in einem einzigen."""
+    return metrics["clustered_fraction"] * (1.0 - metrics["largest_cluster"]
+                                            / metrics["n_particles"])
+
+
+def fitness_segregation(metrics):
+    """Typen getrennt statt durchmischt (1 - Durchmischungsindex)."""
+    return 1.0 - metrics["mixing_index"]
+
+
+def fitness_activity(metrics):
+    """Mittlere kinetische Energie (bewegte statt erstarrte Strukturen)."""
+    return metrics["kinetic_energy"]
+
+
+# Name -> Funktion(Kennzahlen aus MetricsRecorder.measure) -> float, größer = besser
+FITNESS_FUNCTIONS = {
+    "clusters": fitness_clusters,
+    "segregation": fitness_segregation,
+    "activity": fitness_activity,
+}
+
+
+def matrix_key(matrix, context):
+    """Hash einer Matrix zusammen mit der Bewertungs-Konfiguration (hex)."""
+    digest = hashlib.sha256(json.dumps(context, sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(matrix, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def halving_schedule(steps, rungs, eta):
+    """
+    Kumulierte Schrittzahlen der Halving-Stufen, die letzte ist steps.
+
+    Beispiel: steps=800, rungs=3, eta=2 -> [200, 400, 800].
+    """
+    return [max(1, int(steps / eta ** (rungs - 1 - r))) for r in range(rungs)]
+
+
+class MatrixSearch:
+    """
+    Genetische Suche über Interaktionsmatrizen mit Successive Halving und
+    Ergebnis-Cache.
+
+    Verwendung:
+        search = MatrixSearch(n_types=4, population=32, fitness="clusters", seed=0)
+        best, score = search.run(generations=20)
+        search.history   # Kennzahlen pro Generation
+    """
+
+    def __init__(self, n_types=4, population=24, n_particles=300, steps=1000, rungs=3, eta=2,
+                 fitness="clusters", mutation_scale=0.2, crossover_rate=0.5, elite=2,
+                 tournament=3, seed=None, cache_path=None, n_threads=None,
+                 **simulation_kwargs):
+        """
+        Args:
+            n_types (int): Anzahl der Typen (Matrix n_types x n_types).
+            population (int): Kandidaten pro Generation.
+            n_particles (int): Partikel pro Bewertungslauf.
+            steps (int): Schritte bis zur vollständigen Bewertung.
+            rungs (int): Anzahl der Halving-Stufen (1 = ohne Aussortieren).
+            eta (int): Nach jeder Stufe rechnet nur das beste 1 / eta weiter.
+            fitness (str): Name aus FITNESS_FUNCTIONS.
+            mutation_scale (float): Standardabweichung der Mutation pro Eintrag.
+            crossover_rate (float): Anteil der Kinder aus zwei Eltern.
+            elite (int): Beste Kandidaten, die unverändert übernommen werden.
+            tournament (int): Teilnehmer pro Turnier bei der Elternwahl.
+            seed (int, optional): Seed für Suche und Startzustand.
+            cache_path (str, optional): Cache-Datei (JSON Lines), wird
+                geladen und fortgeschrieben.
+            n_threads (int, optional): Threads der EnsembleSimulation.
+            **simulation_kwargs: dt, max_r, friction, profile, ... für die
+                Bewertungsläufe (siehe EnsembleSimulation).
+        """
+        if fitness not in FITNESS_FUNCTIONS:
+            raise ValueError(f"Unbekannte Fitness: {fitness!r} "
+                             f"(verfügbar: {', '.join(FITNESS_FUNCTIONS)})")
+        if population < 2:
+            raise ValueError(f"population muss >= 2 sein, nicht {population}")
+        if rungs < 1 or eta < 2:
+            raise ValueError(f"rungs muss >= 1 und eta >= 2 sein, nicht {rungs} / {eta}")
+        if not 0 <= elite < population:
+            raise ValueError(f"elite muss zwischen 0 und {population - 1} liegen, nicht {elite}")
+
+        self.n_types = n_types
+        self.population = population
+        self.n_particles = n_particles
+        self.fitness = fitness
+        self.mutation_scale = mutation_scale
+        self.crossover_rate = crossover_rate
+        self.elite = elite
+        self.tournament = tournament
+        self.n_threads = n_threads
+        self.schedule = halving_schedule(steps, rungs, eta)
+        self.eta = eta
+        self.simulation_kwargs = {"dt": 0.001, "max_r": 0.15, "friction": 0.1,
+                                  **simulation_kwargs}
+
+        self.seed = resolve_seed(seed)
+        self.rng = np.random.default_rng(self.seed)
+        # Gemeinsamer Startzustand aller Kandidaten (gleiche Ausgangslage)
+        start_rng = np.random.default_rng([self.seed, 1])
+        self.start_positions = start_rng.random((n_particles, 2))
+        self.start_types = start_rng.integers(0, n_types, n_particles)
+
+        # Alles, was die Bewertung einer Matrix beeinflusst, geht in den Hash ein
+        self.context = {"fitness": fitness, "n_particles": n_particles, "n_types": n_types,
+                        "schedule": self.schedule, "eta": eta, "seed": self.seed,
+                        "simulation": {k: v for k, v in sorted(self.simulation_kwargs.items())}}
+
+        self.cache = {}
+        self.cache_path = cache_path
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.cache[entry["key"]] = entry
+
+        self.history = []
+        self.n_simulated = 0
+        self.best_matrix = None
+        self.best_fitness = -math.inf
+
+    def _store(self, key, matrix, rung, fitness):
+        entry = {"key": key, "rung": rung, "fitness": fitness, "matrix": matrix.tolist()}
+        self.cache[key] = entry
+        if self.cache_path is not None:
+            with open(self.cache_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def _score(self, ensemble):
+        """Fitness jeder Welt im aktuellen Zustand."""
+        recorder = MetricsRecorder()
+        fitness = FITNESS_FUNCTIONS[self.fitness]
+        scores = np.empty(len(ensemble))
+        with contextlib.redirect_stdout(io.StringIO()):
+            for b in range(len(ensemble)):
+                metrics, _ = recorder.measure(ensemble.world(b))
+                scores[b] = fitness(metrics)
+        return scores
+
+    def evaluate(self, matrices):
+        """
+        Bewertet Kandidaten mit Successive Halving; bekannte Matrizen kommen
+        aus dem Cache.
+
+        Returns:
+            Tuple (rung, fitness) als Arrays (len(matrices),): erreichte
+            Halving-Stufe (len(schedule) - 1 = voll bewertet) und Fitness
+            auf dieser Stufe. Kandidaten vergleicht man zuerst nach rung.
+        """
+        matrices = np.asarray(matrices, dtype=np.float64)
+        keys = [matrix_key(matrix, self.context) for matrix in matrices]
+        rungs = np.zeros(len(matrices), dtype=np.int64)
+        scores = np.zeros(len(matrices))
+
+        # Jede neue Matrix nur einmal simulieren, auch innerhalb der Generation
+        pending = {}
+        for index, key in enumerate(keys):
+            if key not in self.cache:
+                pending.setdefault(key, index)
+        new = list(pending.values())
+
+        if new:
+            n = len(new)
+            ensemble = EnsembleSimulation(
+                np.broadcast_to(self.start_positions, (n, self.n_particles, 2)),
+                np.broadcast_to(self.start_types, (n, self.n_particles)), matrices[new],
+                seeds=np.full(n, self.seed), n_threads=self.n_threads,
+                **self.simulation_kwargs)
+            alive = np.arange(n)
+            for rung, steps in enumerate(self.schedule):
+                ensemble.run(steps - ensemble.step_count)
+                rung_scores = self._score(ensemble)
+                last = rung == len(self.schedule) - 1
+                # Die besten ceil(n / eta) rechnen weiter, der Rest endet hier
+                n_keep = len(alive) if last else max(1, math.ceil(len(alive) / self.eta))
+                order = np.argsort(-rung_scores, kind="stable")
+                for position, world in enumerate(order):
+                    if position >= n_keep or last:
+                        index = new[alive[world]]
+                        self._store(keys[index], matrices[index], rung,
+                                    float(rung_scores[world]))
+                if last:
+                    break
+                keep = np.sort(order[:n_keep])
+                alive = alive[keep]
+                ensemble = ensemble.select(keep)
+
+        for index, key in enumerate(keys):
+            rungs[index] = self.cache[key]["rung"]
+            scores[index] = self.cache[key]["fitness"]
+        self.n_simulated = len(new)
+        return rungs, scores
+
+    def initial_population(self):
+        """Zufällige Matrizen, gleichverteilt in [-1, 1]."""
+        return self.rng.uniform(-1.0, 1.0, (self.population, self.n_types, self.n_types))
+
+    def _select_parent(self, ranking):
+        contestants = self.rng.integers(0, len(ranking), self.tournament)
+        return ranking[contestants.min()]
+
+    def next_generation(self, matrices, rungs, scores):
+        """Elite übernehmen, Rest per Turnier, Crossover und Mutation."""
+        # Rangfolge: zuerst erreichte Halving-Stufe, dann Fitness
+        ranking = np.lexsort((-scores, -rungs))
+        children = [matrices[i] for i in ranking[:self.elite]]
+        while len(children) < self.population:
+            parent = matrices[self._select_parent(ranking)]
+            if self.rng.random() < self.crossover_rate:
+                other = matrices[self._select_parent(ranking)]
+                mask = self.rng.random(parent.shape) < 0.5
+                parent = np.where(mask, parent, other)
+            child = parent + self.rng.normal(0.0, self.mutation_scale, parent.shape)
+            children.append(np.clip(child, -1.0, 1.0))
+        return np.array(children)
+
+    def run(self, generations, callback=None, matrices=None):
+        """
+        Führt die Suche über generations Generationen aus.
+
+        Args:
+            generations (int): Anzahl der Generationen.
+            callback (callable, optional): Wird nach jeder Generation mit
+                dem Eintrag aus history aufgerufen.
+            matrices (np.ndarray, optional): Startpopulation (P, T, T).
+
+        Returns:
+            Tuple (beste Matrix, ihre Fitness).
+        """
+        if matrices is None:
+            matrices = self.initial_population()
+        full = len(self.schedule) - 1
+
+        for generation in range(generations):
+            rungs, scores = self.evaluate(matrices)
+            # Nur voll bewertete Kandidaten zählen als Ergebnis
+            finished = np.flatnonzero(rungs == full)
+            best = finished[np.argmax(scores[finished])] if len(finished) else None
+            if best is not None and scores[best] > self.best_fitness:
+                self.best_fitness = float(scores[best])
+                self.best_matrix = matrices[best].copy()
+
+            entry = {"generation": generation,
+                     "best_fitness": float(scores[best]) if best is not None else None,
+                     "mean_fitness": float(scores[finished].mean()) if len(finished) else None,
+                     "n_simulated": self.n_simulated,
+                     "n_cached": len(matrices) - self.n_simulated,
+                     "best_so_far": self.best_fitness}
+            self.history.append(entry)
+            if callback is not None:
+                callback(entry)
+            matrices = self.next_generation(matrices, rungs, scores)
+
+        return self.best_matrix, self.best_fitness
+
+
+def _format_fitness(value):
+    """Fitness für die Ausgabe; None, wenn in der Generation nichts fertig bewertet wurde."""
+    return "-" if value is None else f"{value:.4f}"
+
+
+def main(argv=None):
+    """Kommandozeile: Suche starten und die beste Matrix als JSON speichern."""
+    parser = argparse.ArgumentParser(
+        prog="particle-life-search",
+        description="Evolutionäre Suche nach Interaktionsmatrizen")
+    parser.add_argument("-g", "--generations", type=int, default=10)
+    parser.add_argument("-p", "--population", type=int, default=24)
+    parser.add_argument("-t", "--types", type=int, default=4)
+    parser.add_argument("-n", "--particles", type=int, default=300)
+    parser.add_argument("--steps", type=int, default=1000,
+                        help="Schritte bis zur vollständigen Bewertung")
+    parser.add_argument("--rungs", type=int, default=3, help="Halving-Stufen")
+    parser.add_argument("--fitness", default="clusters", choices=list(FITNESS_FUNCTIONS))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--cache", default=None, help="Cache-Datei (JSON Lines)")
+    parser.add_argument("-o", "--output", default="best_matrix.json",
+                        help="Beste Matrix (JSON, für particle-life --matrix)")
+    args = parser.parse_args(argv)
+    if args.generations < 1:
+        parser.error("--generations muss >= 1 sein")
+
+    search = MatrixSearch(n_types=args.types, population=args.population,
+                          n_particles=args.particles, steps=args.steps, rungs=args.rungs,
+                          fitness=args.fitness, seed=args.seed, cache_path=args.cache)
+    best, score = search.run(args.generations, callback=lambda entry: print(
+        f"Generation {entry['generation']:>3}: beste {_format_fitness(entry['best_fitness'])}, "
+        f"Mittel {_format_fitness(entry['mean_fitness'])}, simuliert {entry['n_simulated']}, "
+        f"aus Cache {entry['n_cached']}"))
+    if best is None:
+        print("Kein Kandidat wurde vollständig bewertet, keine Matrix gespeichert")
+        return 1
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"matrix": best.tolist(), "fitness": score, "context": search.context}, f,
+                  indent=2)
+    print(f"Beste Fitness {score:.4f} -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
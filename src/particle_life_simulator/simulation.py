@@ -1,5 +1,29 @@
-import numpy as np 
-from numba import jit
+import copy
+import time
+
+import numba
+import numpy as np
+
+from particle_life_simulator.analytics import MetricsRecorder
+from particle_life_simulator.checkpoint import read_checkpoint, write_checkpoint
+from particle_life_simulator.backends import BACKENDS, autotune, get_backend
+from particle_life_simulator.forces import MAX_CELLS_PER_AXIS
+from particle_life_simulator.instrumentation import StageTimer
+from particle_life_simulator.integrators import drift, kick, make_integrator
+from particle_life_simulator.interaction import Interaction, build_force_table
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.reorder import SpatialReorderer
+from particle_life_simulator.rng import resolve_seed
+
+# Ab dieser Partikelanzahl lohnt sich der Aufbau der Zellliste gegenüber
+# der O(N²)-Doppelschleife (gemessen mit max_r = 0.15, 4 Typen).
+CELL_LIST_MIN_PARTICLES = 128
+
+NEIGHBOR_MODES = ("auto", "brute", "cells", "verlet")
+
+# Platzhalter für particles.ids, solange Slot = ID gilt (siehe noise_ids)
+_NO_IDS = np.empty(0, dtype=np.int64)
+
 
 class Simulation:
     """
@@ -7,7 +31,9 @@ class Simulation:
     Statt speicherintensiver Matrizen nutzen wir kompilierte Schleifen.
     """
 
-    def __init__(self, dt, max_r, friction, noise_strength, particles, interactions):
+    def __init__(self, dt, max_r, friction, noise_strength, particles, interactions,
+                 neighbor_mode="auto", n_threads=None, integrator="semi_implicit_euler",
+                 seed=None, neighbor_skin=0.1, backend=None):
         """
         Args:
             dt: Der Zeitschritt
@@ -16,103 +42,342 @@ class Simulation:
             noise_strength: Stärke der stochastischen Zufallsbewegung
             particles: Das Partikelsystem
             interactions: Die Interaktionsmatrix
+            neighbor_mode: Nachbarsuche: "brute" (O(N²)), "cells" (Zellliste),
+                "verlet" (Nachbarliste, wiederverwendet bis ein Partikel
+                weiter als die halbe Skin gewandert ist) oder "auto" (wählt
+                zwischen brute und cells anhand von N und max_r)
+            n_threads: Anzahl der Threads für die Kraftberechnung
+                (None = alle von Numba verfügbaren Kerne, 1 = seriell)
+            integrator: "euler", "semi_implicit_euler" (Standard), "verlet"
+                oder eine eigene Integrator-Instanz
+            seed: Seed des Noise-Terms. Der Noise ist ein Hash aus (seed,
+                Schritt, Partikel-ID), d.h. unabhängig von Threads und
+                run()-Blöcken (None = aus np.random gezogen, siehe rng).
+            neighbor_skin: Skin der Verlet-Liste als Anteil von max_r
+                (nur bei neighbor_mode="verlet").
+            backend: Rechen-Backend der Kraftberechnung (Name oder Instanz,
+                siehe backends.BACKENDS), "auto" = per backends.autotune
+                gemessen, None = aus neighbor_mode und n_threads abgeleitet.
         """
+        if neighbor_mode not in NEIGHBOR_MODES:
+            raise ValueError(f"Unbekannter neighbor_mode: {neighbor_mode!r}")
+        if backend is not None and backend != "auto":
+            get_backend(backend)
+
         self.dt = dt
         self.max_r = max_r
         self.friction = friction
         self.noise_strength = noise_strength
         self.particles = particles
         self.interaction = interactions
+        self.neighbor_mode = neighbor_mode
+        self.neighbor_skin = neighbor_skin
+        # Verlet-Liste, angelegt beim ersten Schritt mit neighbor_mode="verlet"
+        self.neighbor_list = None
+        self.backend = backend
+        # Ergebnis von backend="auto": (Problemgröße, Backend)
+        self._tuned_backend = None
+        self.n_threads = n_threads
+        self.integrator = integrator
+        self.seed = resolve_seed(seed)
+
+        # Anzahl bereits ausgeführter Zeitschritte
+        self.step_count = 0
+
+        # Beobachter [every, callback], aufgerufen wenn step_count % every == 0
+        self._observers = []
+
+        # Zeitmessung der Stufen (abgeschaltet: praktisch kostenlos)
+        self.timer = StageTimer(enabled=False)
+
+    @classmethod
+    def from_checkpoint(cls, path, mmap=True, n_threads=None):
+        """
+        Setzt eine Simulation aus einem Checkpoint bitgenau fort.
+
+        Args:
+            path (str): Checkpoint-Datei (siehe save_checkpoint).
+            mmap (bool): Arrays copy-on-write per Memory-Map einblenden
+                statt sie zu laden.
+            n_threads: Thread-Anzahl (wird nicht gespeichert, da maschinenabhängig).
+        """
+        header, arrays = read_checkpoint(path, mmap=mmap)
+        params = header["params"]
+
+        particles = ParticleSystem.from_arrays(arrays["positions"], arrays["velocities"],
+                                               arrays["types"], arrays["accelerations"],
+                                               arrays.get("ids"), n_types=header["n_types"])
+        interactions = Interaction.from_matrix(arrays["matrix"], radii=arrays.get("radii"),
+                                               **params.get("force_profile", {}))
+
+        sim = cls(params["dt"], params["max_r"], params["friction"], params["noise_strength"],
+                  particles, interactions, neighbor_mode=params["neighbor_mode"],
+                  n_threads=n_threads, integrator=params["integrator"], seed=params.get("seed"),
+                  neighbor_skin=params.get("neighbor_skin", 0.1),
+                  backend=params.get("backend"))
+        sim.integrator.load_state_dict(header["integrator_state"])
+        sim.step_count = header["step_count"]
+        return sim
+
+    def save_checkpoint(self, path):
+        """Schreibt den vollständigen Zustand atomar nach path."""
+        write_checkpoint(self, path)
+
+    def enable_checkpoints(self, path, every):
+        """Schreibt alle `every` Schritte einen Checkpoint (überschreibt path)."""
+        self.add_observer(lambda sim: sim.save_checkpoint(path), every)
+
+    def enable_reordering(self, order="cells", check_every=10, max_travel=0.5):
+        """
+        Sortiert die Partikel ab jetzt regelmäßig räumlich um (Cache-Lokalität),
+        mit an die Bewegung angepasstem Intervall. Siehe reorder.SpatialReorderer.
+
+        Returns:
+            SpatialReorderer: für Statistiken (n_reorders, intervals).
+        """
+        return SpatialReorderer(order, check_every, max_travel).attach(self)
+
+    def enable_metrics(self, every=10, log_path=None, **kwargs):
+        """
+        Berechnet ab jetzt alle `every` Schritte Strukturkennzahlen (g(r),
+        Cluster, Durchmischung, kinetische Energie) und schreibt sie optional
+        in ein spaltenweises Log. Siehe analytics.MetricsRecorder.
+
+        Returns:
+            MetricsRecorder: für summary(), rdf() und close().
+        """
+        return MetricsRecorder(every, log_path=log_path, **kwargs).attach(self)
+
+    def enable_timing(self, timer=None):
+        """
+        Misst ab jetzt die Dauer jeder Stufe (forces, kick, drift, run,
+        observers) in einem Ringpuffer. Ein übergebener Timer kann mit dem
+        Renderer geteilt werden. Siehe instrumentation.StageTimer.
+
+        Returns:
+            StageTimer: für summary() und export_trace().
+        """
+        self.timer = timer if timer is not None else StageTimer()
+        self.timer.enabled = True
+        return self.timer
+
+    def add_observer(self, callback, every):
+        """
+        Registriert callback(simulation), das aufgerufen wird, sobald
+        step_count ein Vielfaches von every ist. run() beendet seine
+        kompilierten Blöcke genau an diesen Schritten.
+        """
+        if every < 1:
+            raise ValueError(f"every muss >= 1 sein, nicht {every}")
+        self._observers.append([every, callback])
+
+    def remove_observer(self, callback):
+        """Entfernt einen mit add_observer registrierten Beobachter."""
+        self._observers = [obs for obs in self._observers if obs[1] is not callback]
+
+    def _steps_until_observer(self):
+        """Schritte bis zum nächsten fälligen Beobachter (None = keiner)."""
+        if not self._observers:
+            return None
+        return min(every - self.step_count % every for every, _ in self._observers)
+
+    def _notify_observers(self):
+        with self.timer.stage("observers"):
+            for every, callback in self._observers:
+                if self.step_count % every == 0:
+                    callback(self)
+
+    @property
+    def n_threads(self):
+        """Anzahl der Threads, die der parallele Kraft-Kernel nutzen darf."""
+        return self._n_threads
+
+    @n_threads.setter
+    def n_threads(self, value):
+        max_threads = numba.config.NUMBA_NUM_THREADS
+        if value is None:
+            value = max_threads
+        if not 1 <= value <= max_threads:
+            raise ValueError(f"n_threads muss zwischen 1 und {max_threads} liegen, nicht {value}")
+        self._n_threads = int(value)
+
+    def noise_ids(self):
+        """Partikel-IDs für den Noise-Term (leer, solange Slot = ID gilt)."""
+        ids = getattr(self.particles, "ids", None)
+        return _NO_IDS if ids is None else ids
+
+    def cells_per_axis(self):
+        """Anzahl der Gitterzellen pro Achse (Zellbreite >= max_r)."""
+        return min(int(1.0 / self.max_r), MAX_CELLS_PER_AXIS)
+
+    def uses_cell_list(self):
+        """Entscheidet, ob im nächsten Schritt die Zellliste genutzt wird."""
+        # Unter 3 Zellen pro Achse würden sich die 3x3 Nachbarzellen
+        # überlappen und Paare doppelt gezählt werden.
+        if self.cells_per_axis() < 3 or self.neighbor_mode == "brute":
+            return False
+        if self.neighbor_mode == "cells":
+            return True
+        return len(self.particles.positions) >= CELL_LIST_MIN_PARTICLES
+
+    @property
+    def integrator(self):
+        """Das aktuelle Integrationsverfahren (siehe integrators.INTEGRATORS)."""
+        return self._integrator
+
+    @integrator.setter
+    def integrator(self, value):
+        self._integrator = make_integrator(value)
+        self._integrator.reset()
+
+    def resolve_backend(self):
+        """
+        Das Backend für den nächsten Schritt (siehe backends).
+
+        Ohne backend folgt es aus neighbor_mode und n_threads. Bei
+        backend="auto" wird pro Problemgröße (N, Typen, max_r, Threads)
+        einmal backends.autotune befragt, das Messungen pro Maschine cacht.
+        """
+        if self.backend == "auto":
+            key = (len(self.particles.positions), self.interaction.matrix.shape[0], self.max_r,
+                   self.n_threads)
+            if self._tuned_backend is None or self._tuned_backend[0] != key:
+                name = autotune(*key[:3], n_threads=self.n_threads)
+                self._tuned_backend = (key, BACKENDS[name])
+            return self._tuned_backend[1]
+        if self.backend is not None:
+            return get_backend(self.backend)
+
+        suffix = "-parallel" if self.n_threads > 1 else ""
+        if self.neighbor_mode == "verlet":
+            return BACKENDS["verlet" + suffix]
+        return BACKENDS[("cells" if self.uses_cell_list() else "numba") + suffix]
+
+    def force_kernel(self):
+        """
+        Setzt die Thread-Anzahl für Numba und wählt den Kraft-Kernel des
+        Backends (resolve_backend).
+
+        Returns:
+            Tuple (kernel, n_cells), siehe forces.select_force_kernel. Bei
+            den Verlet-Backends steht an Stelle von n_cells der Zustand
+            der Nachbarliste (siehe neighbors.NeighborList.prepare).
+        """
+        backend = self.resolve_backend()
+        if backend.parallel:
+            numba.set_num_threads(self.n_threads)
+        return backend.force_kernel(self)
+
+    def warmup(self):
+        """
+        Kompiliert alle Kernel, die diese Simulation in step() und run()
+        verwendet (bzw. lädt sie aus dem Numba-Cache auf der Platte), bevor
+        der erste echte Schritt gemessen oder angezeigt wird.
+
+        Gerechnet wird auf einer Miniatur-Kopie (zwei Partikel) mit denselben
+        Datentypen, Parametern, Kernel-Varianten und demselben Integrator;
+        der Zustand dieser Simulation bleibt unverändert.
+
+        Returns:
+            float: Dauer in Sekunden.
+        """
+        start_time = time.perf_counter()
+        particles = self.particles
+        n = min(2, len(particles.positions))
+        dummy = ParticleSystem.from_arrays(np.array(particles.positions[:n]),
+                                           np.array(particles.velocities[:n]),
+                                           np.array(particles.types[:n]),
+                                           np.array(particles.accelerations[:n]))
+        interactions = Interaction.from_matrix(np.array(self.interaction.matrix))
+
+        integrator = copy.copy(self.integrator)
+        integrator.reset()
+        if self.neighbor_mode == "verlet":
+            neighbor_mode = "verlet"
+        else:
+            neighbor_mode = "cells" if self.uses_cell_list() else "brute"
+        # Bei backend="auto" das gemessene Backend, nicht neu für zwei Partikel
+        backend = None if self.backend is None else self.resolve_backend()
+        sim = Simulation(self.dt, self.max_r, self.friction, self.noise_strength, dummy,
+                         interactions, neighbor_mode=neighbor_mode, n_threads=self.n_threads,
+                         integrator=integrator, seed=self.seed,
+                         neighbor_skin=self.neighbor_skin, backend=backend)
+        sim.step()
+        sim.run(2)
+        return time.perf_counter() - start_time
 
     def step(self):
         """Führt einen kompletten Simulationsschritt durch."""
+        self.integrator.step(self)
+        self.step_count += 1
+
+        if self._observers:
+            self._notify_observers()
+
+    def run(self, n_steps, callback=None, callback_every=None):
+        """
+        Führt n_steps Schritte aus, jeweils callback_every Schritte am Stück
+        in einem einzigen kompilierten Aufruf (ohne Python-Dispatch pro Schritt).
+
+        Blöcke enden zusätzlich an jedem Schritt, an dem ein Beobachter
+        (add_observer) fällig ist.
+
+        Args:
+            n_steps: Gesamtzahl der Zeitschritte
+            callback: Optional, wird nach jedem Block mit der Simulation
+                aufgerufen (z.B. für Snapshots)
+            callback_every: Schritte pro Block (None = alles in einem Block)
+        """
+        if callback_every is None:
+            callback_every = n_steps
+        if callback_every < 1:
+            raise ValueError(f"callback_every muss >= 1 sein, nicht {callback_every}")
+
+        done = 0
+        while done < n_steps:
+            chunk = min(callback_every - done % callback_every, n_steps - done)
+            until_observer = self._steps_until_observer()
+            if until_observer is not None:
+                chunk = min(chunk, until_observer)
 
-        # 1. Daten für Numba vorbereiten (NumPy Arrays extrahieren)
-        positions = self.particles.positions
-        velocities = self.particles.velocities
-        types = self.particles.types
-        rules = self.interaction.matrix
-
-        # 2. Die physikalischen Berechnungen an Numba delegieren
-        update_physics_numba(
-            positions,
-            velocities,
-            types,
-            rules,
-            self.max_r,
-            self.dt,
-            self.friction,
-            self.noise_strength,
-        )
-
-        # 3. Wrapping (Randbedingung: Partikel bleiben im Bereich 0.0-1.0)
-        self.particles.positions %= 1.0
-
-    # Wrapper-Methoden für Kompatibilität mit dem Visualizer
+            with self.timer.stage("run"):
+                self.integrator.run(self, chunk)
+            self.step_count += chunk
+            done += chunk
+
+            if self._observers:
+                self._notify_observers()
+            if callback is not None and (done % callback_every == 0 or done == n_steps):
+                callback(self)
+
+    def force_table(self):
+        """Kraft-Tabelle der Regeln für die Kraft-Kernel (Interaction.force_table)."""
+        force_table = getattr(self.interaction, "force_table", None)
+        if force_table is None:
+            # Nur eine Matrix (z.B. Test-Mocks): lineares Profil ohne Kern
+            return build_force_table(self.interaction.matrix)
+        return force_table()
+
+    # Einzelphasen, aus denen die Integratoren einen Schritt zusammensetzen
     def update_accelerations(self):
-        pass
+        """Berechnet die Kräfte aller Partikel nach particles.accelerations."""
+        kernel, n_cells = self.force_kernel()
+        table = self.force_table()
+        with self.timer.stage("forces"):
+            kernel(self.particles.positions, self.particles.types, table, self.max_r,
+                   self.particles.accelerations, n_cells)
 
     def update_velocities(self):
-        pass
+        """Reibung, Beschleunigung und Noise auf die Geschwindigkeiten anwenden."""
+        with self.timer.stage("kick"):
+            kick(self.particles.velocities, self.particles.accelerations, self.dt,
+                 self.friction, self.noise_strength, self.seed, self.step_count,
+                 self.noise_ids())
 
     def update_positions(self):
-        self.step()
-
-
-@jit(nopython=True, fastmath=True)
-def update_physics_numba(positions, velocities, types, rules, max_r, dt, friction, noise_strength):
-    """
-    Numba JIT Kernel zur Berechnung der Interaktionen inkl. Zufallsbewegung.
-    """
-    n_particles = len(positions)
-
-    for i in range(n_particles):
-        total_force_x = 0.0
-        total_force_y = 0.0
-
-        pos_x_i = positions[i, 0]
-        pos_y_i = positions[i, 1]
-        type_i = types[i]
-
-        for j in range(n_particles):
-            if i == j:
-                continue
-
-            dx = positions[j, 0] - pos_x_i
-            dy = positions[j, 1] - pos_y_i
-
-            if dx > 0.5:
-                dx -= 1.0
-            elif dx < -0.5:
-                dx += 1.0
-
-            if dy > 0.5:
-                dy -= 1.0
-            elif dy < -0.5:
-                dy += 1.0
-
-            dist_sq = dx * dx + dy * dy
-
-            if dist_sq > 0 and dist_sq < (max_r * max_r):
-                dist = np.sqrt(dist_sq)
-                force_val = rules[type_i, types[j]] * (1.0 - (dist / max_r))
-                total_force_x += (dx / dist) * force_val
-                total_force_y += (dy / dist) * force_val
-
-        # 5. Integration (Euler) inkl. Reibung und Zufallsbewegung
-        velocities[i, 0] *= (1.0 - friction * dt)
-        velocities[i, 1] *= (1.0 - friction * dt)
-
-        # Deterministische Kraft
-        velocities[i, 0] += total_force_x * dt
-        velocities[i, 1] += total_force_y * dt
-        
-        # Stochastische Kraft (Noise)
-        if noise_strength > 0.0:
-            velocities[i, 0] += (np.random.rand() - 0.5) * noise_strength * dt
-            velocities[i, 1] += (np.random.rand() - 0.5) * noise_strength * dt
-
-    # 6. Geschwindigkeit auf Position anwenden
-    for i in range(n_particles):
-        positions[i, 0] += velocities[i, 0] * dt
-        positions[i, 1] += velocities[i, 1] * dt
+        """
+        Geschwindigkeit auf Positionen anwenden. Das Wrapping (Randbedingung:
+        Partikel bleiben im Bereich 0.0-1.0) passiert im selben Durchlauf.
+        """
+        with self.timer.stage("drift"):
+            drift(self.particles.positions, self.particles.velocities, self.dt)
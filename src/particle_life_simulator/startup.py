@@ -0,0 +1,120 @@
+"""
+Startlatenz: Messung und Vorkompilieren der Kernel.
+
+Alle Kernel sind mit cache=True kompiliert; Numba legt den Maschinencode
+in __pycache__ (bzw. NUMBA_CACHE_DIR) ab und lädt ihn in späteren Prozessen,
+statt neu zu kompilieren. precompile() füllt diesen Cache für alle
+unterstützten Signaturen (float64-Zustand, int64-Typen) und Kernel-Varianten,
+z.B. einmalig nach der Installation oder vor einem Batch-Sweep.
+
+Aufruf:
+    python -m particle_life_simulator.startup              # Startzeiten messen
+    python -m particle_life_simulator.startup --precompile # Cache füllen
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+
+class StartupTimer:
+    """Misst benannte Phasen (z.B. import, compile, first_step) nacheinander."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start_time
+
+    def record(self, name, seconds):
+        """Übernimmt eine anderweitig gemessene Dauer (z.B. von warmup())."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def report(self):
+        parts = [f"{name} {seconds:.3f} s" for name, seconds in self.phases.items()]
+        return "Startup: " + " | ".join(parts) + f" | gesamt {self.total:.3f} s"
+
+
+def precompile(n_types=4, integrators=None, parallel=(False, True)):
+    """
+    Kompiliert alle Kernel-Varianten (Nachbarsuche x seriell/parallel x
+    Integrator) für den Standard-Zustand und legt sie im Numba-Cache ab.
+
+    Returns:
+        dict: Variante -> Dauer in Sekunden (ab dem zweiten Prozess nahe 0).
+    """
+    import numba
+
+    from particle_life_simulator.integrators import INTEGRATORS
+    from particle_life_simulator.interaction import Interaction
+    from particle_life_simulator.particles import ParticleSystem
+    from particle_life_simulator.simulation import Simulation
+
+    timings = {}
+    for integrator in integrators or list(INTEGRATORS):
+        for neighbor_mode in ("brute", "cells", "verlet"):
+            for is_parallel in parallel:
+                n_threads = numba.config.NUMBA_NUM_THREADS if is_parallel else 1
+                if is_parallel and n_threads < 2:
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    particles = ParticleSystem(2, n_types)
+                    interactions = Interaction(n_types)
+                sim = Simulation(0.001, 0.15, 0.1, 0.0, particles, interactions,
+                                 neighbor_mode=neighbor_mode, n_threads=n_threads,
+                                 integrator=integrator)
+                name = f"{integrator}/{neighbor_mode}/{'parallel' if is_parallel else 'serial'}"
+                timings[name] = sim.warmup()
+    return timings
+
+
+def measure_startup(n_particles=2000, n_types=4):
+    """
+    Misst die Startphasen einer headless Simulation im aktuellen Prozess.
+    Aussagekräftig für import nur, wenn das Paket noch nicht geladen ist.
+    """
+    timer = StartupTimer()
+    with timer.phase("import"):
+        from particle_life_simulator.interaction import Interaction
+        from particle_life_simulator.particles import ParticleSystem
+        from particle_life_simulator.simulation import Simulation
+
+    with timer.phase("setup"), contextlib.redirect_stdout(io.StringIO()):
+        sim = Simulation(0.001, 0.15, 0.1, 0.0, ParticleSystem(n_particles, n_types),
+                         Interaction(n_types))
+    timer.record("compile", sim.warmup())
+    with timer.phase("first_step"):
+        sim.step()
+    return timer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m particle_life_simulator.startup",
+        description="Startlatenz messen bzw. den Numba-Kernel-Cache füllen.")
+    parser.add_argument("--precompile", action="store_true",
+                        help="Alle Kernel-Varianten kompilieren und cachen")
+    parser.add_argument("-n", "--particles", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.precompile:
+        for name, seconds in precompile().items():
+            print(f"{name:<36} {seconds:7.3f} s")
+        return 0
+
+    print(measure_startup(args.particles).report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
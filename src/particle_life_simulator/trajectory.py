@@ -0,0 +1,309 @@
+"""
+Aufzeichnung und Wiedergabe von Trajektorien.
+
+Eine Trajektorie ist ein Verzeichnis:
+    meta.json                 Metadaten und Chunk-Verzeichnis
+    types.npy                 Typen (einmalig, ändern sich nie)
+    steps_000000.npy          Simulationsschritt jedes Frames im Chunk
+    positions_000000.npy      (Frames, N, 2) – bzw. .npy.zlib wenn komprimiert
+    velocities_000000.npy     optional
+
+Unkomprimierte Chunks werden beim Lesen per Memory-Map eingeblendet, sodass
+auch sehr große Trajektorien ohne vollständiges Laden geschnitten werden
+können. Komprimierte Chunks werden erst beim Zugriff entpackt (mit kleinem
+LRU-Cache). meta.json wird erst nach einem vollständig geschriebenen Chunk
+aktualisiert; Leser sehen also nie halbe Chunks.
+"""
+import io
+import json
+import os
+import queue
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+COMPRESSIONS = (None, "zlib")
+
+Frame = namedtuple("Frame", ["step", "positions", "velocities"])
+
+
+def _chunk_file(field, index, compressed):
+    return f"{field}_{index:06d}.npy" + (".zlib" if compressed else "")
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+class TrajectoryWriter:
+    """
+    Schreibt Frames in Chunks auf die Platte. Kopieren/Konvertieren passiert
+    im aufrufenden Thread, Zusammensetzen, Komprimieren und Schreiben in
+    einem Hintergrund-Thread.
+
+    Verwendung mit Simulation.run:
+        with TrajectoryWriter("run.traj", particles.types) as writer:
+            sim.run(10_000, callback=writer.record, callback_every=10)
+    """
+
+    def __init__(self, path, types, chunk_size=128, dtype=np.float32, compression=None,
+                 record_velocities=True, queue_size=16):
+        """
+        Args:
+            path (str): Zielverzeichnis (wird angelegt, darf nicht existieren).
+            types (np.ndarray): Typen-Array (N,), wird einmalig gespeichert.
+            chunk_size (int): Frames pro Chunk-Datei.
+            dtype: Speicher-Datentyp, Default float32 (halbiert die Datenmenge).
+            compression (str, optional): None oder "zlib" (pro Chunk).
+            record_velocities (bool): Geschwindigkeiten mitschreiben.
+            queue_size (int): Maximal wartende Frames; bei vollem Puffer
+                blockiert append(), statt unbegrenzt Speicher zu belegen.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unbekannte Kompression: {compression!r}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size muss >= 1 sein, nicht {chunk_size}")
+
+        os.makedirs(path)
+        self.path = path
+        self.n_particles = len(types)
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+        self.compression = compression
+        self.fields = ["positions", "velocities"] if record_velocities else ["positions"]
+
+        np.save(os.path.join(path, "types.npy"), np.asarray(types))
+        self._meta = {
+            "version": FORMAT_VERSION,
+            "n_particles": self.n_particles,
+            "dtype": self.dtype.str,
+            "chunk_size": chunk_size,
+            "compression": compression,
+            "fields": self.fields,
+            "n_frames": 0,
+            "chunks": [],
+        }
+        _write_json_atomic(os.path.join(path, "meta.json"), self._meta)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, name="TrajectoryWriter",
+                                        daemon=True)
+        self._thread.start()
+
+    def append(self, positions, velocities=None, step=-1):
+        """Reiht einen Frame zum Schreiben ein (Arrays werden kopiert)."""
+        self._raise_writer_error()
+        if self._closed:
+            raise ValueError("TrajectoryWriter ist bereits geschlossen")
+        if len(positions) != self.n_particles:
+            raise ValueError(f"Frame hat {len(positions)} Partikel, erwartet {self.n_particles}")
+
+        frame = {"positions": np.array(positions, dtype=self.dtype)}
+        if "velocities" in self.fields:
+            if velocities is None:
+                raise ValueError("velocities fehlen (record_velocities=True)")
+            frame["velocities"] = np.array(velocities, dtype=self.dtype)
+        self._queue.put((int(step), frame))
+
+    def record(self, simulation):
+        """
+        Callback für Simulation.run: zeichnet den aktuellen Zustand auf
+        (in ID-Reihenfolge, passend zu types).
+        """
+        particles = simulation.particles
+        self.append(particles.by_id(particles.positions), particles.by_id(particles.velocities),
+                    step=simulation.step_count)
+
+    def close(self):
+        """Schreibt den letzten (ggf. unvollständigen) Chunk und beendet den Thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise RuntimeError("Fehler im Trajektorien-Writer") from self._error
+
+    def _writer_loop(self):
+        item = ()
+        steps = []
+        buffers = {field: [] for field in self.fields}
+        try:
+            while True:
+                item = self._queue.get()
+                if item is not None:
+                    step, frame = item
+                    steps.append(step)
+                    for field in self.fields:
+                        buffers[field].append(frame[field])
+
+                if steps and (item is None or len(steps) == self.chunk_size):
+                    self._write_chunk(steps, buffers)
+                    steps = []
+                    buffers = {field: [] for field in self.fields}
+
+                if item is None:
+                    return
+        except BaseException as exc:
+            self._error = exc
+            # Restliche Frames verwerfen, damit append() nicht blockiert
+            while item is not None:
+                item = self._queue.get()
+
+    def _write_chunk(self, steps, buffers):
+        index = len(self._meta["chunks"])
+        compressed = self.compression is not None
+
+        np.save(os.path.join(self.path, f"steps_{index:06d}.npy"),
+                np.array(steps, dtype=np.int64))
+        for field in self.fields:
+            data = np.stack(buffers[field])
+            file_path = os.path.join(self.path, _chunk_file(field, index, compressed))
+            if compressed:
+                raw = io.BytesIO()
+                np.save(raw, data)
+                with open(file_path, "wb") as f:
+                    f.write(zlib.compress(raw.getbuffer(), 1))
+            else:
+                np.save(file_path, data)
+
+        self._meta["chunks"].append({"n_frames": len(steps), "compressed": compressed})
+        self._meta["n_frames"] += len(steps)
+        _write_json_atomic(os.path.join(self.path, "meta.json"), self._meta)
+
+
+class TrajectoryField:
+    """
+    Lazy, indizierbare Sicht auf ein Feld (z.B. positions) aller Frames.
+
+    field[i] liefert ein (N, 2) Array (bei unkomprimierten Chunks eine
+    Memory-Map), field[a:b:c] ein (Frames, N, 2) Array, für das nur die
+    betroffenen Chunks gelesen werden.
+    """
+
+    def __init__(self, reader, field):
+        self._reader = reader
+        self._field = field
+
+    def __len__(self):
+        return len(self._reader)
+
+    @property
+    def shape(self):
+        return (len(self), self._reader.n_particles, 2)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            reader = self._reader
+            frame_ids = np.arange(*index.indices(len(self)))
+            chunk_ids = np.searchsorted(reader._chunk_offsets, frame_ids, side="right") - 1
+            out = np.empty((len(frame_ids), reader.n_particles, 2), dtype=reader.dtype)
+            for chunk in np.unique(chunk_ids):
+                mask = chunk_ids == chunk
+                offsets = frame_ids[mask] - reader._chunk_offsets[chunk]
+                out[mask] = reader._chunk(self._field, int(chunk))[offsets]
+            return out
+
+        chunk, offset = self._reader._locate(index)
+        return self._reader._chunk(self._field, chunk)[offset]
+
+
+class TrajectoryReader:
+    """
+    Liest eine mit TrajectoryWriter geschriebene Trajektorie.
+
+    reader[i] liefert einen Frame(step, positions, velocities);
+    reader.positions / reader.velocities erlauben Slicing ohne alles zu laden.
+    """
+
+    def __init__(self, path, cache_chunks=4):
+        """
+        Args:
+            path (str): Trajektorien-Verzeichnis.
+            cache_chunks (int): Anzahl entpackter Chunks im LRU-Cache.
+        """
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Nicht unterstützte Formatversion {self.meta['version']}")
+
+        self.n_particles = self.meta["n_particles"]
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.fields = self.meta["fields"]
+        self.types = np.load(os.path.join(path, "types.npy"))
+
+        counts = [chunk["n_frames"] for chunk in self.meta["chunks"]]
+        self._chunk_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.steps = np.concatenate(
+            [np.load(os.path.join(path, f"steps_{i:06d}.npy")) for i in range(len(counts))]
+        ) if counts else np.empty(0, dtype=np.int64)
+
+        self._cache = OrderedDict()
+        self._cache_chunks = cache_chunks
+
+        self.positions = TrajectoryField(self, "positions")
+        self.velocities = TrajectoryField(self, "velocities") if "velocities" in self.fields else None
+
+    def __len__(self):
+        return int(self._chunk_offsets[-1])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._normalize(index)
+        velocities = self.velocities[index] if self.velocities is not None else None
+        return Frame(int(self.steps[index]), self.positions[index], velocities)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _normalize(self, index):
+        n_frames = len(self)
+        if index < 0:
+            index += n_frames
+        if not 0 <= index < n_frames:
+            raise IndexError(f"Frame {index} außerhalb von 0..{n_frames - 1}")
+        return index
+
+    def _locate(self, index):
+        """Frame-Index -> (Chunk-Index, Offset im Chunk)."""
+        index = self._normalize(index)
+        chunk = int(np.searchsorted(self._chunk_offsets, index, side="right")) - 1
+        return chunk, index - int(self._chunk_offsets[chunk])
+
+    def _chunk(self, field, chunk):
+        key = (field, chunk)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        compressed = self.meta["chunks"][chunk]["compressed"]
+        file_path = os.path.join(self.path, _chunk_file(field, chunk, compressed))
+        if compressed:
+            with open(file_path, "rb") as f:
+                data = np.load(io.BytesIO(zlib.decompress(f.read())))
+        else:
+            data = np.load(file_path, mmap_mode="r")
+
+        self._cache[key] = data
+        if len(self._cache) > self._cache_chunks:
+            self._cache.popitem(last=False)
+        return data
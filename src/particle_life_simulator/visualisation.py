@@ -1,6 +1,14 @@
+import queue
+import time
+
 import numpy as np
 from vispy import app, scene
 
+from particle_life_simulator.instrumentation import StageTimer
+from particle_life_simulator.lod import LevelOfDetail
+from particle_life_simulator.particle_visual import Particles, type_colors
+from particle_life_simulator.physics_thread import PhysicsWorker
+
 class Visualizer:
     """
     Visualisiert die Partikel-Simulation in Echtzeit mittels Vispy (OpenGL).
@@ -10,7 +18,8 @@ class Visualizer:
     zur Steuerung der Simulationsparameter.
     """
 
-    def __init__(self, simulation, width=800, height=800):
+    def __init__(self, simulation=None, width=800, height=800, replay=None, steps_per_frame=1,
+                 lod="auto"):
         """
         Initialisiert das Visualisierungs-Fenster und die Szene.
  
@@ -18,8 +27,22 @@ class Visualizer:
             simulation (Simulation): Die Instanz der Physik-Simulation.
             width (int, optional): Breite des Fensters in Pixeln. Default: 800.
             height (int, optional): Höhe des Fensters in Pixeln. Default: 800.
+            replay (ReplayPlayer, optional): Wiedergabe vorberechneter Frames
+                statt Live-Physik (Replay-Modus).
+            steps_per_frame (int, optional): Physik-Schritte pro gezeichnetem
+                Frame. Die Physik läuft in einem eigenen Thread. Default: 1.
+            lod (str, optional): Level of Detail, "auto" (Marker oder
+                Dichte-Textur je nach Anzahl und Zoom), "markers" oder
+                "density", siehe lod.LevelOfDetail. Default: "auto".
         """
+        if simulation is None and replay is None:
+            raise ValueError("Visualizer braucht eine Simulation oder einen ReplayPlayer")
+
         self.simulation = simulation
+        self.replay = replay
+        self.physics = None
+        if replay is None:
+            self.physics = PhysicsWorker(simulation, steps_per_frame=steps_per_frame)
         
         #interaktivität
         self.canvas = scene.SceneCanvas(keys='interactive', size=(width, height), show=True, bgcolor='black')
@@ -29,28 +52,64 @@ class Visualizer:
         self.view = self.canvas.central_widget.add_view()
         self.view.camera = scene.PanZoomCamera(rect=(0, 0, 1, 1))
 
-        # Partikel-Visualisierung 
-        self.scatter = scene.visuals.Markers()
-        self.view.add(self.scatter) 
-
-        # Farben vorbereiten (Mapping von Typ-ID zu RGBA)
-        # 0=Rot, 1=Grün, 2=Blau, 3=weiß
-        base_colors = np.array([
-            [1.0, 0.2, 0.2, 1.0],  # Rot
-            [0.2, 1.0, 0.2, 1.0],  # Grün
-            [0.2, 0.2, 1.0, 1.0],  # Blau
-            [1.0, 1.0, 1.0, 1.0]   # Weiß
-        ])
-        
         # Wir speichern die Farben basierend auf den Typen der Partikel
-        self.particle_colors = base_colors[self.simulation.particles.types]
+        # (Live-Positionen kommen in ID-Reihenfolge, siehe ParticleSystem.by_id)
+        if replay is not None:
+            types = replay.types
+            capacity = len(types)
+            n_types = int(types.max()) + 1 if len(types) else 1
+        else:
+            types = self.simulation.particles.by_id(self.simulation.particles.types)
+            capacity = self.simulation.particles.capacity
+            n_types = self.simulation.particles.n_types
+
+        # Farben vorbereiten (Mapping von Typ-ID zu RGBA), eine pro Typ
+        self.base_colors = type_colors(n_types)
+        self.particle_colors = self.base_colors[types]
+        # Typ pro ID für Dichte-Textur und Culling (wie die Farben aktualisiert)
+        self.particle_types = np.array(types)
+        self._pending_change = None
+
+        # Partikel-Visualisierung: Farben und Größe werden nur einmal
+        # hochgeladen, pro Frame nur noch die Positionen (float32). Bei
+        # spawn/remove werden nur die geänderten Farben nachgeladen.
+        self.scatter = Particles(self.particle_colors, size=8, capacity=capacity)
+        self.view.add(self.scatter)
+
+        # Level of Detail: beim Hineinzoomen nur die sichtbaren Partikel
+        # (eigener Visual, Farben pro Frame), bei sehr vielen Partikeln pro
+        # Pixel eine Dichte-Textur statt Marker
+        self.lod = LevelOfDetail(lod)
+        self.culled = Particles(np.zeros((1, 4)), size=8, capacity=1024)
+        self.culled.visible = False
+        self.view.add(self.culled)
+        self.density = scene.visuals.Image(np.zeros((1, 1, 4), dtype=np.uint8),
+                                           interpolation='nearest', parent=self.view.scene)
+        self.density.transform = scene.transforms.STTransform()
+        self.density.visible = False
+        self.upload_time = 0.0
+
+        # Zeitmessung: Live teilen sich Renderer und Physik-Thread den Timer
+        # der Simulation (ein gemeinsamer Trace), im Replay ein eigener.
+        # Abgeschaltet, bis das HUD mit 'p' eingeblendet wird.
+        self.timer = self.simulation.timer if replay is None else StageTimer(enabled=False)
+        self.hud = scene.visuals.Text("", parent=self.canvas.scene, color='white',
+                                      font_size=8, face='Courier New', pos=(10, 10),
+                                      anchor_x='left', anchor_y='top')
+        self.hud.visible = False
+        self.canvas.events.draw.connect(self._on_draw_start, position='first')
+        self.canvas.events.draw.connect(self._on_draw_end, position='last')
+        self._draw_start = None
         
         # Timer für die Animationsschleife (ca. 60 FPS)
-        self.timer = app.Timer(interval=1/60, connect=self.update, start=True)
+        self.frame_timer = app.Timer(interval=1/60, connect=self.update, start=True)
         self.frame_count = 0
 
         # Tastatur-Events verknüpfen
         self.canvas.events.key_press.connect(self.on_key_press)
+
+        if self.physics is not None:
+            self.physics.start()
         
         print("--> [Visualizer] Fenster gestartet. Drücke 'H' für Steuerung.")
 
@@ -61,78 +120,286 @@ class Visualizer:
         Args:
             event: Das KeyPress-Event von Vispy.
         """
+        if self.replay is not None:
+            self.on_replay_key_press(event)
+            return
+
+        # Parameter werden nicht direkt gesetzt, sondern an den Physik-Thread
+        # übergeben und dort zwischen zwei Schrittblöcken angewendet.
+        physics = self.physics
+
         # 1. Pause
         if event.text == ' ':
-            if self.timer.running:
-                self.timer.stop()
-                self.canvas.title = "PAUSED"
+            if physics.paused:
+                physics.resume()
             else:
-                self.timer.start()
+                physics.pause()
+                self.canvas.title = "PAUSED"
         
         # 2. Reibung ändern
         elif event.text == 'f':
-            self.simulation.friction = min(1.0, self.simulation.friction + 0.05)
-            print(f"Friction erhöht: {self.simulation.friction:.2f}")
+            friction = min(1.0, self.simulation.friction + 0.05)
+            physics.set_param("friction", friction)
+            print(f"Friction erhöht: {friction:.2f}")
         elif event.text == 'g':
-            self.simulation.friction = max(0.0, self.simulation.friction - 0.05)
-            print(f"Friction verringert: {self.simulation.friction:.2f}")
+            friction = max(0.0, self.simulation.friction - 0.05)
+            physics.set_param("friction", friction)
+            print(f"Friction verringert: {friction:.2f}")
 
         # 3. Radius (Max_R) ändern
         elif event.text == 'r':
-            self.simulation.max_r = min(0.5, self.simulation.max_r + 0.01)
-            print(f"Max Radius erhöht: {self.simulation.max_r:.2f}")
+            max_r = min(0.5, self.simulation.max_r + 0.01)
+            physics.set_param("max_r", max_r)
+            print(f"Max Radius erhöht: {max_r:.2f}")
         elif event.text == 't':
-            self.simulation.max_r = max(0.01, self.simulation.max_r - 0.01)
-            print(f"Max Radius verringert: {self.simulation.max_r:.2f}")
+            max_r = max(0.01, self.simulation.max_r - 0.01)
+            physics.set_param("max_r", max_r)
+            print(f"Max Radius verringert: {max_r:.2f}")
 
         # 4. Interaktionsmatrix neu würfeln (Chaos-Modus)
         elif event.text == 'm':
             print("Zufällige neue Regeln generiert!")
-            n_types = self.simulation.interaction.num_types
-            # Generiert Werte zwischen -1 und 1
-            new_matrix = np.random.uniform(-1.0, 1.0, (n_types, n_types))
-            self.simulation.interaction.matrix = new_matrix
+            # Werte zwischen -1 und 1 aus dem Generator der Regeln (seed)
+            physics.submit(lambda sim: sim.interaction.randomize())
+
+        # 5. Physik-Schritte pro Frame
+        elif event.text == '+':
+            physics.steps_per_frame *= 2
+            print(f"Schritte pro Frame: {physics.steps_per_frame}")
+        elif event.text == '-':
+            physics.steps_per_frame = max(1, physics.steps_per_frame // 2)
+            print(f"Schritte pro Frame: {physics.steps_per_frame}")
+
+        # 6. Partikel erzeugen / entfernen
+        elif event.text == 'n':
+            x, y = np.random.rand(2) * 0.9
+            particle_type = np.random.randint(self.simulation.particles.n_types)
+            physics.submit(lambda sim: sim.particles.spawn(200, particle_type,
+                                                           (x, y, x + 0.1, y + 0.1)))
+            print(f"200 Partikel vom Typ {particle_type} erzeugt")
+        elif event.text == 'x':
+            def remove_random(sim):
+                n_particles = sim.particles.n_particles
+                k = min(200, n_particles - 1)
+                sim.particles.remove(np.random.choice(n_particles, k, replace=False))
+            physics.submit(remove_random)
+            print("200 zufällige Partikel entfernt")
 
-        # 5. Hilfe ausgeben
+        # 7. Performance-HUD / Trace / Level of Detail
+        elif event.text == 'p':
+            self.toggle_hud()
+        elif event.text == 'o':
+            self.export_trace()
+        elif event.text == 'l':
+            print(f"Level of Detail: {self.lod.cycle_mode()}")
+
+        # 8. Hilfe ausgeben
         elif event.text == 'h':
             print("=== STEUERUNG ===")
             print("[SPACE] Pause/Play")
             print("[f] / [g] Reibung +/-")
             print("[r] / [t] Radius +/-")
             print("[m]     Neue Zufalls-Regeln (Matrix)")
+            print("[+] / [-] Physik-Schritte pro Frame x2 / x0.5")
+            print("[n] / [x] 200 Partikel erzeugen / entfernen")
+            print("[p]     Performance-HUD an/aus")
+            print("[o]     Trace speichern (trace.json)")
+            print("[l]     Level of Detail: auto / Marker / Dichte")
             print("[ESC]   Beenden")
 
+    def on_replay_key_press(self, event):
+        """
+        Steuerung im Replay-Modus: Pause, Scrubbing, Vorspulen, Sprünge.
+
+        Args:
+            event: Das KeyPress-Event von Vispy.
+        """
+        replay = self.replay
+        key = event.key.name if event.key is not None else None
+
+        if event.text == ' ':
+            replay.toggle_pause()
+        elif key == 'Right':
+            replay.scrub(1)
+        elif key == 'Left':
+            replay.scrub(-1)
+        elif key == 'PageDown':
+            replay.scrub(100)
+        elif key == 'PageUp':
+            replay.scrub(-100)
+        elif key == 'Home':
+            replay.seek(0)
+        elif key == 'End':
+            replay.seek(-1)
+        elif event.text == '+':
+            replay.set_speed(replay.speed * 2)
+        elif event.text == '-':
+            replay.set_speed(replay.speed / 2)
+        elif event.text == 'b':
+            replay.set_speed(-replay.speed)
+        elif event.text == 'p':
+            self.toggle_hud()
+        elif event.text == 'o':
+            self.export_trace()
+        elif event.text == 'l':
+            print(f"Level of Detail: {self.lod.cycle_mode()}")
+        elif event.text == 'h':
+            print("=== STEUERUNG (REPLAY) ===")
+            print("[SPACE]        Pause/Play")
+            print("[←] / [→]      Einen Frame zurück/vor")
+            print("[PgUp] / [PgDn] 100 Frames zurück/vor")
+            print("[Home] / [End] Anfang / Ende (live)")
+            print("[+] / [-]      Geschwindigkeit x2 / x0.5 (Frame-Skipping)")
+            print("[b]            Rückwärts")
+            print("[p] / [o]      Performance-HUD / Trace speichern")
+            print("[l]            Level of Detail: auto / Marker / Dichte")
+            print("[ESC]          Beenden")
+
     def update(self, event):
         """
         Die Hauptschleife der Visualisierung.
         
-        Wird vom Timer aufgerufen, berechnet den nächsten Physik-Schritt
-        und aktualisiert die Grafik.
+        Wird vom Timer aufgerufen und zeichnet den neuesten Zustand. Die
+        Physik selbst läuft im PhysicsWorker; gibt es noch keinen neuen
+        Zustand, bleibt die Grafik unverändert.
         
         Args:
             event: Timer-Event (enthält Zeitdelta etc.)
         """
         self.frame_count += 1
-        
-        # Physik berechnen (Model update)
-        self.simulation.update_positions()
+        timer = self.timer
+
+        if self.replay is not None:
+            # Replay: vorgeladenen Frame anzeigen, keine Physik
+            with timer.stage("acquire"):
+                frame = self.replay.next_frame()
+            if frame is None:
+                return
+            positions = frame.positions
+        else:
+            # Neuesten Zustand aus dem Triple-Buffer holen (ohne Kopie)
+            with timer.stage("acquire"):
+                positions, step, fresh = self.physics.latest_positions()
+            if not fresh:
+                return
+            with timer.stage("colors"):
+                self.apply_type_changes(step)
 
         # Grafik aktualisieren
-        self.scatter.set_data(
-            pos=self.simulation.particles.positions,
-            edge_width=0,
-            face_color=self.particle_colors,
-            size=8
-        )
+        with timer.stage("lod"):
+            rect = self.view.camera.rect
+            level = self.lod.update(positions, self.particle_types[:len(positions)],
+                                    self.base_colors, rect.pos + rect.size, self.view.size)
+        with timer.stage("upload"):
+            self.show_level(level, positions)
+
+        if self.hud.visible and self.frame_count % 30 == 0:
+            self.hud.text = timer.format_summary()
         
         # Status im Fenstertitel anzeigen
-        if self.frame_count % 30 == 0:
+        upload_ms = self.upload_time * 1000
+        if self.frame_count % 30 == 0 and self.replay is not None:
+            self.canvas.title = (f"FPS: {self.canvas.fps:.1f} | Upload: {upload_ms:.2f} ms | "
+                                 f"Frame: {self.replay.index}/{len(self.replay)} | "
+                                 f"Step: {frame.step} | Speed: {self.replay.speed:g}x"
+                                 f"{' | PAUSED' if self.replay.paused else ''}")
+        elif self.frame_count % 30 == 0:
             fps = self.canvas.fps
-            title = (f"FPS: {fps:.1f} | "
+            title = (f"FPS: {fps:.1f} | Upload: {upload_ms:.2f} ms | "
+                     f"N: {self.scatter.n_particles} ({self.lod.level}) | "
+                     f"Steps/s: {self.physics.steps_per_second:.0f} "
+                     f"({self.physics.steps_per_frame}/Frame) | "
                      f"Friction: {self.simulation.friction:.2f} | "
                      f"Radius: {self.simulation.max_r:.2f}")
             self.canvas.title = title
 
+    def show_level(self, level, positions):
+        """
+        Lädt die Daten der von LevelOfDetail gewählten Stufe hoch und
+        blendet den passenden Visual ein: alle Marker, nur die sichtbaren
+        Marker (Positionen und Farben) oder die Dichte-Textur.
+        """
+        lod = self.lod
+        if level == "density":
+            x, y, width, height = lod.image_rect
+            rows, columns = lod.image.shape[:2]
+            start_time = time.perf_counter()
+            self.density.set_data(lod.image)
+            self.upload_time = time.perf_counter() - start_time
+            self.density.transform.scale = (width / columns, height / rows)
+            self.density.transform.translate = (x, y)
+        elif lod.indices is not None:
+            indices = lod.indices
+            self.culled.set_colors(np.arange(len(indices)),
+                                   self.base_colors[self.particle_types[indices]])
+            self.culled.set_positions(positions[indices])
+            self.upload_time = self.culled.upload_time
+        else:
+            self.scatter.set_positions(positions)
+            self.upload_time = self.scatter.upload_time
+
+        self.density.visible = level == "density"
+        self.culled.visible = level == "markers" and lod.indices is not None
+        self.scatter.visible = level == "markers" and lod.indices is None
+
+    def _on_draw_start(self, event):
+        if self.timer.enabled:
+            self._draw_start = time.perf_counter_ns()
+
+    def _on_draw_end(self, event):
+        # Nur vollständige Zeichenvorgänge zählen (nicht die beim Einschalten)
+        if self._draw_start is not None and self.timer.enabled:
+            self.timer.record(self.timer.stage_id("draw"), self._draw_start,
+                              time.perf_counter_ns() - self._draw_start)
+        self._draw_start = None
+
+    def toggle_hud(self):
+        """Blendet das Performance-HUD ein/aus; die Zeitmessung läuft nur solange."""
+        self.hud.visible = not self.hud.visible
+        self.timer.enabled = self.hud.visible
+        if self.hud.visible:
+            self.timer.clear()
+            self.hud.text = "Messe..."
+
+    def export_trace(self, path="trace.json"):
+        """Speichert die letzten Messungen als Trace (chrome://tracing, Perfetto)."""
+        if not len(self.timer):
+            print("Keine Messungen - Performance-HUD mit 'p' einschalten")
+            return
+        self.timer.export_trace(path)
+        print(f"Trace gespeichert: {path} ({len(self.timer)} Messungen)")
+
+    def apply_type_changes(self, step):
+        """
+        Lädt die Farben aller IDs hoch, deren Typ sich bis einschließlich
+        step geändert hat (neue bzw. per Swap-Remove neu vergebene IDs).
+        Spätere Änderungen bleiben für den passenden Frame liegen.
+        """
+        changes = self.physics.type_changes
+        while True:
+            if self._pending_change is None:
+                try:
+                    self._pending_change = changes.get_nowait()
+                except queue.Empty:
+                    return
+            change_step, ids, types = self._pending_change
+            if change_step > step:
+                return
+            self.scatter.set_colors(ids, self.base_colors[types])
+            if len(ids) and ids.max() >= len(self.particle_types):
+                grown = np.zeros(max(int(ids.max()) + 1, 2 * len(self.particle_types)),
+                                 dtype=self.particle_types.dtype)
+                grown[:len(self.particle_types)] = self.particle_types
+                self.particle_types = grown
+            self.particle_types[ids] = types
+            self._pending_change = None
+
     def run(self):
         """Startet die Vispy-Applikation."""
-        app.run()
+        try:
+            app.run()
+        finally:
+            if self.physics is not None:
+                self.physics.stop()
+            if self.replay is not None:
+                self.replay.close()
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pytest
+from particle_life_simulator.analytics import (ColumnarLog, MetricsRecorder, cluster_labels,
+                                               pair_statistics, read_log)
+from particle_life_simulator.batch import expand_sweep, run_config
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _simulation(positions, types, max_r=0.1):
+    particles = ParticleSystem.from_arrays(np.asarray(positions, dtype=float),
+                                           np.zeros((len(positions), 2)),
+                                           np.asarray(types, dtype=np.int64))
+    n_types = int(np.max(types)) + 1
+    return Simulation(0.01, max_r, 0.1, 0.0, particles,
+                      Interaction.from_matrix(np.zeros((n_types, n_types))), n_threads=1)
+
+
+def _statistics(positions, types, n_cells, r_max=0.1, contact_r=0.03):
+    hist = np.zeros((2, 2, 8), dtype=np.int64)
+    contacts = np.zeros((2, 2), dtype=np.int64)
+    parent = np.arange(len(positions), dtype=np.int64)
+    pair_statistics(positions, types, r_max, contact_r, hist, contacts, parent, n_cells)
+    return hist, contacts, parent
+
+
+def test_cell_grid_matches_brute_force():
+    rng = np.random.default_rng(0)
+    positions = rng.random((300, 2))
+    types = rng.integers(0, 2, 300)
+
+    hist, contacts, parent = _statistics(positions, types, n_cells=10)
+    hist_ref, contacts_ref, parent_ref = _statistics(positions, types, n_cells=0)
+
+    np.testing.assert_array_equal(hist, hist_ref)
+    np.testing.assert_array_equal(contacts, contacts_ref)
+    np.testing.assert_array_equal(cluster_labels(parent), cluster_labels(parent_ref))
+    assert hist[1, 0].sum() == 0  # nur a <= b belegt
+
+
+def test_clusters_across_periodic_boundary():
+    positions = [[0.005, 0.5], [0.995, 0.5], [0.985, 0.51],   # über den Rand hinweg
+                 [0.5, 0.5], [0.51, 0.5], [0.52, 0.5], [0.53, 0.5],
+                 [0.25, 0.25]]                               # Einzelgänger
+    sim = _simulation(positions, [0, 1, 0, 0, 0, 1, 1, 1])
+
+    metrics, _ = MetricsRecorder(contact_r=0.02).measure(sim)
+
+    assert metrics["n_clusters"] == 2
+    assert metrics["largest_cluster"] == 4
+    assert metrics["mean_cluster_size"] == pytest.approx(3.5)
+    assert metrics["clustered_fraction"] == pytest.approx(7 / 8)
+
+
+def test_rdf_of_uniform_state_is_flat():
+    rng = np.random.default_rng(1)
+    sim = _simulation(rng.random((1000, 2)), rng.integers(0, 2, 1000))
+
+    _, rdf = MetricsRecorder(n_bins=4).measure(sim)
+
+    assert rdf.shape == (2, 2, 4)
+    np.testing.assert_allclose(rdf, 1.0, atol=0.25)
+    np.testing.assert_array_equal(rdf[0, 1], rdf[1, 0])
+
+
+def test_mixing_index():
+    rng = np.random.default_rng(2)
+    positions = rng.random((600, 2))
+    mixed = _simulation(positions, rng.integers(0, 2, 600))
+    # Typ 0 links, Typ 1 rechts: Kontakte zu anderen Typen nur an den Grenzen
+    separated = _simulation(positions, (positions[:, 0] > 0.5).astype(np.int64))
+
+    mixed_metrics, _ = MetricsRecorder().measure(mixed)
+    separated_metrics, _ = MetricsRecorder().measure(separated)
+
+    assert mixed_metrics["mixing_index"] == pytest.approx(1.0, abs=0.2)
+    assert separated_metrics["mixing_index"] < 0.2
+    assert separated_metrics["mixing_0"] < 0.2
+
+
+def test_recorder_streams_to_columnar_log(tmp_path):
+    path = str(tmp_path / "run.metrics")
+    rng = np.random.default_rng(3)
+    sim = _simulation(rng.random((150, 2)), rng.integers(0, 2, 150))
+    sim.noise_strength = 1.0
+
+    recorder = sim.enable_metrics(every=2, log_path=path, n_bins=8)
+    sim.run(10)
+    recorder.close()
+
+    log = read_log(path)
+    np.testing.assert_array_equal(log["step"], [2, 4, 6, 8, 10])
+    assert log["step"].dtype == np.int64
+    assert log["kinetic_energy"].dtype == np.float32
+    assert set(log) >= {"n_clusters", "mixing_index", "mixing_1", "rdf_peak_0_1"}
+
+    r, rdf = recorder.rdf()
+    assert r.shape == (8,) and r[-1] < 0.1
+    np.testing.assert_allclose(np.load(os.path.join(path, "rdf.npy")), rdf)
+    assert recorder.summary()["mean_kinetic_energy"] == pytest.approx(
+        np.mean(log["kinetic_energy"]), rel=1e-5)
+
+
+def test_columnar_log_buffers_rows(tmp_path):
+    path = str(tmp_path / "log")
+    log = ColumnarLog(path, {"step": np.int64, "value": np.float32}, buffer_rows=3)
+
+    for step in range(4):
+        log.append({"step": step, "value": step / 2})
+    assert len(read_log(path)["step"]) == 3  # vierte Zeile noch im Puffer
+    with pytest.raises(ValueError):
+        log.append({"step": 4})
+
+    log.close()
+    np.testing.assert_array_equal(read_log(path, mmap=False)["value"], [0.0, 0.5, 1.0, 1.5])
+
+
+def test_batch_reports_time_averaged_metrics():
+    config = expand_sweep({"base": {"n_particles": 40, "steps": 4, "seed": 0,
+                                    "metrics_every": 2}})[0]
+    metrics = run_config(config)
+
+    assert metrics["mean_n_clusters"] >= 0
+    assert "mean_mixing_index" in metrics
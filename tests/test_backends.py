@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+from particle_life_simulator import backends
+from particle_life_simulator.backends import (
+    BACKENDS,
+    NumpyBackend,
+    autotune,
+    compute_forces_numpy,
+    get_backend,
+)
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _reference_forces(positions, types, table, max_r):
+    """Referenz: alle Paare auf einmal als (N, N), direkt nach der Formel."""
+    delta = positions[None, :, :] - positions[:, None, :]
+    delta -= np.round(delta)
+    dist = np.sqrt((delta ** 2).sum(axis=2))
+    inside = (dist > 0.0) & (dist < max_r)
+    x = np.where(inside, dist, 0.0) / max_r * (table.shape[2] - 1)
+    k = np.minimum(x.astype(np.int64), table.shape[2] - 2)
+    pair_table = table[types[:, None], types[None, :]]
+    low = np.take_along_axis(pair_table, k[..., None], axis=2)[..., 0]
+    high = np.take_along_axis(pair_table, k[..., None] + 1, axis=2)[..., 0]
+    force_val = np.where(inside, low + (x - k) * (high - low), 0.0)
+    return (delta / np.where(inside, dist, 1.0)[..., None] * force_val[..., None]).sum(axis=1)
+
+
+def _scenario(name, rng):
+    """(positions, types, interaction, max_r) für die Konformitätstests."""
+    if name == "uniform":
+        n, max_r = 150, 0.1
+        positions = rng.random((n, 2))
+    elif name == "boundary":
+        # Haufen über der Ecke des Torus, dazu zwei deckungsgleiche Partikel
+        n, max_r = 80, 0.2
+        positions = (rng.normal(0.0, 0.03, (n, 2))) % 1.0
+        positions[1] = positions[0]
+    elif name == "edge":
+        # Abstand knapp unter max_r, der auf die letzte Stützstelle rundet
+        n, max_r = 2, 0.15
+        positions = np.array([[0.25, 0.5], [0.3437159732525231, 0.38287905244008497]])
+    elif name == "few":
+        n, max_r = 2, 0.3
+        positions = np.array([[0.05, 0.5], [0.95, 0.45]])
+    else:
+        n, max_r = 1, 0.1
+        positions = rng.random((1, 2))
+    types = rng.integers(0, 3, n)
+    interaction = Interaction.from_matrix(rng.uniform(-1, 1, (3, 3)), profile="classic",
+                                          core=0.2, radii=rng.uniform(0.5, 1.0, (3, 3)))
+    return positions, types, interaction, max_r
+
+
+def _simulation(backend, positions, types, interaction, max_r, noise=0.0):
+    rng = np.random.default_rng(1)
+    particles = ParticleSystem.from_arrays(positions.copy(), rng.normal(0, 0.3, positions.shape),
+                                           types)
+    return Simulation(0.01, max_r, 0.1, noise, particles, interaction, n_threads=1,
+                      backend=backend, seed=3)
+
+
+@pytest.mark.parametrize("scenario", ["uniform", "boundary", "edge", "few", "single"])
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_backend_matches_reference(backend, scenario):
+    positions, types, interaction, max_r = _scenario(scenario, np.random.default_rng(0))
+    sim = _simulation(backend, positions, types, interaction, max_r)
+
+    sim.update_accelerations()
+
+    expected = _reference_forces(positions, types, interaction.force_table(), max_r)
+    np.testing.assert_allclose(sim.particles.accelerations, expected, rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_backend_runs_like_reference(backend):
+    positions, types, interaction, max_r = _scenario("uniform", np.random.default_rng(0))
+    sim = _simulation(backend, positions, types, interaction, max_r, noise=0.5)
+    reference = _simulation("numba", positions, types, interaction, max_r, noise=0.5)
+
+    for s in (sim, reference):
+        s.step()
+        s.run(4)
+
+    assert sim.step_count == 5
+    np.testing.assert_allclose(sim.particles.positions, reference.particles.positions,
+                               rtol=0, atol=1e-10)
+    np.testing.assert_allclose(sim.particles.velocities, reference.particles.velocities,
+                               rtol=0, atol=1e-10)
+
+
+def test_numpy_tiles_are_bitwise_equal_to_numba():
+    positions, types, interaction, max_r = _scenario("uniform", np.random.default_rng(2))
+    table = interaction.force_table()
+    numba_forces = np.zeros_like(positions)
+    BACKENDS["numba"].force_kernel(None)[0](positions, types, table, max_r, numba_forces, 0)
+
+    for tile_elements in (1, 1000, 10 ** 6):  # eine Zeile, einige Zeilen, alles
+        forces = np.zeros_like(positions)
+        compute_forces_numpy(positions, types, table, max_r, forces,
+                             tile_elements=tile_elements)
+        np.testing.assert_array_equal(forces, numba_forces)
+
+    sim = _simulation(NumpyBackend(tile_elements=500), positions, types, interaction, max_r)
+    sim.update_accelerations()
+    np.testing.assert_array_equal(sim.particles.accelerations, numba_forces)
+
+
+def test_autotune_caches_winner_per_machine(tmp_path, monkeypatch):
+    path = str(tmp_path / "autotune.json")
+    calls = []
+    measure = backends.measure_backends
+
+    def counting_measure(*args, **kwargs):
+        calls.append(args)
+        return measure(*args, **kwargs)
+
+    monkeypatch.setattr(backends, "measure_backends", counting_measure)
+    best = autotune(60, 2, 0.2, ["numpy", "numba"], cache_path=path, repeats=1)
+    assert best in ("numpy", "numba") and len(calls) == 1
+
+    # Gleiche Größenordnung von N: aus dem Cache
+    assert autotune(50, 2, 0.2, ["numba", "numpy"], cache_path=path) == best
+    assert len(calls) == 1
+
+    # Andere Maschine, anderes max_r: neu messen
+    monkeypatch.setattr(backends, "machine_fingerprint", lambda: "other")
+    autotune(60, 2, 0.2, ["numpy", "numba"], cache_path=path, repeats=1)
+    autotune(60, 2, 0.25, ["numpy", "numba"], cache_path=path, repeats=1)
+    assert len(calls) == 3
+
+
+def test_simulation_auto_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv(backends.AUTOTUNE_CACHE_ENV, str(tmp_path / "autotune.json"))
+    monkeypatch.setattr(backends, "measure_backends",
+                        lambda *args, **kwargs: {"numba": 0.2, "numpy": 0.1, "cells": 0.3})
+    positions, types, interaction, max_r = _scenario("uniform", np.random.default_rng(0))
+    sim = _simulation("auto", positions, types, interaction, max_r)
+
+    sim.warmup()
+    sim.run(2)
+    path = str(tmp_path / "state.ckpt")
+    sim.save_checkpoint(path)
+
+    assert sim.resolve_backend() is BACKENDS["numpy"]
+    assert (tmp_path / "autotune.json").exists()
+    assert Simulation.from_checkpoint(path, n_threads=1).backend == "auto"
+
+
+def test_default_backend_follows_neighbor_mode():
+    positions, types, interaction, _ = _scenario("uniform", np.random.default_rng(0))
+    for neighbor_mode, name in (("brute", "numba"), ("cells", "cells"), ("verlet", "verlet")):
+        particles = ParticleSystem.from_arrays(positions.copy(), np.zeros_like(positions), types)
+        sim = Simulation(0.01, 0.1, 0.1, 0.0, particles, interaction, n_threads=1,
+                         neighbor_mode=neighbor_mode)
+        assert sim.resolve_backend().name == name
+
+    assert get_backend(BACKENDS["cells"]) is BACKENDS["cells"]
+    with pytest.raises(ValueError, match="Unbekanntes Backend"):
+        _simulation("gpu", positions, types, interaction, 0.1)
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from particle_life_simulator.batch import expand_sweep, main, run_config, run_sweep
+
+
+def _small(**overrides):
+    config = {"n_particles": 20, "steps": 3, "seed": 0}
+    config.update(overrides)
+    return config
+
+
+def test_expand_sweep_grid_and_runs():
+    spec = {
+        "base": {"n_particles": 100},
+        "runs": [{"matrix": "default"}, {"matrix": "random"}],
+        "grid": {"friction": [0.1, 0.2], "max_r": [0.1, 0.15, 0.2]},
+    }
+    configs = expand_sweep(spec)
+
+    assert len(configs) == 2 * 2 * 3
+    assert all(c["n_particles"] == 100 for c in configs)
+    assert {c["friction"] for c in configs} == {0.1, 0.2}
+    assert configs[0]["dt"] == 0.001  # Standardwert ergänzt
+
+
+def test_expand_sweep_rejects_unknown_parameter():
+    with pytest.raises(ValueError):
+        expand_sweep({"runs": [{"frictoin": 0.1}]})
+
+
+def test_run_config_metrics():
+    metrics = run_config(expand_sweep({"base": _small()})[0])
+
+    assert metrics["kinetic_energy"] >= 0.0
+    assert 0.0 < metrics["spatial_entropy"] <= 1.0
+    assert metrics["steps_per_second"] > 0
+
+
+def test_run_sweep_isolates_failures(tmp_path):
+    """Ein fehlerhafter und ein zu langer Lauf brechen den Sweep nicht ab."""
+    configs = expand_sweep({"runs": [
+        _small(),
+        _small(n_particles=0),                  # ValueError im Worker
+        _small(n_particles=400, steps=10**6),   # läuft in den Timeout
+        _small(friction=0.2),
+    ]})
+    output = tmp_path / "results.jsonl"
+
+    counts = run_sweep(configs, str(output), n_workers=2, timeout=3.0)
+
+    assert counts == {"ok": 2, "error": 1, "timeout": 1, "crashed": 0}
+    entries = [json.loads(line) for line in output.read_text().splitlines()]
+    status = {e["run_id"]: e["status"] for e in entries}
+    assert status == {0: "ok", 1: "error", 2: "timeout", 3: "ok"}
+
+
+def test_timeout_is_enforced_while_other_runs_report(tmp_path):
+    """Ein hängender Lauf wird ersetzt, auch wenn der andere Worker ständig liefert."""
+    configs = expand_sweep({"runs": [_small(n_particles=400, steps=10**6)]
+                            + [_small(n_particles=50, steps=10)] * 80})
+    output = tmp_path / "results.jsonl"
+
+    counts = run_sweep(configs, str(output), n_workers=2, timeout=2.0)
+
+    assert counts == {"ok": 80, "error": 0, "timeout": 1, "crashed": 0}
+    status = [json.loads(line)["status"] for line in output.read_text().splitlines()]
+    # Abgebrochen nach ca. 2 s, nicht erst, wenn alle anderen Läufe fertig sind
+    assert status.index("timeout") < len(status) - 20
+
+
+def test_cli(tmp_path):
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps({"base": _small(), "grid": {"friction": [0.1, 0.2]}}))
+    output = tmp_path / "out.jsonl"
+
+    assert main([str(spec), "-o", str(output), "-w", "1"]) == 0
+    assert len(output.read_text().splitlines()) == 2
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from particle_life_simulator.benchmark import (
+    compare, expand_grid, main, run_benchmarks, run_case)
+
+TINY_GRID = {"n_particles": [20], "n_types": [2], "max_r": [0.2], "kernel": ["brute", "cells"]}
+
+
+def test_expand_grid():
+    cases = expand_grid({"n_particles": [10, 20], "kernel": ["brute", "cells", "cells-parallel"]})
+    assert len(cases) == 6
+    assert cases[0] == {"n_particles": 10, "kernel": "brute"}
+
+
+def test_run_case_reports_percentiles_and_compile_time():
+    result = run_case({"n_particles": 20, "n_types": 2, "max_r": 0.2, "kernel": "cells"},
+                      steps=5, warmup_steps=1)
+
+    assert result["step_min_ms"] <= result["step_p50_ms"] <= result["step_p99_ms"]
+    assert result["compile_s"] >= 0.0
+    assert result["run_steps_per_s"] > 0
+    assert result["n_threads"] == 1
+
+
+def test_run_case_rejects_unknown_kernel():
+    with pytest.raises(ValueError):
+        run_case({"n_particles": 20, "n_types": 2, "max_r": 0.2, "kernel": "gpu"})
+
+
+def test_isolated_run_measures_in_fresh_process():
+    report = run_benchmarks({**TINY_GRID, "kernel": ["cells"]}, steps=3, warmup_steps=0,
+                            isolate=True, timeout=120)
+    (result,) = report["results"]
+    assert result["peak_rss_mb"] is None or result["peak_rss_mb"] > 0
+    assert report["options"]["isolate"]
+
+
+def _report(p50, rate):
+    case = {"n_particles": 20, "n_types": 2, "max_r": 0.2, "kernel": "brute"}
+    return {"machine": {}, "results": [{**case, "step_p50_ms": p50, "run_steps_per_s": rate}]}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    rows = compare(_report(1.0, 100.0), _report(1.05, 80.0), threshold=0.1)
+    by_metric = {row["metric"]: row for row in rows}
+
+    assert not by_metric["step_p50_ms"]["regression"]  # +5 %
+    assert by_metric["run_steps_per_s"]["regression"]  # -20 % Durchsatz
+    assert by_metric["run_steps_per_s"]["change"] == pytest.approx(-0.2)
+
+
+def test_cli_run_and_compare(tmp_path):
+    grid_path = tmp_path / "grid.json"
+    grid_path.write_text(json.dumps(TINY_GRID))
+    output = tmp_path / "bench.json"
+
+    assert main(["run", "--grid", str(grid_path), "--in-process", "--steps", "3",
+                 "-o", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert len(report["results"]) == 2
+
+    assert main(["compare", str(output), str(output)]) == 0
+
+    slower = json.loads(output.read_text())
+    for result in slower["results"]:
+        result["step_p50_ms"] *= 2
+    slower_path = tmp_path / "slower.json"
+    slower_path.write_text(json.dumps(slower))
+    assert main(["compare", str(output), str(slower_path)]) == 1
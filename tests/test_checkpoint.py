@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+from particle_life_simulator.checkpoint import read_checkpoint
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _make_simulation(integrator="semi_implicit_euler"):
+    np.random.seed(42)
+    particles = ParticleSystem(40, 4)
+    return Simulation(0.01, 0.2, 0.3, 5.0, particles, Interaction(4), integrator=integrator)
+
+
+@pytest.mark.parametrize("integrator", ["semi_implicit_euler", "verlet"])
+def test_resume_is_bit_exact(tmp_path, integrator):
+    """Fortsetzen aus dem Checkpoint == durchgehender Lauf (inkl. Noise)."""
+    path = str(tmp_path / "state.ckpt")
+
+    sim = _make_simulation(integrator)
+    sim.run(5)
+    sim.save_checkpoint(path)
+    sim.run(5)
+
+    resumed = Simulation.from_checkpoint(path)
+    assert resumed.step_count == 5
+    resumed.run(5)
+
+    assert np.array_equal(resumed.particles.positions, sim.particles.positions)
+    assert np.array_equal(resumed.particles.velocities, sim.particles.velocities)
+    assert resumed.step_count == sim.step_count == 10
+
+
+def test_restore_is_copy_on_write_memory_map(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    sim = _make_simulation()
+    sim.save_checkpoint(path)
+    saved_positions = sim.particles.positions.copy()
+
+    resumed = Simulation.from_checkpoint(path)
+    assert isinstance(resumed.particles.positions, np.memmap)
+    assert resumed.friction == sim.friction
+    assert np.array_equal(resumed.interaction.matrix, sim.interaction.matrix)
+
+    resumed.run(3)  # Änderungen dürfen nicht in die Datei durchschlagen
+    _, arrays = read_checkpoint(path)
+    assert np.array_equal(arrays["positions"], saved_positions)
+
+
+def test_periodic_checkpoints_are_atomic(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    sim = _make_simulation()
+    sim.enable_checkpoints(path, every=4)
+
+    sim.run(10, callback_every=3)
+
+    header, _ = read_checkpoint(path, mmap=False)
+    assert header["step_count"] == 8
+    assert os.listdir(tmp_path) == ["state.ckpt"]  # keine temporären Dateien
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not_a_checkpoint"
+    path.write_bytes(b"hello world, definitely not a checkpoint")
+    with pytest.raises(ValueError):
+        read_checkpoint(str(path))
+
+
+def test_force_profile_survives_checkpoint(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    np.random.seed(3)
+    interactions = Interaction(4, profile="smooth", core=0.25)
+    interactions.set_rule(0, 2, 0.7, radius=0.6)
+    sim = Simulation(0.01, 0.2, 0.3, 0.0, ParticleSystem(40, 4), interactions)
+    sim.save_checkpoint(path)
+    sim.run(3)
+
+    resumed = Simulation.from_checkpoint(path)
+    assert resumed.interaction.profile == "smooth" and resumed.interaction.core == 0.25
+    np.testing.assert_array_equal(resumed.interaction.force_table(), interactions.force_table())
+    resumed.run(3)
+    assert np.array_equal(resumed.particles.positions, sim.particles.positions)
+
+
+def test_restore_keeps_types_that_no_particle_has(tmp_path):
+    path = str(tmp_path / "state.ckpt")
+    sim = _make_simulation()
+    sim.particles.remove(np.flatnonzero(sim.particles.types == 3))
+    sim.save_checkpoint(path)
+
+    resumed = Simulation.from_checkpoint(path)
+
+    assert resumed.particles.n_types == 4
+    resumed.particles.spawn(2, 3)
+    assert (resumed.particles.types[-2:] == 3).all()
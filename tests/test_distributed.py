@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from particle_life_simulator.distributed import DistributedSimulation, slab_distance, slab_owner
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _simulation(n_particles=240, max_r=0.1, integrator="semi_implicit_euler", seed=0):
+    rng = np.random.default_rng(seed)
+    particles = ParticleSystem.from_arrays(rng.random((n_particles, 2)),
+                                           rng.normal(0, 3.0, (n_particles, 2)),
+                                           rng.integers(0, 3, n_particles))
+    return Simulation(0.01, max_r, 0.1, 0.5, particles,
+                      Interaction.from_matrix(rng.uniform(-1, 1, (3, 3))), n_threads=1,
+                      integrator=integrator, seed=seed)
+
+
+def test_slab_geometry():
+    np.testing.assert_array_equal(slab_owner([0.0, 0.24, 0.25, 0.999], 4), [0, 0, 1, 3])
+    # Streifen [0.25, 0.5): Abstand von links, von rechts und über den Rand
+    np.testing.assert_allclose(slab_distance(np.array([0.2, 0.55, 0.9]), 0.25, 0.5),
+                               [0.05, 0.05, 0.35])
+    np.testing.assert_allclose(slab_distance(np.array([0.95]), 0.0, 0.25), [0.05])
+
+
+@pytest.mark.parametrize("integrator", ["semi_implicit_euler", "euler"])
+def test_matches_single_process(integrator):
+    reference = _simulation(integrator=integrator)
+    sim = _simulation(integrator=integrator)
+    sim.run(2)
+    reference.run(2)
+
+    with DistributedSimulation(sim, n_workers=3) as distributed:
+        distributed.run(6)
+        counts = distributed.counts()
+        state = distributed.gather()
+        distributed.write_back(sim)
+    reference.run(6)
+
+    assert counts.sum() == 240
+    np.testing.assert_array_equal(state["ids"], np.arange(240))
+    assert sim.step_count == reference.step_count == 8
+    np.testing.assert_allclose(sim.particles.positions, reference.particles.positions,
+                               rtol=0, atol=1e-10)
+    np.testing.assert_allclose(sim.particles.velocities, reference.particles.velocities,
+                               rtol=0, atol=1e-10)
+
+
+def test_particles_migrate_to_owning_slab():
+    sim = _simulation()
+    sim.particles.velocities[:, 0] = 10.0  # 0.1 pro Schritt nach rechts
+
+    with DistributedSimulation(sim, n_workers=2) as distributed:
+        before = {int(i) for i in distributed._blocks[0]["ids"][:distributed.counts()[0]]}
+        distributed.run(3)
+        for rank, block in enumerate(distributed._blocks):
+            count = distributed.counts()[rank]
+            assert (slab_owner(block["positions"][:count, 0], 2) == rank).all()
+        after = {int(i) for i in distributed._blocks[0]["ids"][:distributed.counts()[0]]}
+
+    assert before != after
+
+
+def test_rejects_unsupported_setups():
+    with pytest.raises(ValueError):
+        DistributedSimulation(_simulation(max_r=0.3), n_workers=4)  # Streifen < max_r
+    with pytest.raises(ValueError):
+        DistributedSimulation(_simulation(integrator="verlet"), n_workers=2)
+
+
+def test_worker_errors_are_raised():
+    with pytest.raises(RuntimeError, match="Kapazität"):
+        DistributedSimulation(_simulation(), n_workers=2, capacity_factor=0.1)
@@ -0,0 +1,136 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+from particle_life_simulator.batch import summarize
+from particle_life_simulator.ensemble import EnsembleSimulation
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _make_simulations(n_worlds, n_particles, integrator="semi_implicit_euler"):
+    np.random.seed(0)
+    simulations = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for b in range(n_worlds):
+            interactions = Interaction.from_matrix(np.random.uniform(-1.0, 1.0, (3, 3)))
+            simulations.append(Simulation(0.01, 0.1 + 0.05 * b, 0.1 * (b + 1), 0.0,
+                                          ParticleSystem(n_particles, 3), interactions,
+                                          n_threads=1, integrator=integrator))
+    return simulations
+
+
+@pytest.mark.parametrize("integrator", ["semi_implicit_euler", "euler", "verlet"])
+@pytest.mark.parametrize("n_particles", [40, 150])  # O(N²) bzw. Zellliste
+def test_matches_individual_simulations(integrator, n_particles):
+    simulations = _make_simulations(3, n_particles, integrator)
+    ensemble = EnsembleSimulation.from_simulations(simulations)
+
+    ensemble.run(4)
+    for sim in simulations:
+        sim.run(4)
+
+    for b, sim in enumerate(simulations):
+        np.testing.assert_array_equal(ensemble.positions[b], sim.particles.positions)
+        np.testing.assert_array_equal(ensemble.velocities[b], sim.particles.velocities)
+
+
+def test_per_world_cell_decision():
+    ensemble = EnsembleSimulation.create(3, 200, 2, seed=1, max_r=[0.1, 0.2, 0.5])
+    np.testing.assert_array_equal(ensemble.cells_per_axis(), [10, 5, 0])
+
+    ensemble.neighbor_mode = "brute"
+    assert not ensemble.cells_per_axis().any()
+
+
+def test_metrics_match_batch_summary():
+    ensemble = EnsembleSimulation.create(4, 60, 3, seed=2)
+    ensemble.run(5)
+
+    metrics = ensemble.metrics()
+    for b in range(len(ensemble)):
+        expected = summarize(ensemble.world(b))
+        for key, value in expected.items():
+            assert metrics[key].shape == (4,)
+            assert metrics[key][b] == pytest.approx(value)
+
+
+def test_world_view_shares_state():
+    ensemble = EnsembleSimulation.create(2, 30, 3, seed=3)
+    sim = ensemble.world(1)
+    sim.run(2)
+    assert np.shares_memory(sim.particles.positions, ensemble.positions)
+    assert not np.array_equal(ensemble.velocities[1], 0.0)
+    assert np.array_equal(ensemble.velocities[0], np.zeros((30, 2)))
+
+
+def test_rejects_inconsistent_shapes():
+    with pytest.raises(ValueError):
+        EnsembleSimulation(np.zeros((2, 5, 2)), np.zeros((2, 4)), np.zeros((2, 3, 3)))
+    with pytest.raises(ValueError):
+        EnsembleSimulation(np.zeros((2, 5, 2)), np.zeros((2, 5)), np.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        EnsembleSimulation.create(2, 5, 3, integrator="rk4")
+
+
+def test_noise_matches_individual_simulations():
+    """Zählerbasierter Noise: parallel über Welten == Welt für Welt."""
+    ensemble = EnsembleSimulation.create(3, 40, 3, seed=4, noise_strength=2.0)
+    reference = EnsembleSimulation(ensemble.positions.copy(), ensemble.types, ensemble.matrices,
+                                   noise_strength=2.0, seeds=ensemble.seeds)
+
+    ensemble.run(5)
+    for b in range(3):
+        sim = reference.world(b)
+        for _ in range(5):
+            sim.step()
+        np.testing.assert_array_equal(ensemble.velocities[b], sim.particles.velocities)
+    assert len(set(ensemble.seeds)) == 3
+
+
+def test_force_profile_matches_individual_simulations():
+    ensemble = EnsembleSimulation.create(2, 50, 3, seed=5, profile="classic", core=0.3,
+                                         radii=np.full((3, 3), 0.8))
+    # from_simulations kopiert: Profil und Radien müssen über world() erhalten bleiben
+    expected = EnsembleSimulation.from_simulations([ensemble.world(b) for b in range(2)])
+
+    ensemble.run(3)
+    for b in range(2):
+        sim = expected.world(b)
+        for _ in range(3):
+            sim.step()
+        np.testing.assert_array_equal(ensemble.positions[b], sim.particles.positions)
+    assert expected.profile == "classic" and expected.radii.shape == (2, 3, 3)
+
+
+def test_force_tables_follow_profile_and_radii():
+    ensemble = EnsembleSimulation.create(2, 20, 3, seed=1)
+    ensemble.force_tables()
+
+    ensemble.profile, ensemble.core = "classic", 0.3
+    ensemble.radii = np.ones((2, 3, 3))
+    ensemble.radii[1, 0, 2] = 0.5
+    for b in range(2):
+        interaction = Interaction.from_matrix(ensemble.matrices[b], "classic", 0.3,
+                                              radii=ensemble.radii[b])
+        np.testing.assert_array_equal(ensemble.force_tables()[b], interaction.force_table())
+
+    ensemble.radii[0, 1, 1] = 0.7
+    expected = Interaction.from_matrix(ensemble.matrices[0], "classic", 0.3,
+                                       radii=ensemble.radii[0]).force_table()
+    np.testing.assert_array_equal(ensemble.force_tables()[0], expected)
+
+
+def test_select_continues_chosen_worlds():
+    ensemble = EnsembleSimulation.create(3, 30, 2, seed=0, noise_strength=0.5,
+                                         integrator="verlet")
+    ensemble.run(3)
+    subset = ensemble.select([2, 0])
+    ensemble.run(4)
+    subset.run(4)
+
+    assert subset.step_count == 7
+    np.testing.assert_array_equal(subset.positions, ensemble.positions[[2, 0]])
+    np.testing.assert_array_equal(subset.velocities, ensemble.velocities[[2, 0]])
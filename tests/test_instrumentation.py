@@ -0,0 +1,88 @@
+import json
+import threading
+
+import numpy as np
+from particle_life_simulator.instrumentation import StageTimer
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.physics_thread import PhysicsWorker
+from particle_life_simulator.simulation import Simulation
+
+
+def _make_simulation():
+    np.random.seed(0)
+    return Simulation(0.01, 0.2, 0.3, 0.0, ParticleSystem(30, 4), Interaction(4), n_threads=1)
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with timer.stage("forces"):
+        pass
+    assert len(timer) == 0
+    assert timer.stages == [] and timer._starts is None
+
+
+def test_ring_buffer_keeps_latest_measurements():
+    timer = StageTimer(capacity=4)
+    for i in range(6):
+        timer.record(timer.stage_id("a" if i < 5 else "b"), start_ns=i * 100, duration_ns=i)
+
+    starts, durations, stage_of, _ = timer.snapshot()
+    np.testing.assert_array_equal(starts, [200, 300, 400, 500])
+    np.testing.assert_array_equal(durations, [2, 3, 4, 5])
+    assert [timer.stages[s] for s in stage_of] == ["a", "a", "a", "b"]
+
+    summary = timer.summary()
+    assert summary["a"]["count"] == 3
+    assert summary["a"]["max_ms"] == 4e-6
+    assert "b" in timer.format_summary()
+
+
+def test_trace_export(tmp_path):
+    timer = StageTimer()
+    with timer.stage("main"):
+        thread = threading.Thread(target=lambda: timer.stage("worker").__enter__().__exit__(
+            None, None, None))
+        thread.start()
+        thread.join()
+
+    path = tmp_path / "trace.json"
+    timer.export_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+
+    assert [e["name"] for e in events] == ["main", "worker"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[0]["ts"] == 0 and events[0]["dur"] >= events[1]["dur"]
+    assert events[0]["tid"] != events[1]["tid"]
+
+
+def test_simulation_stages():
+    sim = _make_simulation()
+    timer = sim.enable_timing()
+    sim.add_observer(lambda s: None, 2)
+
+    sim.step()
+    sim.run(4)
+
+    summary = timer.summary()
+    assert {"forces", "kick", "drift", "run", "observers"} <= set(summary)
+    assert summary["run"]["count"] == 3  # Blöcke enden an den Schritten 2 und 4
+
+    sim.timer.enabled = False
+    sim.step()
+    assert timer.summary()["forces"]["count"] == summary["forces"]["count"]
+
+
+def test_worker_shares_simulation_timer():
+    sim = _make_simulation()
+    timer = sim.enable_timing()
+    worker = PhysicsWorker(sim, free_running=True).start()
+    try:
+        while "publish" not in timer.summary():
+            pass
+    finally:
+        worker.stop()
+
+    _, _, _, threads = timer.snapshot()
+    assert threading.get_ident() not in threads.tolist()
+    assert "run" in timer.summary()
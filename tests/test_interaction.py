@@ -1,6 +1,8 @@
 import pytest
 import numpy as np
-from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.forces import compute_forces
+from particle_life_simulator.interaction import (FORCE_TABLE_SIZE, Interaction,
+                                                 build_force_table, profile_force)
 
 @pytest.fixture
 def interaction():
@@ -38,3 +40,79 @@ def test_get_rule_grid(interaction):
     assert grid[0, 0] == 1.0
 
     assert grid[0, 1] == -0.9
+
+
+def test_force_table_matches_profiles():
+    rules = np.array([[1.0, -0.5], [0.3, 0.0]])
+    s = np.linspace(0.1, 0.99, 50)
+    for profile in ["linear", "classic", "smooth"]:
+        table = build_force_table(rules, profile, core=0.2)
+        assert table.shape == (2, 2, FORCE_TABLE_SIZE + 1)
+        # Kraft = Tabellenwert bei r / max_r, zwischen den Stützstellen interpoliert
+        interpolated = np.interp(s, np.linspace(0.0, 1.0, FORCE_TABLE_SIZE + 1), table[0, 1])
+        np.testing.assert_allclose(interpolated, profile_force(profile, s, -0.5, core=0.2),
+                                   atol=1e-3)
+
+
+def test_linear_table_matches_closed_form_kernel():
+    # Geschlossene Form des ursprünglichen Kernels: F = A * (1 - r / max_r) * (dx, dy) / r
+    rng = np.random.default_rng(4)
+    positions = rng.random((300, 2))
+    positions[1] = positions[0] + 1e-9  # fast deckungsgleich
+    types = rng.integers(0, 3, 300)
+    rules = rng.uniform(-1, 1, (3, 3))
+    max_r = 0.1
+
+    forces = np.zeros_like(positions)
+    compute_forces(positions, types, Interaction.from_matrix(rules).force_table(), max_r,
+                   forces, 0)
+
+    delta = positions[None, :, :] - positions[:, None, :]
+    delta -= np.round(delta)
+    dist = np.sqrt((delta ** 2).sum(axis=2))
+    inside = (dist > 0.0) & (dist < max_r)
+    safe = np.where(inside, dist, 1.0)
+    force_val = np.where(inside, rules[types[:, None], types[None, :]] * (1.0 - safe / max_r), 0.0)
+    expected = (delta / safe[..., None] * force_val[..., None]).sum(axis=1)
+    np.testing.assert_allclose(forces, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_core_repels_and_radii_limit_range():
+    positions = np.array([[0.5, 0.5], [0.51, 0.5], [0.5, 0.62]])
+    types = np.array([0, 0, 1])
+    interaction = Interaction.from_matrix(np.ones((2, 2)), profile="classic", core=0.3)
+    interaction.set_rule(0, 1, 1.0, radius=0.5)
+
+    forces = np.zeros_like(positions)
+    compute_forces(positions, types, interaction.force_table(), 0.15, forces, 0)
+
+    # Partikel 1 liegt im Kern (0.01 < 0.3 * 0.15): Abstoßung trotz Regel +1,
+    # Partikel 2 liegt außerhalb des halbierten Radius von Paar (0, 1)
+    assert forces[0, 0] < 0.0
+    assert forces[0, 1] == 0.0
+
+
+def test_set_rule_rebuilds_only_changed_pair(interaction):
+    table = interaction.force_table()
+    table[3, 3] = 42.0  # Markierung: wird nur bei vollständigem Neuaufbau überschrieben
+
+    interaction.set_rule(1, 2, -1.0)
+    assert interaction.force_table() is table
+    assert table[1, 2, -1] == 0.0 and table[1, 2, 100] < 0.0
+    assert np.all(table[3, 3] == 42.0)
+
+    interaction.matrix[2, 1] = 0.25  # direkte Änderung wird ebenfalls erkannt
+    assert interaction.force_table()[2, 1, 100] > 0.0
+    assert np.all(table[3, 3] == 42.0)
+
+    interaction.set_profile("smooth", core=0.1)
+    assert not np.all(interaction.force_table()[3, 3] == 42.0)
+
+
+def test_invalid_force_profile(interaction):
+    with pytest.raises(ValueError):
+        interaction.set_profile("cubic")
+    with pytest.raises(ValueError):
+        Interaction.from_matrix(np.zeros((2, 2)), core=1.0)
+    with pytest.raises(ValueError):
+        interaction.set_rule(0, 1, 0.5, radius=1.5)
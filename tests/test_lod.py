@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from particle_life_simulator.lod import (
+    LevelOfDetail,
+    density_histogram,
+    density_image,
+    viewport_indices,
+)
+
+COLORS = np.array([[1.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]])
+
+
+def _particles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 2)), rng.integers(0, 2, n)
+
+
+def test_viewport_indices_match_mask():
+    positions, _ = _particles(500)
+    out = np.empty(500, dtype=np.int64)
+
+    count = viewport_indices(positions, 0.2, 0.5, 0.6, 0.9, out)
+
+    inside = ((positions[:, 0] >= 0.2) & (positions[:, 0] < 0.6)
+              & (positions[:, 1] >= 0.5) & (positions[:, 1] < 0.9))
+    np.testing.assert_array_equal(out[:count], np.flatnonzero(inside))
+
+
+def test_density_histogram_matches_numpy():
+    positions, types = _particles(2000)
+    counts = np.full((2, 8, 16), 7, dtype=np.uint32)  # wird überschrieben
+
+    binned = density_histogram(positions, types, 0.25, 0.0, 0.75, 1.0, counts)
+
+    for t in range(2):
+        selected = positions[types == t]
+        expected, _, _ = np.histogram2d(selected[:, 1], selected[:, 0], bins=(8, 16),
+                                        range=((0.0, 1.0), (0.25, 0.75)))
+        np.testing.assert_array_equal(counts[t], expected)
+    assert binned == counts.sum()
+
+
+def test_density_image_mixes_type_colors():
+    counts = np.zeros((2, 1, 3), dtype=np.uint32)
+    counts[0, 0, 0] = 9               # nur Typ 0, vollster Block
+    counts[:, 0, 1] = (1, 1)          # gemischt, wenige
+    out = np.empty((1, 3, 4), dtype=np.uint8)
+
+    density_image(counts, COLORS, out)
+
+    np.testing.assert_array_equal(out[0, 0], [255, 0, 0, 255])
+    brightness = np.log1p(2) / np.log1p(9)
+    np.testing.assert_allclose(out[0, 1, :3], [127.5 * brightness, 0, 127.5 * brightness],
+                               atol=1)
+    np.testing.assert_array_equal(out[0, 2], 0)  # leer = transparent
+
+
+def test_switches_by_count_and_zoom_with_hysteresis():
+    positions, types = _particles(1000)
+    lod = LevelOfDetail(max_markers=600, max_particles_per_pixel=1.0)
+
+    # Ganze Box, 1000 sichtbar > 600
+    assert lod.update(positions, types, COLORS, (0, 0, 1, 1), (800, 800)) == "density"
+    assert lod.image.shape == (400, 400, 4) and lod.image_rect == (0, 0, 1, 1)
+
+    # Hineingezoomt: ca. 250 sichtbar, viele Pixel -> Marker, gecullt
+    assert lod.update(positions, types, COLORS, (0, 0, 0.5, 0.5), (800, 800)) == "markers"
+    assert lod.n_visible == len(lod.indices) < 300
+    assert (positions[lod.indices] < 0.5).all()
+
+    # Kleines Fenster: zu viele Partikel pro Pixel
+    assert lod.update(positions, types, COLORS, (0, 0, 0.5, 0.5), (10, 10)) == "density"
+    # Knapp unter der Schwelle bleibt es wegen der Hysterese bei der Dichte
+    assert lod.update(positions[:550], types[:550], COLORS, (0, 0, 1, 1), (800, 800)) == "density"
+    assert lod.update(positions[:450], types[:450], COLORS, (0, 0, 1, 1), (800, 800)) == "markers"
+    assert lod.indices is None  # alles sichtbar: kein Culling
+
+
+def test_fixed_modes_and_view_outside_box():
+    positions, types = _particles(100)
+    lod = LevelOfDetail("density")
+
+    # Sichtbereich ragt über die Box: Textur nur für den Teil in [0, 1)²
+    assert lod.update(positions, types, COLORS, (0.5, -0.5, 1.0, 1.0), (200, 200)) == "density"
+    assert lod.image_rect == (0.5, 0.0, 0.5, 0.5)
+    assert lod.image.shape == (50, 50, 4)
+
+    lod.mode = "markers"
+    assert lod.update(positions, types, COLORS, (2, 2, 1, 1), (200, 200)) == "markers"
+    assert lod.n_visible == 0 and len(lod.indices) == 0
+    assert lod.cycle_mode() == "density"
+    with pytest.raises(ValueError):
+        LevelOfDetail("sprites")
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from particle_life_simulator.batch import expand_sweep, run_config
+from particle_life_simulator.ensemble import EnsembleSimulation
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.neighbors import (
+    NeighborList,
+    compute_forces_list,
+    compute_forces_list_parallel,
+)
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.simulation import Simulation
+
+
+def _simulation(neighbor_mode, n_particles=200, max_r=0.1, seed=0, **kwargs):
+    rng = np.random.default_rng(seed)
+    particles = ParticleSystem.from_arrays(rng.random((n_particles, 2)),
+                                           rng.normal(0, 0.1, (n_particles, 2)),
+                                           rng.integers(0, 3, n_particles))
+    interactions = Interaction.from_matrix(rng.uniform(-1, 1, (3, 3)))
+    return Simulation(0.01, max_r, 0.1, 0.2, particles, interactions,
+                      neighbor_mode=neighbor_mode, n_threads=1, seed=seed, **kwargs)
+
+
+def test_verlet_matches_brute_force_bitwise():
+    verlet = _simulation("verlet")
+    brute = _simulation("brute")
+
+    for sim in (verlet, brute):
+        sim.step()
+        sim.run(15)
+
+    np.testing.assert_array_equal(verlet.particles.positions, brute.particles.positions)
+    np.testing.assert_array_equal(verlet.particles.accelerations, brute.particles.accelerations)
+    assert 1 <= verlet.neighbor_list.n_builds < verlet.neighbor_list.n_steps == 16
+
+
+def test_serial_and_parallel_kernels_agree():
+    sim = _simulation("verlet", n_particles=300)
+    state = sim.force_kernel()[1]
+    table = sim.force_table()
+    serial = np.zeros_like(sim.particles.positions)
+    parallel = np.zeros_like(serial)
+
+    compute_forces_list(sim.particles.positions, sim.particles.types, table, sim.max_r, serial,
+                        state)
+    compute_forces_list_parallel(sim.particles.positions, sim.particles.types, table, sim.max_r,
+                                 parallel, state)
+
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_rebuild_only_after_half_skin_displacement():
+    positions = np.random.default_rng(1).random((100, 2))
+    neighbor_list = NeighborList(skin=0.5)
+    state = neighbor_list.prepare(positions, 0.1)
+    forces = np.zeros_like(positions)
+    types = np.zeros(100, dtype=np.int64)
+    table = Interaction.from_matrix(np.ones((1, 1))).force_table()
+    assert neighbor_list.n_builds == 1
+
+    positions[3, 0] += 0.02  # < skin / 2 = 0.025
+    compute_forces_list(positions, types, table, 0.1, forces, state)
+    assert neighbor_list.n_builds == 1
+
+    positions[3, 0] += 0.01
+    compute_forces_list(positions, types, table, 0.1, forces, state)
+    assert neighbor_list.n_builds == 2
+    assert neighbor_list.rebuild_rate == 1.0  # zwei Aufbauten, zwei Schritte
+
+
+def test_overflow_falls_back_and_grows_capacity():
+    sim = _simulation("verlet", n_particles=100, max_r=0.05)
+    sim.step()
+    neighbor_list = sim.neighbor_list
+    capacity = len(neighbor_list.neighbors)
+
+    # Alle Partikel auf einen Fleck: die Liste passt nicht mehr in die Puffer
+    sim.particles.positions[:] = 0.5 + 0.001 * sim.particles.positions
+    sim.run(2)
+    assert neighbor_list.metrics()["neighbor_fallback_steps"] >= 1
+
+    sim.step()
+    assert len(neighbor_list.neighbors) > capacity
+    assert neighbor_list.n_pairs <= len(neighbor_list.neighbors)
+
+
+def test_particle_count_change_rebuilds_list():
+    sim = _simulation("verlet")
+    sim.step()
+    sim.particles.remove(np.arange(10))
+    sim.step()
+
+    assert len(sim.neighbor_list.reference) == 190
+    assert sim.neighbor_list.nbytes > 0
+
+
+def test_checkpoint_and_ensemble(tmp_path):
+    sim = _simulation("verlet", neighbor_skin=0.5)
+    sim.run(5)
+    path = str(tmp_path / "state.ckpt")
+    sim.save_checkpoint(path)
+    restored = Simulation.from_checkpoint(path, n_threads=1)
+    sim.run(5)
+    restored.run(5)
+
+    assert restored.neighbor_skin == 0.5
+    np.testing.assert_array_equal(sim.particles.positions, restored.particles.positions)
+    with pytest.raises(ValueError):
+        EnsembleSimulation.create(2, 10, 2, neighbor_mode="verlet")
+
+
+def test_batch_reports_neighbor_metrics():
+    config = expand_sweep({"base": {"n_particles": 40, "steps": 4, "seed": 0,
+                                    "neighbor_mode": "verlet"}})[0]
+    metrics = run_config(config)
+
+    assert metrics["neighbor_steps"] == 4
+    assert 0 < metrics["neighbor_rebuild_rate"] <= 1
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("vispy")
+from particle_life_simulator.particle_visual import (  # noqa: E402
+    BASE_COLORS,
+    ParticleVisual,
+    type_colors,
+)
+
+
+def test_set_positions_streams_float32_into_same_buffer():
+    colors = np.random.rand(50, 4)
+    visual = ParticleVisual(colors, size=6)
+    buffer = visual._positions
+
+    positions = np.random.rand(50, 2)
+    visual.set_positions(positions)
+    visual.set_positions(positions * 0.5)
+
+    assert visual._positions is buffer
+    assert buffer.nbytes == 50 * 2 * 4
+    np.testing.assert_array_equal(visual._staging, (positions * 0.5).astype(np.float32))
+    assert visual.upload_time >= 0.0
+
+
+def test_static_attributes_are_uploaded_once():
+    visual = ParticleVisual(np.random.rand(10, 4), size=np.arange(10))
+    color_buffer = visual.shared_program["a_color"]
+    visual.set_positions(np.zeros((10, 2)))
+    assert visual.shared_program["a_color"] is color_buffer
+    assert visual.n_particles == 10
+
+
+def test_count_and_colors_update_incrementally():
+    visual = ParticleVisual(np.random.rand(10, 4), size=5, capacity=16)
+    visual.set_positions(np.random.rand(4, 2))
+    assert visual.n_particles == 4
+    assert np.all(visual._sizes[:4] == 5) and np.all(visual._sizes[4:] == 0)
+
+    visual.set_colors(np.array([2, 5]), np.ones((2, 4)))
+    np.testing.assert_array_equal(visual._colors[[2, 5]], np.ones((2, 4)))
+
+    # Mehr Partikel als Kapazität: Buffer wachsen, Farben bleiben erhalten
+    visual.set_positions(np.random.rand(20, 2))
+    assert visual.capacity >= 20 and visual.n_particles == 20
+    np.testing.assert_array_equal(visual._colors[5], np.ones(4))
+
+
+def test_type_colors_cover_all_types():
+    np.testing.assert_array_equal(type_colors(3), BASE_COLORS[:3])
+
+    colors = type_colors(9)
+    assert colors.shape == (9, 4)
+    np.testing.assert_array_equal(colors[:4], BASE_COLORS)
+    assert len(np.unique(colors[:, :3], axis=0)) == 9
+    assert ((colors >= 0.0) & (colors <= 1.0)).all()
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from particle_life_simulator.particles import ParticleSystem
 
 def test_initialization_shapes():
@@ -46,3 +47,91 @@ def test_getters():
 
     assert np.array_equal(system.get_positions(), system.positions)
     assert np.array_equal(system.get_types(), system.types)
+
+
+def test_float32_soa_layout():
+    """float32 + SoA: x und y liegen jeweils zusammenhängend im Speicher."""
+    system = ParticleSystem(10, 3, dtype=np.float32, types_dtype=np.uint8, layout="soa")
+
+    assert system.positions.shape == (10, 2)
+    assert system.positions.dtype == np.float32
+    assert system.types.dtype == np.uint8
+    assert system.x.flags.c_contiguous and system.y.flags.c_contiguous
+    assert system.accelerations.flags.f_contiguous
+
+
+def test_types_must_fit_dtype():
+    with pytest.raises(ValueError):
+        ParticleSystem(10, 300, types_dtype=np.uint8)
+    with pytest.raises(ValueError):
+        ParticleSystem(10, 2, layout="columns")
+
+
+def test_accelerations_are_allocated_lazily():
+    system = ParticleSystem(10, 2)
+    before = system.nbytes
+    assert system._accelerations is None
+
+    system.accelerations
+    assert system.nbytes == before + 10 * 2 * 8
+
+
+def test_astype_keeps_state():
+    np.random.seed(0)
+    system = ParticleSystem(10, 2)
+    converted = system.astype(np.float32, np.uint8, "soa")
+
+    np.testing.assert_allclose(converted.positions, system.positions, rtol=1e-7)
+    np.testing.assert_array_equal(converted.types, system.types)
+    assert converted.layout == "soa" and converted.n_types == 2
+
+
+def test_spawn_grows_capacity_and_assigns_new_ids():
+    system = ParticleSystem(10, 3, capacity=12)
+    system.pop_changes()
+
+    ids = system.spawn(5, particle_type=2, region=(0.2, 0.2, 0.3, 0.3))
+
+    np.testing.assert_array_equal(ids, np.arange(10, 15))
+    assert system.n_particles == 15 and system.capacity >= 15
+    assert system.positions.shape == (15, 2) and system.types.shape == (15,)
+    assert np.all(system.types[10:] == 2)
+    assert np.all((system.positions[10:] >= 0.2) & (system.positions[10:] <= 0.3))
+    assert np.all(system.velocities[10:] == 0.0)
+
+    changed, types = system.pop_changes()
+    np.testing.assert_array_equal(changed, ids)
+    np.testing.assert_array_equal(types, [2] * 5)
+
+
+def test_remove_swaps_tail_into_holes():
+    system = ParticleSystem(6, 3)
+    positions, types = system.positions.copy(), system.types.copy()
+    system.pop_changes()
+
+    system.remove([1, 4])
+
+    assert system.n_particles == 4
+    # Slot 1 bekommt den letzten Überlebenden (Slot 5), Slot 4 fällt weg
+    np.testing.assert_array_equal(system.positions, positions[[0, 5, 2, 3]])
+    np.testing.assert_array_equal(system.types, types[[0, 5, 2, 3]])
+    changed, _ = system.pop_changes()
+    np.testing.assert_array_equal(changed, [1])
+
+
+def test_remove_keeps_ids_dense_after_reordering():
+    np.random.seed(1)
+    system = ParticleSystem(8, 3)
+    system.permute(np.random.permutation(8))
+    positions_by_id = system.by_id(system.positions).copy()
+
+    system.remove([0, 3, 7])
+
+    assert sorted(system.ids) == list(range(5))
+    np.testing.assert_array_equal(system.slot_of(system.ids), np.arange(5))
+    # Jede Position stammt von genau einem überlebenden Partikel
+    survivors = {tuple(p) for p in positions_by_id}
+    assert {tuple(p) for p in system.by_id(system.positions)} <= survivors
+
+    system.spawn(2)
+    np.testing.assert_array_equal(system.ids[5:], [5, 6])
@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+import pytest
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.physics_thread import PhysicsWorker, TripleBuffer
+from particle_life_simulator.simulation import Simulation
+
+
+def _make_simulation():
+    np.random.seed(0)
+    return Simulation(0.01, 0.2, 0.3, 0.0, ParticleSystem(30, 4), Interaction(4))
+
+
+def _next_frame(worker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        positions, step, fresh = worker.latest_positions()
+        if fresh:
+            return positions, step
+        time.sleep(0.001)
+    raise AssertionError("Kein neuer Frame vom Physik-Thread")
+
+
+def test_triple_buffer_swaps_without_copy():
+    buffer = TripleBuffer(np.zeros((3, 2)))
+    arrays = {id(a) for a in buffer._buffers}
+
+    front, _, fresh = buffer.acquire()
+    assert not fresh
+
+    back = buffer.back
+    back[:] = 1.0
+    buffer.publish(step=7)
+    front, step, fresh = buffer.acquire()
+    assert fresh and step == 7
+    assert front is back
+    assert id(buffer.back) in arrays and buffer.back is not front
+
+    # Ohne neuen publish() bleibt der vordere Puffer stehen
+    again, _, fresh = buffer.acquire()
+    assert again is front and not fresh
+
+
+def test_worker_runs_steps_per_frame_in_lockstep():
+    sim = _make_simulation()
+    worker = PhysicsWorker(sim, steps_per_frame=3).start()
+    try:
+        steps = [_next_frame(worker)[1] for _ in range(3)]
+    finally:
+        worker.stop()
+    assert steps == [3, 6, 9]
+
+
+def test_published_positions_match_serial_run():
+    worker_sim = _make_simulation()
+    worker = PhysicsWorker(worker_sim, steps_per_frame=4).start()
+    try:
+        positions, step = _next_frame(worker)
+        positions = positions.copy()
+    finally:
+        worker.stop()
+
+    reference = _make_simulation()
+    reference.run(step)
+    np.testing.assert_array_equal(positions, reference.particles.positions)
+
+
+def test_parameter_changes_are_applied_between_steps():
+    sim = _make_simulation()
+    worker = PhysicsWorker(sim, steps_per_frame=1).start()
+    try:
+        _next_frame(worker)
+        worker.set_param("friction", 0.9)
+        worker.submit(lambda s: setattr(s.interaction, "matrix", np.zeros((4, 4))))
+        _next_frame(worker)
+        _next_frame(worker)
+        assert sim.friction == 0.9
+        assert not sim.interaction.matrix.any()
+    finally:
+        worker.stop()
+
+
+def test_worker_error_surfaces_on_next_frame():
+    def fail(sim):
+        raise ValueError("kaputt")
+
+    worker = PhysicsWorker(_make_simulation(), steps_per_frame=1, free_running=True).start()
+    _next_frame(worker)
+    worker.submit(fail)
+    worker._thread.join(timeout=5.0)
+
+    with pytest.raises(RuntimeError, match="Physik-Thread") as info:
+        worker.latest_positions()
+    assert isinstance(info.value.__cause__, ValueError)
+    with pytest.raises(RuntimeError):
+        worker.stop()
+
+
+def test_pause_stops_publishing():
+    sim = _make_simulation()
+    worker = PhysicsWorker(sim, steps_per_frame=1, free_running=True).start()
+    try:
+        _next_frame(worker)
+        worker.pause()
+        time.sleep(0.05)
+        count = sim.step_count
+        time.sleep(0.05)
+        assert sim.step_count == count
+        worker.resume()
+        _next_frame(worker)
+    finally:
+        worker.stop()
+
+
+def test_spawn_publishes_new_count_and_type_changes():
+    sim = _make_simulation()
+    worker = PhysicsWorker(sim, steps_per_frame=1).start()
+    try:
+        _next_frame(worker)
+        worker.submit(lambda s: s.particles.spawn(40, particle_type=1))
+        positions, step = _next_frame(worker)
+        while len(positions) != 70:
+            positions, step = _next_frame(worker)
+    finally:
+        worker.stop()
+
+    change_step, ids, types = worker.type_changes.get_nowait()
+    assert change_step <= step
+    np.testing.assert_array_equal(ids, np.arange(30, 70))
+    assert np.all(types == 1)
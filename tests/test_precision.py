@@ -0,0 +1,18 @@
+import numpy as np
+from particle_life_simulator.precision import drift_report, format_report, position_error
+
+
+def test_position_error_is_periodic():
+    reference = np.array([[0.99, 0.5], [0.2, 0.2]])
+    positions = np.array([[0.01, 0.5], [0.2, 0.25]])
+    np.testing.assert_allclose(position_error(positions, reference), [0.02, 0.05])
+
+
+def test_drift_report_float64_soa_is_exact_and_float32_is_close():
+    report = drift_report(n_particles=40, n_steps=6, sample_every=3)
+
+    assert report["steps"] == [3, 6]
+    assert report["modes"]["float64-soa"]["max_error"] == [0.0, 0.0]
+    assert 0.0 < report["modes"]["float32"]["max_error"][-1] < 1e-4
+    assert report["modes"]["float32"]["nbytes"] < report["reference_nbytes"]
+    assert "float32-soa" in format_report(report)
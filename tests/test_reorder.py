@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.reorder import (
+    SpatialReorderer, cell_keys, morton_keys, spatial_order)
+from particle_life_simulator.simulation import Simulation
+
+
+def _make_simulation(n=60, seed=0):
+    np.random.seed(seed)
+    particles = ParticleSystem(n, 3)
+    particles.velocities[:] = np.random.uniform(-0.5, 0.5, (n, 2))
+    interactions = Interaction.from_matrix(np.random.uniform(-1.0, 1.0, (3, 3)))
+    return Simulation(0.01, 0.2, 0.1, 0.0, particles, interactions, neighbor_mode="cells")
+
+
+def test_morton_keys_follow_z_order():
+    positions = np.array([[0.1, 0.1], [0.1, 0.9], [0.9, 0.1], [0.9, 0.9]])
+    keys = morton_keys(positions)
+    assert list(np.argsort(keys)) == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("order", ["cells", "morton"])
+def test_spatial_order_sorts_by_cell(order):
+    positions = np.random.default_rng(1).random((200, 2))
+    sorted_keys = cell_keys(positions[spatial_order(positions, "cells", 4)], 4)
+    assert np.all(np.diff(sorted_keys) >= 0)
+    assert sorted(spatial_order(positions, order, 4)) == list(range(200))
+
+
+def test_permute_keeps_ids_stable():
+    sim = _make_simulation()
+    particles = sim.particles
+    positions, types = particles.positions.copy(), particles.types.copy()
+    array_before = particles.positions
+
+    SpatialReorderer().reorder(sim)
+
+    assert np.shares_memory(particles.positions, array_before)  # in-place
+    assert not np.array_equal(particles.positions, positions)
+    np.testing.assert_array_equal(particles.by_id(particles.positions), positions)
+    np.testing.assert_array_equal(particles.by_id(particles.types), types)
+    np.testing.assert_array_equal(particles.positions, positions[particles.ids])
+
+
+def test_reordered_run_matches_unordered_run():
+    """Nur die Summationsreihenfolge ändert sich, nicht die Physik."""
+    plain = _make_simulation(seed=2)
+    sorted_sim = _make_simulation(seed=2)
+    sorted_sim.enable_reordering(check_every=2, max_travel=0.0)
+
+    plain.run(10)
+    sorted_sim.run(10)
+
+    particles = sorted_sim.particles
+    np.testing.assert_allclose(particles.by_id(particles.positions), plain.particles.positions,
+                               rtol=0, atol=1e-12)
+
+
+def test_reorder_interval_adapts_to_speed():
+    fast = _make_simulation(seed=3)
+    slow = _make_simulation(seed=3)
+    slow.particles.velocities[:] *= 0.01
+    fast.friction = slow.friction = 0.0
+    fast.interaction.matrix[:] = slow.interaction.matrix[:] = 0.0
+
+    fast_reorderer = fast.enable_reordering(check_every=2, max_travel=0.5)
+    slow_reorderer = slow.enable_reordering(check_every=2, max_travel=0.5)
+    fast.run(40)
+    slow.run(40)
+
+    assert fast_reorderer.n_reorders > slow_reorderer.n_reorders
+    assert slow_reorderer.n_reorders == 1  # nur die initiale Sortierung
+
+
+def test_checkpoint_keeps_ids(tmp_path):
+    sim = _make_simulation(seed=4)
+    sim.enable_reordering()
+    path = str(tmp_path / "state.ckpt")
+    sim.save_checkpoint(path)
+
+    resumed = Simulation.from_checkpoint(path, mmap=False)
+    np.testing.assert_array_equal(resumed.particles.ids, sim.particles.ids)
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pytest
+from particle_life_simulator.replay import FrameRingBuffer, ReplayPlayer
+from particle_life_simulator.trajectory import TrajectoryReader, TrajectoryWriter
+
+
+@pytest.fixture
+def reader(tmp_path):
+    path = str(tmp_path / "run.traj")
+    with TrajectoryWriter(path, np.arange(5) % 2, chunk_size=4) as writer:
+        for step in range(10):
+            writer.append(np.full((5, 2), step / 10), np.zeros((5, 2)), step=step)
+    return TrajectoryReader(path)
+
+
+def test_next_frame_never_blocks_and_plays_in_order(reader):
+    player = ReplayPlayer(reader, prefetch=4, loop=False)
+    try:
+        steps = []
+        deadline = time.monotonic() + 5.0
+        while len(steps) < 10 and time.monotonic() < deadline:
+            frame = player.next_frame()
+            if frame is not None and (not steps or frame.step != steps[-1]):
+                steps.append(frame.step)
+            time.sleep(0.005)
+        assert steps == list(range(10))
+    finally:
+        player.close()
+
+
+def test_prefetched_frames_are_in_memory(reader):
+    assert isinstance(reader[0].positions, np.memmap)
+    player = ReplayPlayer(reader, prefetch=4, loop=False)
+    try:
+        frame = _wait_for(player, 0)
+        with player._cond:
+            cached = list(player._cache.values())
+    finally:
+        player.close()
+    assert cached and frame.positions.base is None
+    assert not any(isinstance(f.positions, np.memmap) or isinstance(f.velocities, np.memmap)
+                   for f in cached)
+
+
+def test_seek_speed_and_pause(reader):
+    player = ReplayPlayer(reader, prefetch=4, loop=True)
+    try:
+        player.seek(6)
+        player.set_speed(3)
+        frame = _wait_for(player, 6)
+        assert frame.step == 6
+        assert player.index == 9  # 6 + 3, Frames 7 und 8 übersprungen
+
+        assert _wait_for(player, 9).step == 9
+        assert player.index == 2  # (9 + 3) % 10, Endlosschleife
+
+        player.toggle_pause()
+        assert _wait_for(player, 2).step == 2
+        assert player.index == 2
+
+        player.scrub(-1)
+        assert player.index == 1
+    finally:
+        player.close()
+
+
+def _wait_for(player, index, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        frame = player.next_frame()
+        if frame is not None and frame.step == index:
+            return frame
+        time.sleep(0.005)
+    raise TimeoutError(f"Frame {index} nicht geladen")
+
+
+def test_ring_buffer_live_follow():
+    buffer = FrameRingBuffer(3, types=np.zeros(4, dtype=int))
+    player = ReplayPlayer(buffer)
+    assert player.next_frame() is None
+
+    for step in range(5):
+        buffer.append(np.full((4, 2), step), np.zeros((4, 2)), step=step)
+    assert len(buffer) == 3
+    assert buffer[0].step == 2  # älteste noch vorhandene
+
+    assert player.next_frame().step == 4
+    buffer.append(np.zeros((4, 2)), np.zeros((4, 2)), step=5)
+    assert player.next_frame().step == 5
+
+    player.seek(0)  # zurückspulen beendet das Verfolgen
+    assert player.next_frame().step == 3
+    assert player.next_frame().step == 4
@@ -0,0 +1,57 @@
+import numpy as np
+from particle_life_simulator.interaction import Interaction
+from particle_life_simulator.particles import ParticleSystem
+from particle_life_simulator.rng import counter_uniform, derive_seeds, resolve_seed
+
+
+def test_counter_uniform_is_a_pure_function_of_its_key():
+    values = [counter_uniform(7, step, particle, component)
+              for step in range(20) for particle in range(50) for component in (0, 1)]
+
+    assert values == [counter_uniform(7, step, particle, component)
+                      for step in range(20) for particle in range(50) for component in (0, 1)]
+    assert all(0.0 <= v < 1.0 for v in values)
+    assert len(set(values)) == len(values)
+    assert abs(np.mean(values) - 0.5) < 0.05
+    assert counter_uniform(8, 0, 0, 0) != counter_uniform(7, 0, 0, 0)
+    assert counter_uniform(0, 0, 0, 0) != 0.0
+
+
+def test_large_keys_use_all_bits():
+    assert counter_uniform(1, 2**40, 0, 0) != counter_uniform(1, 0, 0, 0)
+    assert counter_uniform(2**62, 0, 0, 0) != counter_uniform(0, 0, 0, 0)
+    assert counter_uniform(1, 0, np.int64(2**33), 0) != counter_uniform(1, 0, 0, 0)
+
+
+def test_resolve_seed_follows_global_seed():
+    np.random.seed(4)
+    first = resolve_seed()
+    np.random.seed(4)
+    assert resolve_seed() == first
+    assert resolve_seed(12) == 12
+
+
+def test_derived_seeds_are_independent_and_stable():
+    seeds = derive_seeds(3, 3)
+    assert seeds == derive_seeds(3, 3)
+    assert len(set(seeds)) == 3 and all(0 <= s < 2**63 for s in seeds)
+    assert derive_seeds(None, 2) == [None, None]
+
+
+def test_seeded_systems_do_not_touch_global_rng():
+    np.random.seed(0)
+    expected = np.random.rand()
+
+    np.random.seed(0)
+    a = ParticleSystem(20, 3, seed=5)
+    b = ParticleSystem(20, 3, seed=5)
+    rules_a, rules_b = Interaction(3, seed=1), Interaction(3, seed=1)
+    rules_a.randomize()
+    rules_b.randomize()
+    assert np.random.rand() == expected
+
+    np.testing.assert_array_equal(a.positions, b.positions)
+    np.testing.assert_array_equal(a.types, b.types)
+    np.testing.assert_array_equal(rules_a.matrix, rules_b.matrix)
+    np.testing.assert_array_equal(a.spawn(3), b.spawn(3))
+    np.testing.assert_array_equal(a.positions, b.positions)
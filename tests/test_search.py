@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pytest
+from particle_life_simulator import main as gui_main
+from particle_life_simulator import search as search_cli
+from particle_life_simulator.search import MatrixSearch, halving_schedule, matrix_key
+
+
+def _search(**kwargs):
+    return MatrixSearch(n_types=3, population=8, n_particles=40, steps=20, rungs=3, seed=0,
+                        max_r=0.3, dt=0.01, **kwargs)
+
+
+def test_halving_schedule():
+    assert halving_schedule(800, 3, 2) == [200, 400, 800]
+    assert halving_schedule(90, 3, 3) == [10, 30, 90]
+    assert halving_schedule(50, 1, 2) == [50]
+
+
+def test_successive_halving_cuts_candidates():
+    search = _search()
+    matrices = search.initial_population()
+
+    rungs, scores = search.evaluate(matrices)
+
+    # 8 -> 4 -> 2: vier enden nach Stufe 0, zwei nach Stufe 1, zwei laufen voll
+    np.testing.assert_array_equal(np.bincount(rungs, minlength=3), [4, 2, 2])
+    assert search.n_simulated == 8
+    assert np.isfinite(scores).all()
+
+
+def test_cache_skips_known_matrices(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    search = _search(cache_path=path)
+    matrices = search.initial_population()
+    matrices[1] = matrices[0]  # Duplikat innerhalb der Generation
+
+    rungs, scores = search.evaluate(matrices)
+    assert search.n_simulated == 7
+    assert rungs[0] == rungs[1] and scores[0] == scores[1]
+
+    again = search.evaluate(matrices)
+    assert search.n_simulated == 0
+    np.testing.assert_array_equal(again[1], scores)
+
+    reloaded = _search(cache_path=path)
+    reloaded.evaluate(matrices)
+    assert reloaded.n_simulated == 0
+    # Andere Bewertungs-Konfiguration -> anderer Schlüssel
+    assert matrix_key(matrices[0], reloaded.context) != matrix_key(matrices[0], {})
+
+
+def test_evolution_keeps_elite():
+    search = _search(elite=2)
+    history = []
+
+    best, score = search.run(2, callback=history.append)
+
+    assert [entry["generation"] for entry in history] == [0, 1]
+    assert history[1]["n_cached"] >= 2  # Elite wird nicht erneut simuliert
+    assert best.shape == (3, 3) and np.abs(best).max() <= 1.0
+    assert score == search.best_fitness >= history[0]["best_fitness"]
+
+
+def test_cli_handles_generations_without_result(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "best.json"
+    with pytest.raises(SystemExit):
+        search_cli.main(["-g", "0", "-o", str(path)])
+
+    def run_without_result(self, generations, callback=None):
+        callback({"generation": 0, "best_fitness": None, "mean_fitness": None,
+                  "n_simulated": 0, "n_cached": 0})
+        return None, self.best_fitness
+
+    monkeypatch.setattr(MatrixSearch, "run", run_without_result)
+    assert search_cli.main(["-g", "1", "-o", str(path)]) == 1
+    assert "beste -, Mittel -" in capsys.readouterr().out
+    assert not path.exists()
+
+
+def test_gui_loads_matrix_written_by_search(tmp_path):
+    visualisation = pytest.importorskip("particle_life_simulator.visualisation")
+    path = str(tmp_path / "best.json")
+    search_cli.main(["-g", "1", "-p", "3", "-t", "5", "-n", "20", "--steps", "4", "--rungs", "1",
+                     "--seed", "0", "-o", path])
+    with open(path, encoding="utf-8") as f:
+        matrix = json.load(f)["matrix"]
+
+    shown = []
+
+    class FakeVisualizer:
+        def __init__(self, simulation, **kwargs):
+            shown.append(simulation)
+
+        def run(self):
+            pass
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(visualisation, "Visualizer", FakeVisualizer)
+        gui_main.main(["--matrix", path, "--backend", "numpy"])
+
+    sim, = shown
+    assert sim.particles.n_types == 5 and sim.step_count == 1
+    np.testing.assert_array_equal(sim.interaction.matrix, matrix)
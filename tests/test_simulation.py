@@ -1,5 +1,20 @@
 import numpy as np
 import pytest
+from particle_life_simulator.forces import (
+    compute_forces,
+    compute_forces_cells,
+    compute_forces_cells_parallel,
+    compute_forces_parallel,
+)
+from particle_life_simulator.forces import select_force_kernel
+from particle_life_simulator.integrators import (
+    VelocityVerletIntegrator,
+    _state_args,
+    fused_kernel,
+    run_semi_implicit_euler,
+)
+from particle_life_simulator.interaction import Interaction, build_force_table
+from particle_life_simulator.particles import ParticleSystem
 from particle_life_simulator.simulation import Simulation
 
 class SimpleParticleMock:
@@ -64,3 +79,271 @@ def test_simulation_wrapper_methods(basic_simulation):
     sim.update_positions()
     
     assert not np.array_equal(sim.particles.positions, old_pos)
+
+
+def _random_state(n, n_types, seed):
+    rng = np.random.default_rng(seed)
+    particles = SimpleParticleMock(rng.random((n, 2)), rng.integers(0, n_types, n))
+    interaction = SimpleInteractionMock(rule_value=0.0)
+    interaction.matrix = rng.uniform(-1.0, 1.0, (n_types, n_types))
+    return particles, interaction
+
+
+def test_cell_list_matches_brute_force():
+    """Zellliste und O(N²)-Kernel müssen dieselben Kräfte liefern."""
+    p_brute, inter = _random_state(150, 4, seed=1)
+    p_cells, _ = _random_state(150, 4, seed=1)
+
+    brute = Simulation(0.01, 0.15, 0.1, 0.0, p_brute, inter, neighbor_mode="brute")
+    cells = Simulation(0.01, 0.15, 0.1, 0.0, p_cells, inter, neighbor_mode="cells")
+
+    for _ in range(3):
+        brute.step()
+        cells.step()
+
+    assert np.allclose(p_brute.velocities, p_cells.velocities, atol=1e-12)
+    assert np.allclose(p_brute.positions, p_cells.positions, atol=1e-12)
+
+
+def test_neighbor_mode_auto_selection(basic_simulation):
+    """'auto' nutzt die Zellliste nur, wenn sie sich lohnt und gültig ist."""
+    sim = basic_simulation
+    sim.max_r = 0.15
+    assert not sim.uses_cell_list()  # nur 2 Partikel
+
+    particles, inter = _random_state(500, 4, seed=2)
+    sim = Simulation(0.01, 0.15, 0.1, 0.0, particles, inter)
+    assert sim.uses_cell_list()
+
+    sim.max_r = 0.4  # weniger als 3 Zellen pro Achse
+    assert not sim.uses_cell_list()
+
+
+def test_invalid_neighbor_mode():
+    particles, inter = _random_state(10, 4, seed=3)
+    with pytest.raises(ValueError):
+        Simulation(0.01, 0.15, 0.1, 0.0, particles, inter, neighbor_mode="octree")
+
+
+@pytest.mark.parametrize("kernels", [
+    (compute_forces, compute_forces_parallel, 0),
+    (compute_forces_cells, compute_forces_cells_parallel, 6),
+])
+def test_parallel_forces_match_serial_bitwise(kernels):
+    """Paralleler Kraft-Kernel == serieller Kraft-Kernel, bitgenau."""
+    serial_kernel, parallel_kernel, n_cells = kernels
+    particles, inter = _random_state(150, 4, seed=4)
+
+    forces_serial = np.empty_like(particles.positions)
+    forces_parallel = np.empty_like(particles.positions)
+    table = build_force_table(inter.matrix)
+    serial_kernel(particles.positions, particles.types, table, 0.15, forces_serial,
+                  n_cells)
+    parallel_kernel(particles.positions, particles.types, table, 0.15,
+                    forces_parallel, n_cells)
+
+    assert np.array_equal(forces_serial, forces_parallel)
+
+
+def test_n_threads_validation(basic_simulation):
+    sim = basic_simulation
+    assert sim.n_threads >= 1
+
+    sim.n_threads = 1
+    assert sim.n_threads == 1
+
+    with pytest.raises(ValueError):
+        sim.n_threads = 0
+
+
+def test_update_accelerations_fills_particle_accelerations(basic_simulation):
+    """Die Kraftphase schreibt nach particles.accelerations, ohne zu integrieren."""
+    sim = basic_simulation
+    old_pos = sim.particles.positions.copy()
+
+    sim.update_accelerations()
+
+    assert sim.particles.accelerations[0, 0] > 0
+    assert sim.particles.accelerations[1, 0] < 0
+    assert np.all(sim.particles.velocities == 0.0)
+    assert np.array_equal(sim.particles.positions, old_pos)
+
+
+def test_explicit_euler_uses_old_velocity(basic_simulation):
+    """Explizites Euler: Im ersten Schritt (v = 0) bewegen sich die Partikel nicht."""
+    sim = basic_simulation
+    sim.integrator = "euler"
+    old_pos = sim.particles.positions.copy()
+
+    sim.step()
+
+    assert np.array_equal(sim.particles.positions, old_pos)
+    assert sim.particles.velocities[0, 0] > 0
+
+
+@pytest.mark.parametrize("integrator", ["euler", "semi_implicit_euler", "verlet"])
+def test_integrators_agree_for_small_dt(integrator):
+    """Alle Integratoren konvergieren für kleines dt gegen dieselbe Bahn."""
+    ref_particles, inter = _random_state(40, 4, seed=5)
+    particles, _ = _random_state(40, 4, seed=5)
+
+    reference = Simulation(1e-4, 0.3, 0.5, 0.0, ref_particles, inter,
+                           integrator="semi_implicit_euler")
+    sim = Simulation(1e-4, 0.3, 0.5, 0.0, particles, inter, integrator=integrator)
+    for _ in range(5):
+        reference.step()
+        sim.step()
+
+    assert np.allclose(particles.positions, ref_particles.positions, atol=1e-6)
+
+
+def test_integrator_selection():
+    particles, inter = _random_state(10, 4, seed=6)
+    sim = Simulation(0.01, 0.15, 0.1, 0.0, particles, inter, integrator="verlet")
+    assert isinstance(sim.integrator, VelocityVerletIntegrator)
+
+    with pytest.raises(ValueError):
+        sim.integrator = "runge_kutta"
+
+
+@pytest.mark.parametrize("integrator", ["euler", "semi_implicit_euler", "verlet"])
+def test_run_matches_step_loop(integrator):
+    """run() mit fusioniertem Kernel == step() in einer Python-Schleife."""
+    p_loop, inter = _random_state(60, 4, seed=7)
+    p_run, _ = _random_state(60, 4, seed=7)
+
+    looped = Simulation(0.01, 0.2, 0.1, 0.0, p_loop, inter, integrator=integrator)
+    fused = Simulation(0.01, 0.2, 0.1, 0.0, p_run, inter, integrator=integrator)
+    for _ in range(6):
+        looped.step()
+    fused.run(6)
+
+    assert np.array_equal(p_loop.positions, p_run.positions)
+    assert np.array_equal(p_loop.velocities, p_run.velocities)
+    assert looped.step_count == fused.step_count == 6
+
+
+def test_run_callback_every(basic_simulation):
+    """Der Callback kommt nur an Blockgrenzen, der letzte Block darf kürzer sein."""
+    sim = basic_simulation
+    seen = []
+
+    sim.run(7, callback=lambda s: seen.append(s.step_count), callback_every=3)
+
+    assert seen == [3, 6, 7]
+    assert np.all((sim.particles.positions >= 0.0) & (sim.particles.positions < 1.0))
+
+
+def test_observers_split_run_blocks(basic_simulation):
+    """Beobachter werden genau an Vielfachen ihres Intervalls aufgerufen."""
+    sim = basic_simulation
+    seen = []
+    sim.add_observer(lambda s: seen.append(s.step_count), every=4)
+
+    sim.run(10, callback_every=3)
+    sim.step()
+    sim.step()
+
+    assert seen == [4, 8, 12]
+
+
+def test_warmup_leaves_state_and_rng_untouched():
+    """warmup() rechnet auf einer Kopie und verbraucht keine Zufallszahlen."""
+    particles, inter = _random_state(40, 4, seed=9)
+    sim = Simulation(0.01, 0.15, 0.1, 2.0, particles, inter, integrator="verlet")
+    before = (particles.positions.copy(), particles.velocities.copy())
+
+    np.random.seed(3)
+    assert sim.warmup() >= 0.0
+    after_warmup = np.random.rand()
+    np.random.seed(3)
+    assert after_warmup == np.random.rand()
+
+    np.testing.assert_array_equal(particles.positions, before[0])
+    np.testing.assert_array_equal(particles.velocities, before[1])
+    assert sim.step_count == 0
+    assert not sim.integrator.state_dict()["primed"]
+
+
+@pytest.mark.parametrize("neighbor_mode", ["brute", "cells"])
+def test_soa_layout_matches_aos_bitwise(neighbor_mode):
+    """Das Layout ändert nur die Speicheranordnung, nicht die Arithmetik."""
+    np.random.seed(10)
+    aos = ParticleSystem(60, 3)
+    soa = aos.astype(np.float64, np.int64, "soa")
+    inter = Interaction.from_matrix(np.random.uniform(-1.0, 1.0, (3, 3)))
+
+    for particles in (aos, soa):
+        Simulation(0.01, 0.2, 0.1, 0.0, particles, inter, neighbor_mode=neighbor_mode).run(5)
+    np.testing.assert_array_equal(aos.positions, soa.positions)
+
+
+def test_float32_state_stays_float32():
+    np.random.seed(11)
+    particles = ParticleSystem(30, 4, dtype=np.float32, types_dtype=np.uint8)
+    sim = Simulation(0.01, 0.2, 0.1, 0.5, particles, Interaction(4))
+    sim.run(3)
+    sim.step()
+
+    assert particles.positions.dtype == np.float32
+    assert particles.velocities.dtype == np.float32
+    assert np.all((particles.positions >= 0.0) & (particles.positions <= 1.0))
+
+
+def test_kernels_only_touch_active_slots():
+    np.random.seed(0)
+    particles = ParticleSystem(200, 4, capacity=400)
+    sim = Simulation(0.01, 0.1, 0.1, 0.0, particles, Interaction(4), neighbor_mode="cells")
+    sim.run(3)
+    particles.spawn(100, particle_type=0)
+    particles.remove(np.arange(0, 300, 3))
+    inactive = particles._positions[particles.n_particles:].copy()
+
+    sim.run(3)
+    sim.step()
+
+    assert particles.n_particles == 200
+    np.testing.assert_array_equal(particles._positions[200:], inactive)
+    assert np.all((particles.positions >= 0.0) & (particles.positions < 1.0))
+
+
+def _noisy_simulation(integrator="semi_implicit_euler", neighbor_mode="auto"):
+    particles, inter = _random_state(50, 3, seed=21)
+    return Simulation(0.01, 0.2, 0.1, 3.0, particles, inter, integrator=integrator,
+                      neighbor_mode=neighbor_mode, seed=99)
+
+
+@pytest.mark.parametrize("integrator", ["semi_implicit_euler", "euler", "verlet"])
+def test_noise_is_independent_of_chunking(integrator):
+    """Noise = f(seed, Schritt, ID): step(), run() und Blöcke liefern dasselbe."""
+    stepped, fused, chunked = (_noisy_simulation(integrator) for _ in range(3))
+    for _ in range(6):
+        stepped.step()
+    fused.run(6)
+    chunked.run(6, callback_every=4)
+
+    for sim in (fused, chunked):
+        np.testing.assert_array_equal(sim.particles.positions, stepped.particles.positions)
+        np.testing.assert_array_equal(sim.particles.velocities, stepped.particles.velocities)
+
+
+@pytest.mark.parametrize("neighbor_mode", ["brute", "cells"])
+def test_noisy_parallel_force_kernel_matches_serial(neighbor_mode):
+    """Paralleler und serieller Kraft-Kernel sind auch mit Noise bitgleich."""
+    serial, parallel = _noisy_simulation(neighbor_mode=neighbor_mode), \
+        _noisy_simulation(neighbor_mode=neighbor_mode)
+    n_cells = serial.cells_per_axis() if neighbor_mode == "cells" else 0
+    for sim, is_parallel in ((serial, False), (parallel, True)):
+        kernel = fused_kernel(run_semi_implicit_euler, select_force_kernel(n_cells, is_parallel))
+        kernel(*_state_args(sim), n_cells, 5)
+
+    np.testing.assert_array_equal(parallel.particles.positions, serial.particles.positions)
+    assert not np.array_equal(serial.particles.velocities, 0.0)
+
+
+def test_different_seeds_give_different_noise():
+    a, b = _noisy_simulation(), _noisy_simulation()
+    b.seed = 100
+    a.run(3)
+    b.run(3)
+    assert not np.array_equal(a.particles.velocities, b.particles.velocities)
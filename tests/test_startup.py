@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+from particle_life_simulator.forces import compute_forces, compute_forces_cells, pair_force
+from particle_life_simulator.integrators import (
+    fused_kernel,
+    run_euler,
+    run_velocity_verlet,
+    source_fingerprint,
+)
+from particle_life_simulator.neighbors import compute_forces_list
+from particle_life_simulator.rng import counter_uniform
+from particle_life_simulator.startup import StartupTimer, measure_startup
+
+
+def test_startup_timer_phases():
+    timer = StartupTimer()
+    with timer.phase("import"):
+        pass
+    timer.record("compile", 0.5)
+    timer.record("compile", 0.25)
+
+    assert list(timer.phases) == ["import", "compile"]
+    assert timer.phases["compile"] == 0.75
+    assert "compile 0.750 s" in timer.report()
+
+
+def test_measure_startup_reports_all_phases():
+    timer = measure_startup(n_particles=20)
+    assert set(timer.phases) == {"import", "setup", "compile", "first_step"}
+
+
+def test_fused_kernels_are_specialized_per_force_kernel():
+    """Jede Kombination bekommt einen eigenen (cachebaren) Kernel."""
+    euler_brute = fused_kernel(run_euler, compute_forces)
+    assert fused_kernel(run_euler, compute_forces) is euler_brute
+    assert fused_kernel(run_euler, compute_forces_cells) is not euler_brute
+    assert fused_kernel(run_velocity_verlet, compute_forces) is not euler_brute
+
+
+def test_fused_kernel_names_follow_inlined_source():
+    """Der Platten-Cache wird neu angelegt, wenn sich eingesetzter Code ändert."""
+    fingerprint = source_fingerprint(run_euler, compute_forces)
+    assert fingerprint == source_fingerprint(compute_forces, run_euler)
+    assert fingerprint != source_fingerprint(run_euler, compute_forces_list)
+    assert fused_kernel(run_euler, compute_forces).__name__.endswith(
+        source_fingerprint(run_euler, compute_forces, pair_force, counter_uniform))
+
+
+def test_headless_modules_do_not_import_vispy():
+    code = ("import sys\n"
+            "import particle_life_simulator.main, particle_life_simulator.batch\n"
+            "import particle_life_simulator.benchmark, particle_life_simulator.startup\n"
+            "print('vispy' in sys.modules)")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            env=env, check=True).stdout
+    assert output.strip() == "False"
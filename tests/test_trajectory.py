@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from particle_life_simulator.trajectory import TrajectoryReader, TrajectoryWriter
+
+
+def _frames(n_frames, n_particles, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n_frames, n_particles, 2)), rng.normal(size=(n_frames, n_particles, 2))
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_roundtrip_across_chunks(tmp_path, compression):
+    positions, velocities = _frames(7, 30)
+    types = np.arange(30) % 4
+    path = str(tmp_path / "run.traj")
+
+    with TrajectoryWriter(path, types, chunk_size=3, compression=compression) as writer:
+        for step in range(7):
+            writer.append(positions[step], velocities[step], step=step * 10)
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 7
+    assert reader.meta["chunks"][-1]["n_frames"] == 1  # letzter, unvollständiger Chunk
+    assert np.array_equal(reader.types, types)
+    assert list(reader.steps) == [0, 10, 20, 30, 40, 50, 60]
+
+    # float32-Downcast
+    assert reader.positions[0].dtype == np.float32
+    assert np.allclose(reader.positions[4], positions[4], atol=1e-6)
+
+    frame = reader[-1]
+    assert frame.step == 60
+    assert np.allclose(frame.velocities, velocities[6], atol=1e-5)
+
+    # Slice über Chunkgrenzen hinweg
+    sliced = reader.positions[1:7:2]
+    assert sliced.shape == (3, 30, 2)
+    assert np.allclose(sliced, positions[1:7:2], atol=1e-6)
+
+
+def test_uncompressed_frames_are_memory_mapped(tmp_path):
+    positions, velocities = _frames(4, 10)
+    path = str(tmp_path / "run.traj")
+    with TrajectoryWriter(path, np.zeros(10, dtype=int), chunk_size=2,
+                          record_velocities=False) as writer:
+        for step in range(4):
+            writer.append(positions[step])
+
+    reader = TrajectoryReader(path)
+    assert isinstance(reader.positions[2].base, np.memmap)
+    assert reader.velocities is None
+    assert reader[0].velocities is None
+
+
+def test_record_simulation_callback(tmp_path):
+    from particle_life_simulator.interaction import Interaction
+    from particle_life_simulator.particles import ParticleSystem
+    from particle_life_simulator.simulation import Simulation
+
+    particles = ParticleSystem(20, 4)
+    sim = Simulation(0.01, 0.2, 0.1, 0.0, particles, Interaction(4))
+    path = str(tmp_path / "sim.traj")
+
+    with TrajectoryWriter(path, particles.types, chunk_size=2, dtype=np.float64) as writer:
+        sim.run(6, callback=writer.record, callback_every=2)
+
+    reader = TrajectoryReader(path)
+    assert list(reader.steps) == [2, 4, 6]
+    assert np.array_equal(reader.positions[-1], particles.positions)
+
+
+def test_writer_rejects_wrong_frame_size(tmp_path):
+    with TrajectoryWriter(str(tmp_path / "t"), np.zeros(5, dtype=int)) as writer:
+        with pytest.raises(ValueError):
+            writer.append(np.zeros((4, 2)), np.zeros((4, 2)))